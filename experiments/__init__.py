@@ -3,5 +3,6 @@ from .discrete_precision_recall_calculator import PrecisionRecallCalculator, cal
 from .k_fold_split import KFoldSplit
 from .learning_statistics_manager import LearningStatisticsManager
 from .numeric_performance_calculator import NumericPerformanceCalculator
+from .observations_loader import ObservationsLoader
 from .planning_with_offline_learning import POL
 from .semantic_performance_calculator import SemanticPerformanceCalculator
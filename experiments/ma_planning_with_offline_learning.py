@@ -5,12 +5,13 @@ import time
 from pathlib import Path
 from typing import List, Optional
 
-from pddl_plus_parser.lisp_parsers import DomainParser, TrajectoryParser, ProblemParser
+from pddl_plus_parser.lisp_parsers import DomainParser
 from pddl_plus_parser.models import MultiAgentObservation
 
 from experiments import NumericPerformanceCalculator
 from experiments.k_fold_split import KFoldSplit
 from experiments.learning_statistics_manager import LearningStatisticsManager
+from experiments.observations_loader import ObservationsLoader, OBSERVATIONS_CACHE_DIRECTORY_NAME
 from experiments.utils import init_numeric_performance_calculator
 from sam_learning.core import LearnerDomain
 from sam_learning.learners import MultiAgentSAM
@@ -96,12 +97,12 @@ class MAPlanningWithOfflineLearning:
         allowed_complete_observations = []
         allowed_filtered_observations = []
         observed_objects = {}
-        for index, trajectory_file_path in enumerate(train_set_dir_path.glob("*.trajectory")):
-            problem_path = train_set_dir_path / f"{trajectory_file_path.stem}.pddl"
-            problem = ProblemParser(problem_path, partial_domain).parse_problem()
-            observed_objects.update(problem.objects)
-            complete_observation: MultiAgentObservation = TrajectoryParser(partial_domain, problem).parse_trajectory(
-                trajectory_file_path, self.executing_agents)
+        observations_loader = ObservationsLoader(
+            partial_domain_path, partial_parsing=True,
+            cache_directory_path=self.working_directory_path / OBSERVATIONS_CACHE_DIRECTORY_NAME,
+            executing_agents=self.executing_agents)
+        for complete_observation in observations_loader.load_directory_observations(train_set_dir_path):
+            observed_objects.update(complete_observation.grounded_objects)
             filtered_observation = self._filter_baseline_multi_agent_trajectory(complete_observation)
             allowed_complete_observations.append(complete_observation)
             allowed_filtered_observations.append(filtered_observation)
@@ -220,7 +220,8 @@ class ModelFaultDiagnosis:
                             domain_file_name=None, is_faulty=False, defect_type=defect_type,
                             action_name=faulty_action_name, repair_type=repair_algorithm_type.name)
         learned_domain_file_path = test_set_dir_path / self.model_domain_file_name
-        self.numeric_performance_calc.calculate_performance(learned_domain_file_path, len(used_observations))
+        self.numeric_performance_calc.calculate_performance(learned_domain_file_path, len(used_observations),
+                                                            repaired_domain.compiled_numeric_models)
         return learned_domain_file_path
 
     def _run_repaired_model_on_test(self, all_diagnosis_stats: List[Dict[str, Any]], faulty_action_name: str,
@@ -3,13 +3,14 @@ import csv
 import math
 from collections import defaultdict
 from pathlib import Path
-from typing import List, Dict, NoReturn, Union
+from typing import List, Dict, NoReturn, Union, Optional, Tuple
 
+import numpy as np
 from pddl_plus_parser.lisp_parsers import DomainParser
-from pddl_plus_parser.models import Domain, Observation, MultiAgentObservation
+from pddl_plus_parser.models import Domain, Observation, MultiAgentObservation, ObservedComponent
 
-from experiments.performance_calculation_utils import _ground_tested_operator
 from experiments.semantic_performance_calculator import SemanticPerformanceCalculator
+from sam_learning.core import CompiledNumericModel
 from utilities import LearningAlgorithmType
 
 NUMERIC_PERFORMANCE_STATS = ["action_name", "num_trajectories", "ratio_actions_learned",
@@ -23,7 +24,40 @@ class NumericPerformanceCalculator(SemanticPerformanceCalculator):
                  working_directory_path: Path, learning_algorithm: LearningAlgorithmType):
         super().__init__(model_domain, observations, working_directory_path, learning_algorithm)
 
-    def calculate_effects_performance(self, learned_domain: Domain) -> Dict[str, float]:
+    @staticmethod
+    def _calculate_compiled_squared_errors(compiled_model: CompiledNumericModel, parameter_names: List[str],
+                                           parameters: Tuple[str, ...],
+                                           components: List[ObservedComponent]) -> List[float]:
+        """Calculates the squared errors of the learned effects of a single action call using its compiled model.
+
+        :param compiled_model: the matrix form of the learned action.
+        :param parameter_names: the names of the learned action's parameters.
+        :param parameters: the objects the action was called with.
+        :param components: the observed components in which the action call was executed.
+        :return: the squared errors of the fluents in the next states of the components.
+        """
+        grounded_fluent_names = compiled_model.ground_fluent_names(dict(zip(parameter_names, parameters)))
+        previous_values = np.array([[component.previous_state.state_fluents[fluent_name].value
+                                     if fluent_name in component.previous_state.state_fluents else 0.0
+                                     for fluent_name in grounded_fluent_names] for component in components],
+                                   dtype=np.float64)
+        learned_next_values = compiled_model.apply_effects(previous_values)
+        affected_fluents_columns = {grounded_fluent_names[column_index]: column_index for column_index, lifted_fluent
+                                    in enumerate(compiled_model.fluent_names)
+                                    if lifted_fluent in compiled_model.affected_fluents}
+        squared_errors = []
+        for component, component_learned_values in zip(components, learned_next_values):
+            for fluent_name, fluent_data in component.next_state.state_fluents.items():
+                learned_value = component_learned_values[affected_fluents_columns[fluent_name]] \
+                    if fluent_name in affected_fluents_columns else \
+                    component.previous_state.state_fluents[fluent_name].value
+                squared_errors.append(math.pow(fluent_data.value - learned_value, 2))
+
+        return squared_errors
+
+    def calculate_effects_performance(
+            self, learned_domain: Domain,
+            compiled_models: Optional[Dict[str, CompiledNumericModel]] = None) -> Dict[str, float]:
         """Calculates the effects MSE value using the actual state fluents and the ones generated using the learned
             action.
 
@@ -31,16 +65,26 @@ class NumericPerformanceCalculator(SemanticPerformanceCalculator):
             MSE is calculated as follows - 1/n * Sum((x-x')^2)
 
         :param learned_domain: the domain that was learned by the action model learning algorithm.
+        :param compiled_models: the compiled numeric models of the learned actions, the effects of these actions are
+            applied on all the observed states of each action call using a single matrix multiplication.
         :return: a mapping between the action name and its MSE value.
         """
+        compiled_models = compiled_models or {}
         squared_errors = defaultdict(list)
+        compiled_action_calls_components = defaultdict(list)
+        learned_operators = self._get_learned_operators(learned_domain)
         for observation in self.dataset_observations:
             for observation_component in observation.components:
                 action_call = observation_component.grounded_action_call
                 if action_call.name not in learned_domain.actions:
                     continue
 
-                grounded_operator = _ground_tested_operator(action_call, learned_domain)
+                if action_call.name in compiled_models:
+                    compiled_action_calls_components[(action_call.name, tuple(action_call.parameters))].append(
+                        observation_component)
+                    continue
+
+                grounded_operator = learned_operators.get_operator(action_call)
                 previous_state = observation_component.previous_state
                 learned_next_state_fluents = grounded_operator.update_state_functions(previous_state)
                 actual_next_state = observation_component.next_state
@@ -48,20 +92,27 @@ class NumericPerformanceCalculator(SemanticPerformanceCalculator):
                     learned_value = learned_next_state_fluents[fluent_name].value
                     squared_errors[action_call.name].append(math.pow(fluent_data.value - learned_value, 2))
 
+        for (action_name, parameters), components in compiled_action_calls_components.items():
+            squared_errors[action_name].extend(self._calculate_compiled_squared_errors(
+                compiled_models[action_name], learned_domain.actions[action_name].parameter_names, parameters,
+                components))
+
         return {
             action_name: sum(square_errors) / len(square_errors)
             for action_name, square_errors in squared_errors.items()
         }
 
-    def calculate_performance(self, learned_domain_path: Path, num_used_observations: int) -> NoReturn:
+    def calculate_performance(self, learned_domain_path: Path, num_used_observations: int,
+                              compiled_models: Optional[Dict[str, CompiledNumericModel]] = None) -> NoReturn:
         """Calculates the model's performance with both the precision and the recall values calculated.
 
         :param learned_domain_path: the path to the learned action model.
         :param num_used_observations: the number of observations used to learn the action model.
+        :param compiled_models: the compiled numeric models of the learned actions.
         """
         learned_domain = DomainParser(domain_path=learned_domain_path, partial_parsing=False).parse_domain()
-        precision, recall = super().calculate_preconditions_semantic_performance(learned_domain)
-        effects_mse = self.calculate_effects_performance(learned_domain)
+        precision, recall = super().calculate_preconditions_semantic_performance(learned_domain, compiled_models)
+        effects_mse = self.calculate_effects_performance(learned_domain, compiled_models)
         for action_name in learned_domain.actions:
             action_stats = {
                 "action_name": action_name,
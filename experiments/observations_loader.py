@@ -0,0 +1,242 @@
+"""Module responsible for loading the observations used in the experiments."""
+import hashlib
+import logging
+import pickle
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Dict, Union, Iterable, Iterator
+
+from pddl_plus_parser.lisp_parsers import DomainParser, ProblemParser, TrajectoryParser
+from pddl_plus_parser.models import Observation, MultiAgentObservation, Domain
+
+from sam_learning.core import StreamingObservation
+
+OBSERVATIONS_CACHE_DIRECTORY_NAME = "observations_cache"
+CACHE_FILE_SUFFIX = ".pkl"
+MAX_CACHED_DOMAINS = 8
+DEFAULT_MAX_CACHED_OBSERVATIONS = 256
+
+ObservationType = Union[Observation, MultiAgentObservation]
+
+
+@lru_cache(maxsize=MAX_CACHED_DOMAINS)
+def _parse_domain_content(domain_path: Path, domain_hash: str, partial_parsing: bool) -> Domain:
+    """Parses the domain once per process and content so that parsing several trajectories does not re-parse it.
+
+    :param domain_path: the path to the domain file.
+    :param domain_hash: the hash of the domain file's content, so that an edited domain is parsed again.
+    :param partial_parsing: whether to parse the domain partially.
+    :return: the parsed domain.
+    """
+    return DomainParser(domain_path=domain_path, partial_parsing=partial_parsing).parse_domain()
+
+
+def _parse_domain(domain_path: Path, partial_parsing: bool) -> Domain:
+    """Parses the domain, reusing the domain parsed before if the content of the domain file did not change.
+
+    :param domain_path: the path to the domain file.
+    :param partial_parsing: whether to parse the domain partially.
+    :return: the parsed domain.
+    """
+    domain_hash = hashlib.sha256(domain_path.read_bytes()).hexdigest()
+    return _parse_domain_content(domain_path, domain_hash, partial_parsing)
+
+
+def parse_observation(domain_path: Path, problem_path: Path, trajectory_path: Path, partial_parsing: bool,
+                      executing_agents: Optional[List[str]] = None) -> ObservationType:
+    """Parses a single trajectory file into an observation.
+
+    :param domain_path: the path to the domain file.
+    :param problem_path: the path to the problem that the trajectory solves.
+    :param trajectory_path: the path to the trajectory file.
+    :param partial_parsing: whether to parse the domain partially.
+    :param executing_agents: the agents executing the trajectory if it is a multi-agent trajectory.
+    :return: the parsed observation.
+    """
+    domain = _parse_domain(domain_path, partial_parsing)
+    problem = ProblemParser(problem_path, domain).parse_problem()
+    if executing_agents is not None:
+        return TrajectoryParser(domain, problem).parse_trajectory(trajectory_path, executing_agents=executing_agents)
+
+    return TrajectoryParser(domain, problem).parse_trajectory(trajectory_path)
+
+
+class ObservationsLoader:
+    """Loads observations in parallel and caches the parsed observations according to the content of their files.
+
+    Note: the observations are kept in memory in their pickled form, so each load returns a new copy of the
+        observation that can be modified by the learners without affecting the observations loaded later.
+    """
+
+    logger: logging.Logger
+    domain_path: Path
+    partial_parsing: bool
+    cache_directory_path: Optional[Path]
+    executing_agents: Optional[List[str]]
+    max_workers: Optional[int]
+    max_cached_observations: int
+    _loaded_observations: "OrderedDict[str, bytes]"
+
+    def __init__(self, domain_path: Path, partial_parsing: bool = True, cache_directory_path: Optional[Path] = None,
+                 executing_agents: Optional[List[str]] = None, max_workers: Optional[int] = None,
+                 max_cached_observations: int = DEFAULT_MAX_CACHED_OBSERVATIONS):
+        self.logger = logging.getLogger(__name__)
+        self.domain_path = domain_path
+        self.partial_parsing = partial_parsing
+        self.cache_directory_path = cache_directory_path
+        self.executing_agents = executing_agents
+        self.max_workers = max_workers
+        self.max_cached_observations = max_cached_observations
+        self._loaded_observations = OrderedDict()
+        if cache_directory_path is not None:
+            cache_directory_path.mkdir(parents=True, exist_ok=True)
+
+    def _create_cache_key(self, problem_path: Path, trajectory_path: Path) -> str:
+        """Creates the key of the observation from the content of the files that the observation is parsed from.
+
+        :param problem_path: the path to the problem that the trajectory solves.
+        :param trajectory_path: the path to the trajectory file.
+        :return: the hash representing the parsed observation.
+        """
+        content_hash = hashlib.sha256()
+        for file_path in [self.domain_path, problem_path, trajectory_path]:
+            content_hash.update(file_path.read_bytes())
+
+        content_hash.update(str(self.partial_parsing).encode())
+        content_hash.update(str(self.executing_agents).encode())
+        return content_hash.hexdigest()
+
+    def _keep_in_memory(self, cache_key: str, pickled_observation: bytes) -> None:
+        """Keeps the pickled observation in the in-memory cache, evicting the least recently used observations.
+
+        :param cache_key: the key of the observation.
+        :param pickled_observation: the pickled observation.
+        """
+        self._loaded_observations[cache_key] = pickled_observation
+        self._loaded_observations.move_to_end(cache_key)
+        while len(self._loaded_observations) > self.max_cached_observations:
+            self._loaded_observations.popitem(last=False)
+
+    def _load_cached_observation(self, cache_key: str) -> Optional[ObservationType]:
+        """Loads the observation from the in-memory cache or from the cache directory if it was parsed before.
+
+        :param cache_key: the key of the observation.
+        :return: a copy of the cached observation or None if the observation was not parsed before.
+        """
+        if cache_key in self._loaded_observations:
+            self._loaded_observations.move_to_end(cache_key)
+            return pickle.loads(self._loaded_observations[cache_key])
+
+        if self.cache_directory_path is None:
+            return None
+
+        cache_file_path = self.cache_directory_path / f"{cache_key}{CACHE_FILE_SUFFIX}"
+        if not cache_file_path.exists():
+            return None
+
+        try:
+            pickled_observation = cache_file_path.read_bytes()
+            observation = pickle.loads(pickled_observation)
+
+        except (pickle.UnpicklingError, EOFError):
+            self.logger.warning(f"The cached observation {cache_file_path} is corrupted and will be parsed again.")
+            return None
+
+        self._keep_in_memory(cache_key, pickled_observation)
+        return observation
+
+    def _cache_observation(self, cache_key: str, observation: ObservationType) -> None:
+        """Stores the parsed observation in the in-memory cache and in the cache directory.
+
+        :param cache_key: the key of the observation.
+        :param observation: the parsed observation.
+        """
+        pickled_observation = pickle.dumps(observation, protocol=pickle.HIGHEST_PROTOCOL)
+        self._keep_in_memory(cache_key, pickled_observation)
+        if self.cache_directory_path is None:
+            return
+
+        cache_file_path = self.cache_directory_path / f"{cache_key}{CACHE_FILE_SUFFIX}"
+        temporary_file_path = cache_file_path.with_suffix(".tmp")
+        temporary_file_path.write_bytes(pickled_observation)
+        temporary_file_path.replace(cache_file_path)
+
+    def _parse_observations(self, files_to_parse: Dict[str, Path]) -> Dict[str, ObservationType]:
+        """Parses the trajectories that were not found in the cache, using a process pool if more than one is needed.
+
+        :param files_to_parse: mapping between the cache keys and the trajectory files to parse.
+        :return: mapping between the cache keys and the parsed observations.
+        """
+        parsing_arguments = {
+            cache_key: (self.domain_path, trajectory_path.parent / f"{trajectory_path.stem}.pddl", trajectory_path,
+                        self.partial_parsing, self.executing_agents)
+            for cache_key, trajectory_path in files_to_parse.items()}
+        if len(parsing_arguments) <= 1 or self.max_workers == 1:
+            return {cache_key: parse_observation(*arguments) for cache_key, arguments in parsing_arguments.items()}
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {cache_key: executor.submit(parse_observation, *arguments)
+                       for cache_key, arguments in parsing_arguments.items()}
+            return {cache_key: future.result() for cache_key, future in futures.items()}
+
+    def load_observations(self, trajectory_paths: List[Path]) -> List[ObservationType]:
+        """Loads the observations of the trajectories, the problem of each trajectory is expected to be located in
+            the same directory and with the same name as the trajectory.
+
+        :param trajectory_paths: the paths to the trajectory files.
+        :return: the observations in the same order as the input trajectory paths.
+        """
+        cache_keys = []
+        observations = {}
+        files_to_parse = {}
+        for trajectory_path in trajectory_paths:
+            problem_path = trajectory_path.parent / f"{trajectory_path.stem}.pddl"
+            cache_key = self._create_cache_key(problem_path, trajectory_path)
+            cache_keys.append(cache_key)
+            cached_observation = self._load_cached_observation(cache_key)
+            if cached_observation is not None:
+                observations[cache_key] = cached_observation
+                continue
+
+            files_to_parse[cache_key] = trajectory_path
+
+        self.logger.info(f"Loaded {len(trajectory_paths) - len(files_to_parse)} observations from the cache, "
+                         f"parsing {len(files_to_parse)} trajectories.")
+        for cache_key, observation in self._parse_observations(files_to_parse).items():
+            self._cache_observation(cache_key, observation)
+            observations[cache_key] = observation
+
+        return [observations[cache_key] for cache_key in cache_keys]
+
+    def load_directory_observations(self, directory_path: Path) -> List[ObservationType]:
+        """Loads the observations of all the trajectories in the directory.
+
+        :param directory_path: the directory containing the trajectories and their problems.
+        :return: the observations of the trajectories in the directory.
+        """
+        return self.load_observations(list(directory_path.glob("*.trajectory")))
+
+    def stream_observations(self, trajectory_paths: Iterable[Path]) -> Iterator[StreamingObservation]:
+        """Creates observations that stream their components from the trajectory files instead of loading them.
+
+        Note: the streamed observations are neither cached nor parsed in parallel, they are meant for datasets that
+            do not fit in the memory.
+
+        :param trajectory_paths: the paths to the trajectory files.
+        :return: generator of the streaming observations in the same order as the input trajectory paths.
+        """
+        domain = _parse_domain(self.domain_path, self.partial_parsing)
+        for trajectory_path in trajectory_paths:
+            problem_path = trajectory_path.parent / f"{trajectory_path.stem}.pddl"
+            problem = ProblemParser(problem_path, domain).parse_problem()
+            yield StreamingObservation(domain, problem, trajectory_path, self.executing_agents)
+
+    def stream_directory_observations(self, directory_path: Path) -> Iterator[StreamingObservation]:
+        """Creates streaming observations for all the trajectories in the directory.
+
+        :param directory_path: the directory containing the trajectories and their problems.
+        :return: generator of the streaming observations of the trajectories in the directory.
+        """
+        return self.stream_observations(directory_path.glob("*.trajectory"))
@@ -1,8 +1,14 @@
 """Utilities for the performance calculation process."""
+from collections import OrderedDict
+from typing import Dict, List, Iterable, Tuple, Optional
 
-from typing import Dict
+import numpy as np
+from anytree import AnyNode
+from pddl_plus_parser.models import Domain, Operator, ActionCall, State, GroundedPredicate, PDDLFunction, \
+    NumericalExpressionTree
+from pddl_plus_parser.models.numerical_expression import COMPARISON_OPERATORS, NUMERICAL_BINARY_OPERATORS
 
-from pddl_plus_parser.models import Domain, Operator, ActionCall, State
+from sam_learning.core import CompiledNumericModel
 
 
 def _ground_tested_operator(action_call: ActionCall, learned_domain: Domain) -> Operator:
@@ -20,25 +26,183 @@ def _ground_tested_operator(action_call: ActionCall, learned_domain: Domain) ->
     return grounded_operator
 
 
-def _calculate_single_action_applicability_rate(
-        action_call: ActionCall, learned_domain: Domain, complete_domain: Domain,
-        num_false_negatives: Dict[str, int], num_false_positives: Dict[str, int],
-        num_true_positives: Dict[str, int], observed_state: State):
+DEFAULT_OPERATORS_CACHE_SIZE = 4096
+
+
+class GroundedOperatorsCache:
+    """LRU cache of the grounded operators of a single domain, so that recurring action calls are grounded once.
+
+    Note: the cache is scoped to the domain object, a new domain (e.g., a newly learned model) requires a new cache.
+        The fluents returned by a cached operator's update_state_functions are shared with the operator and should be
+        read before the operator is applied again.
+    """
+
+    domain: Domain
+    max_size: int
+    _grounded_operators: "OrderedDict[Tuple[str, Tuple[str, ...]], Operator]"
+
+    def __init__(self, domain: Domain, max_size: int = DEFAULT_OPERATORS_CACHE_SIZE):
+        self.domain = domain
+        self.max_size = max_size
+        self._grounded_operators = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._grounded_operators)
+
+    def get_operator(self, action_call: ActionCall) -> Operator:
+        """Returns the grounded operator of the action call, grounding it only if it is not cached.
+
+        :param action_call: the grounded action call.
+        :return: the grounded operator.
+        """
+        operator_key = (action_call.name, tuple(action_call.parameters))
+        if operator_key in self._grounded_operators:
+            self._grounded_operators.move_to_end(operator_key)
+            return self._grounded_operators[operator_key]
+
+        grounded_operator = _ground_tested_operator(action_call, self.domain)
+        self._grounded_operators[operator_key] = grounded_operator
+        if len(self._grounded_operators) > self.max_size:
+            self._grounded_operators.popitem(last=False)
+
+        return grounded_operator
+
+
+class StatesMatrix:
+    """Encodes a sequence of states as a boolean predicates matrix and a numeric fluents matrix.
+
+    Note: fluents that are not defined in a state are set to zero, as done when evaluating a single state.
     """
 
-    :param action_call:
-    :param learned_domain:
-    :param complete_domain:
-    :param num_false_negatives:
-    :param num_false_positives:
-    :param num_true_positives:
-    :param observed_state:
-    :return:
+    predicates_indexes: Dict[str, int]
+    predicates_matrix: np.ndarray
+    fluents_indexes: Dict[str, int]
+    fluents_matrix: np.ndarray
+
+    def __init__(self, states: List[State]):
+        self.predicates_indexes = {}
+        self.fluents_indexes = {}
+        states_predicates = []
+        states_fluents = []
+        for state in states:
+            states_predicates.append([
+                self.predicates_indexes.setdefault(predicate.untyped_representation, len(self.predicates_indexes))
+                for predicates in state.state_predicates.values() for predicate in predicates])
+            states_fluents.append({
+                self.fluents_indexes.setdefault(fluent_name, len(self.fluents_indexes)): fluent.value
+                for fluent_name, fluent in state.state_fluents.items()})
+
+        self.predicates_matrix = np.zeros((len(states), len(self.predicates_indexes)), dtype=bool)
+        self.fluents_matrix = np.zeros((len(states), len(self.fluents_indexes)), dtype=np.float64)
+        for state_index, (predicates_ids, fluents_values) in enumerate(zip(states_predicates, states_fluents)):
+            self.predicates_matrix[state_index, predicates_ids] = True
+            self.fluents_matrix[state_index, list(fluents_values.keys())] = list(fluents_values.values())
+
+    def __len__(self) -> int:
+        return self.predicates_matrix.shape[0]
+
+    def predicates_hold(self, predicates: Iterable[GroundedPredicate]) -> np.ndarray:
+        """Returns for every state whether all the predicates hold in it.
+
+        :param predicates: the grounded predicates to check.
+        :return: boolean vector with an entry per state.
+        """
+        predicates_ids = []
+        for predicate in predicates:
+            if predicate.untyped_representation not in self.predicates_indexes:
+                return np.zeros(len(self), dtype=bool)
+
+            predicates_ids.append(self.predicates_indexes[predicate.untyped_representation])
+
+        return self.predicates_matrix[:, predicates_ids].all(axis=1)
+
+    def any_predicate_holds(self, predicates: Iterable[GroundedPredicate]) -> np.ndarray:
+        """Returns for every state whether at least one of the predicates holds in it.
+
+        :param predicates: the grounded predicates to check.
+        :return: boolean vector with an entry per state.
+        """
+        predicates_ids = [self.predicates_indexes[predicate.untyped_representation] for predicate in predicates
+                          if predicate.untyped_representation in self.predicates_indexes]
+        return self.predicates_matrix[:, predicates_ids].any(axis=1)
+
+    def get_fluent_columns(self, fluent_names: List[str]) -> np.ndarray:
+        """Returns the values of the fluents in all the states.
+
+        :param fluent_names: the grounded fluents whose values are returned.
+        :return: (states x fluents) matrix with the values of the fluents, zero for fluents not defined in a state.
+        """
+        fluents_values = np.zeros((len(self), len(fluent_names)), dtype=np.float64)
+        for column_index, fluent_name in enumerate(fluent_names):
+            if fluent_name in self.fluents_indexes:
+                fluents_values[:, column_index] = self.fluents_matrix[:, self.fluents_indexes[fluent_name]]
+
+        return fluents_values
+
+    def calculate_expression(self, expression_node: AnyNode) -> np.ndarray:
+        """Calculates the value of the numeric expression in all the states at once.
+
+        :param expression_node: the node of the grounded expression tree.
+        :return: vector with the value of the expression in every state.
+        """
+        if len(expression_node.children) == 0:
+            if isinstance(expression_node.value, PDDLFunction):
+                fluent_index = self.fluents_indexes.get(expression_node.value.untyped_representation)
+                if fluent_index is None:
+                    return np.zeros(len(self), dtype=np.float64)
+
+                return self.fluents_matrix[:, fluent_index]
+
+            return np.full(len(self), float(expression_node.value), dtype=np.float64)
+
+        left_operand = self.calculate_expression(expression_node.children[0])
+        right_operand = self.calculate_expression(expression_node.children[1])
+        return NUMERICAL_BINARY_OPERATORS[expression_node.value](left_operand, right_operand)
+
+    def numeric_conditions_hold(self, numeric_conditions: Iterable[NumericalExpressionTree]) -> np.ndarray:
+        """Returns for every state whether all the numeric conditions hold in it.
+
+        :param numeric_conditions: the grounded numeric conditions.
+        :return: boolean vector with an entry per state.
+        """
+        conditions_hold = np.ones(len(self), dtype=bool)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for condition in numeric_conditions:
+                compared_operand = self.calculate_expression(condition.root.children[0])
+                evaluated_operand = self.calculate_expression(condition.root.children[1])
+                conditions_hold &= COMPARISON_OPERATORS[condition.root.value](compared_operand, evaluated_operand)
+
+        return conditions_hold
+
+
+def calculate_operator_applicability(grounded_operator: Operator, states_matrix: StatesMatrix,
+                                     compiled_numeric_model: Optional[CompiledNumericModel] = None) -> np.ndarray:
+    """Checks whether the grounded operator is applicable in each of the encoded states.
+
+    :param grounded_operator: the grounded operator to check.
+    :param states_matrix: the encoded states.
+    :param compiled_numeric_model: the matrix form of the operator's lifted action, if given the numeric
+        preconditions are checked using it instead of evaluating the grounded expression trees.
+    :return: boolean vector with an entry per state that is true if the operator is applicable in the state.
     """
-    tested_grounded_operator = _ground_tested_operator(action_call, learned_domain)
-    model_grounded_operator = _ground_tested_operator(action_call, complete_domain)
-    is_applicable_in_test = tested_grounded_operator.is_applicable(observed_state)
-    is_applicable_in_model = model_grounded_operator.is_applicable(observed_state)
-    num_true_positives[action_call.name] += int(is_applicable_in_test == is_applicable_in_model)
-    num_false_positives[action_call.name] += int(is_applicable_in_test and not is_applicable_in_model)
-    num_false_negatives[action_call.name] += int(not is_applicable_in_test and is_applicable_in_model)
+    equality_preconditions = grounded_operator.grounded_equality_preconditions
+    inequality_preconditions = grounded_operator.grounded_inequality_preconditions
+    if len(equality_preconditions) > 0 and not Operator._equality_holds(equality_preconditions) or \
+            len(inequality_preconditions) > 0 and Operator._equality_holds(inequality_preconditions):
+        return np.zeros(len(states_matrix), dtype=bool)
+
+    applicability = states_matrix.predicates_hold(grounded_operator.grounded_positive_preconditions)
+    applicability &= ~states_matrix.any_predicate_holds(grounded_operator.grounded_negative_preconditions)
+    if compiled_numeric_model is not None:
+        parameters_map = dict(zip(grounded_operator.action.parameter_names, grounded_operator.grounded_call_objects))
+        grounded_fluent_names = compiled_numeric_model.ground_fluent_names(parameters_map)
+        return applicability & compiled_numeric_model.preconditions_hold(
+            states_matrix.get_fluent_columns(grounded_fluent_names))
+
+    applicability &= states_matrix.numeric_conditions_hold(grounded_operator.grounded_numeric_preconditions)
+    if len(grounded_operator.grounded_disjunctive_numeric_preconditions) > 0:
+        applicability &= np.any([states_matrix.numeric_conditions_hold(disjunctive_numeric_preconditions)
+                                 for disjunctive_numeric_preconditions in
+                                 grounded_operator.grounded_disjunctive_numeric_preconditions], axis=0)
+
+    return applicability
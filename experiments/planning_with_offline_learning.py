@@ -5,12 +5,13 @@ import logging
 from pathlib import Path
 from typing import List, Optional, Dict
 
-from pddl_plus_parser.lisp_parsers import DomainParser, TrajectoryParser, ProblemParser
+from pddl_plus_parser.lisp_parsers import DomainParser
 from pddl_plus_parser.models import Observation
 
 from experiments.k_fold_split import KFoldSplit
 from experiments.learning_statistics_manager import LearningStatisticsManager
 from experiments.numeric_performance_calculator import NumericPerformanceCalculator
+from experiments.observations_loader import ObservationsLoader, OBSERVATIONS_CACHE_DIRECTORY_NAME
 from experiments.utils import init_numeric_performance_calculator
 from sam_learning.core import LearnerDomain
 from sam_learning.learners import SAMLearner, NumericSAMLearner, PolynomialSAMLearning, ConditionalSAM
@@ -44,10 +45,14 @@ class POL:
     domain_validator: DomainValidator
     fluents_map: Dict[str, List[str]]
     numeric_performance_calc: NumericPerformanceCalculator
+    storage_compaction_interval: Optional[int]
 
     def __init__(self, working_directory_path: Path, domain_file_name: str,
                  learning_algorithm: LearningAlgorithmType, fluents_map_path: Optional[Path],
-                 solver_type: SolverType):
+                 solver_type: SolverType, solver_cpu_time_limit: Optional[int] = None,
+                 solver_memory_limit_mb: Optional[int] = None, storage_compaction_interval: Optional[int] = None,
+                 use_solutions_cache: bool = False, max_solver_workers: int = 1, max_validation_workers: int = 1,
+                 use_native_validator: bool = False):
         self.logger = logging.getLogger(__name__)
         self.working_directory_path = working_directory_path
         self.k_fold = KFoldSplit(working_directory_path=working_directory_path,
@@ -59,6 +64,7 @@ class POL:
             domain_path=self.working_directory_path / domain_file_name,
             learning_algorithm=learning_algorithm)
         self._learning_algorithm = learning_algorithm
+        self.storage_compaction_interval = storage_compaction_interval
         if fluents_map_path is not None:
             with open(fluents_map_path, "rt") as json_file:
                 self.fluents_map = json.load(json_file)
@@ -69,7 +75,9 @@ class POL:
         self.numeric_performance_calc = None
         self.domain_validator = DomainValidator(
             self.working_directory_path, learning_algorithm, self.working_directory_path / domain_file_name,
-            solver_type=solver_type)
+            solver_type=solver_type, use_solutions_cache=use_solutions_cache, cpu_time_limit=solver_cpu_time_limit,
+            memory_limit_mb=solver_memory_limit_mb, max_solver_workers=max_solver_workers,
+            max_validation_workers=max_validation_workers, use_native_validator=use_native_validator)
 
     def _init_numeric_performance_calculator(self) -> None:
         """Initializes the algorithm of the numeric precision / recall calculator."""
@@ -106,21 +114,29 @@ class POL:
         allowed_observations = []
         observed_objects = {}
         learned_domain_path = None
-        for index, trajectory_file_path in enumerate(train_set_dir_path.glob("*.trajectory")):
-            problem_path = train_set_dir_path / f"{trajectory_file_path.stem}.pddl"
-            problem = ProblemParser(problem_path, partial_domain).parse_problem()
-            observed_objects.update(problem.objects)
-            new_observation = TrajectoryParser(partial_domain, problem).parse_trajectory(trajectory_file_path)
+        learner_type = LEARNING_ALGORITHMS[self._learning_algorithm]
+        if issubclass(learner_type, NumericSAMLearner):
+            learner = learner_type(partial_domain=partial_domain, preconditions_fluent_map=self.fluents_map,
+                                   storage_compaction_interval=self.storage_compaction_interval)
+
+        else:
+            learner = learner_type(partial_domain=partial_domain, preconditions_fluent_map=self.fluents_map)
+
+        observations_loader = ObservationsLoader(
+            partial_domain_path, partial_parsing=True,
+            cache_directory_path=self.working_directory_path / OBSERVATIONS_CACHE_DIRECTORY_NAME)
+        for new_observation in observations_loader.load_directory_observations(train_set_dir_path):
+            observed_objects.update(new_observation.grounded_objects)
             allowed_observations.append(new_observation)
             self.logger.info(f"Learning the action model using {len(allowed_observations)} trajectories!")
-            learner = LEARNING_ALGORITHMS[self._learning_algorithm](partial_domain=partial_domain,
-                                                                    preconditions_fluent_map=self.fluents_map)
-            learned_model, learning_report = learner.learn_action_model(allowed_observations)
+            learner.add_observations([new_observation])
+            learned_model, learning_report = learner.create_domain_snapshot()
             self.learning_statistics_manager.add_to_action_stats(allowed_observations, learned_model, learning_report)
             learned_domain_path = self.validate_learned_domain(allowed_observations, learned_model, test_set_dir_path)
 
         if self._learning_algorithm in NUMERIC_ALGORITHMS:
-            self.numeric_performance_calc.calculate_performance(learned_domain_path, len(allowed_observations))
+            self.numeric_performance_calc.calculate_performance(learned_domain_path, len(allowed_observations),
+                                                                learned_model.compiled_numeric_models)
 
         self.learning_statistics_manager.export_action_learning_statistics(fold_number=fold_num)
         self.domain_validator.write_statistics(fold_num)
@@ -171,6 +187,20 @@ def parse_arguments() -> argparse.Namespace:
                                                                    "fluents", default=None)
     parser.add_argument("--solver_type", required=False, type=int, choices=[1, 2, 3],
                         help="The solver that should be used for the sake of validation", default=3)
+    parser.add_argument("--solver_cpu_time_limit", required=False, type=int, default=None,
+                        help="The maximal CPU time (in seconds) of the solver on each problem")
+    parser.add_argument("--solver_memory_limit_mb", required=False, type=int, default=None,
+                        help="The maximal memory (in megabytes) of the solver on each problem")
+    parser.add_argument("--storage_compaction_interval", required=False, type=int, default=None,
+                        help="The number of states after which the numeric storage of each action is compacted")
+    parser.add_argument("--use_solutions_cache", action="store_true",
+                        help="Whether to reuse the plans found for the test set problems using identical domains")
+    parser.add_argument("--max_solver_workers", required=False, type=int, default=1,
+                        help="The number of test set problems that are solved concurrently")
+    parser.add_argument("--max_validation_workers", required=False, type=int, default=1,
+                        help="The number of test set solutions that are validated concurrently")
+    parser.add_argument("--use_native_validator", action="store_true",
+                        help="Whether to validate the solutions in-process instead of running VAL")
 
     args = parser.parse_args()
     return args
@@ -182,7 +212,14 @@ def main():
                           domain_file_name=args.domain_file_name,
                           learning_algorithm=LearningAlgorithmType(args.learning_algorithm),
                           fluents_map_path=Path(args.fluents_map_path) if args.fluents_map_path else None,
-                          solver_type=SolverType(args.solver_type))
+                          solver_type=SolverType(args.solver_type),
+                          solver_cpu_time_limit=args.solver_cpu_time_limit,
+                          solver_memory_limit_mb=args.solver_memory_limit_mb,
+                          storage_compaction_interval=args.storage_compaction_interval,
+                          use_solutions_cache=args.use_solutions_cache,
+                          max_solver_workers=args.max_solver_workers,
+                          max_validation_workers=args.max_validation_workers,
+                          use_native_validator=args.use_native_validator)
     offline_learner.run_cross_validation()
 
 
@@ -1,15 +1,18 @@
 """Module responsible for calculating our approach for numeric precision and recall."""
 import csv
 import logging
-from collections import defaultdict
+from collections import defaultdict, Counter
 from pathlib import Path
-from typing import List, Dict, Tuple, Any, Union
+from typing import List, Dict, Tuple, Any, Union, Optional
 
+import numpy as np
 from pddl_plus_parser.lisp_parsers import DomainParser
 from pddl_plus_parser.models import Domain, Observation, ActionCall, State, MultiAgentObservation, \
     JointActionCall, MultiAgentComponent
 
-from experiments.performance_calculation_utils import _calculate_single_action_applicability_rate
+from experiments.performance_calculation_utils import StatesMatrix, calculate_operator_applicability, \
+    GroundedOperatorsCache
+from sam_learning.core import CompiledNumericModel
 from utilities import LearningAlgorithmType
 
 SEMANTIC_PRECISION_STATS = ["action_name", "num_trajectories", "precondition_precision", "precondition_recall", ]
@@ -24,6 +27,8 @@ class SemanticPerformanceCalculator:
     combined_stats: List[Dict[str, Any]]
     logger: logging.Logger
     results_dir_path: Path
+    model_operators: GroundedOperatorsCache
+    _learned_operators: Optional[GroundedOperatorsCache]
 
     def __init__(self, model_domain: Domain, observations: List[Union[Observation, MultiAgentObservation]],
                  working_directory_path: Path, learning_algorithm: LearningAlgorithmType):
@@ -33,32 +38,19 @@ class SemanticPerformanceCalculator:
         self.learning_algorithm = learning_algorithm
         self.combined_stats = []
         self.results_dir_path = working_directory_path / "results_directory"
+        self.model_operators = GroundedOperatorsCache(model_domain)
+        self._learned_operators = None
 
-    def _calculate_action_applicability_rate(
-            self, action_call: Union[ActionCall, JointActionCall], learned_domain: Domain,
-            num_false_negatives: Dict[str, int],
-            num_false_positives: Dict[str, int], num_true_positives: Dict[str, int], observed_state: State) -> None:
-        """Test whether an action is applicable in both the model domain and the generated domain.
+    def _get_learned_operators(self, learned_domain: Domain) -> GroundedOperatorsCache:
+        """Returns the grounded operators cache of the learned domain, replacing the cache of the previous model.
 
-        :param action_call: the action call that is tested for applicability.
         :param learned_domain: the domain that was learned using the action model learning algorithm.
-        :param num_false_negatives: the dictionary mapping between the action name and the number of false negative
-            executions.
-        :param num_false_positives: the dictionary mapping between the action name and the number of false positive
-            executions.
-        :param num_true_positives: the dictionary mapping between the action name and the number of true positive
-            executions.
-        :param observed_state: the state that is currently being tested.
+        :return: the grounded operators cache of the learned domain.
         """
-        if isinstance(action_call, JointActionCall):
-            for action in action_call.actions:
-                _calculate_single_action_applicability_rate(
-                    action, learned_domain, self.model_domain, num_false_negatives, num_false_positives,
-                    num_true_positives, observed_state)
-        else:
-            _calculate_single_action_applicability_rate(
-                action_call, learned_domain, self.model_domain, num_false_negatives, num_false_positives,
-                num_true_positives, observed_state)
+        if self._learned_operators is None or self._learned_operators.domain is not learned_domain:
+            self._learned_operators = GroundedOperatorsCache(learned_domain)
+
+        return self._learned_operators
 
     @staticmethod
     def _extract_states_and_actions(observation: Union[Observation, MultiAgentObservation]) -> Tuple[
@@ -84,27 +76,44 @@ class SemanticPerformanceCalculator:
         return observed_states, executed_actions
 
     def calculate_preconditions_semantic_performance(
-            self, learned_domain: Domain) -> Tuple[Dict[str, float], Dict[str, float]]:
+            self, learned_domain: Domain, compiled_models: Optional[Dict[str, CompiledNumericModel]] = None
+    ) -> Tuple[Dict[str, float], Dict[str, float]]:
         """Calculates the precision recall values of the learned preconditions.
 
         :param learned_domain: the action model that was learned using the action model learning algorithm
+        :param compiled_models: the compiled numeric models of the learned actions, the numeric preconditions of these
+            actions are checked in matrix form.
         :return: the precision and recall dictionaries.
         """
+        compiled_models = compiled_models or {}
         num_true_positives = defaultdict(int)
         num_false_negatives = defaultdict(int)
         num_false_positives = defaultdict(int)
+        learned_operators = self._get_learned_operators(learned_domain)
         for observation in self.dataset_observations:
             observed_states, executed_actions = self._extract_states_and_actions(observation)
+            if len(observed_states) == 0:
+                continue
+
+            states_matrix = StatesMatrix(observed_states)
+            action_calls_count = Counter()
             for action_call in executed_actions:
                 actions_to_check = action_call.actions if isinstance(action_call, JointActionCall) else [action_call]
-                for action in actions_to_check:
-                    for observed_state in observed_states:
-                        if action.name not in learned_domain.actions:
-                            break
-
-                        self._calculate_action_applicability_rate(
-                            action, learned_domain, num_false_negatives, num_false_positives, num_true_positives,
-                            observed_state)
+                action_calls_count.update((action.name, tuple(action.parameters)) for action in actions_to_check
+                                          if action.name in learned_domain.actions)
+
+            for (action_name, parameters), num_calls in action_calls_count.items():
+                action_call = ActionCall(name=action_name, grounded_parameters=list(parameters))
+                is_applicable_in_test = calculate_operator_applicability(
+                    learned_operators.get_operator(action_call), states_matrix, compiled_models.get(action_name))
+                is_applicable_in_model = calculate_operator_applicability(
+                    self.model_operators.get_operator(action_call), states_matrix)
+                num_true_positives[action_name] += \
+                    num_calls * int(np.sum(is_applicable_in_test == is_applicable_in_model))
+                num_false_positives[action_name] += \
+                    num_calls * int(np.sum(is_applicable_in_test & ~is_applicable_in_model))
+                num_false_negatives[action_name] += \
+                    num_calls * int(np.sum(~is_applicable_in_test & is_applicable_in_model))
 
         precision_dict = {}
         recall_dict = {}
@@ -114,15 +123,17 @@ class SemanticPerformanceCalculator:
 
         return precision_dict, recall_dict
 
-    def calculate_semantic_performance(self, learned_domain_path: Path, num_used_observations: int):
+    def calculate_semantic_performance(self, learned_domain_path: Path, num_used_observations: int,
+                                       compiled_models: Optional[Dict[str, CompiledNumericModel]] = None):
         """Calculate the semantic precision and recall of the learned domain.
 
         :param learned_domain_path:
         :param num_used_observations:
+        :param compiled_models: the compiled numeric models of the learned actions.
         :return:
         """
         learned_domain = DomainParser(domain_path=learned_domain_path, partial_parsing=False).parse_domain()
-        precision, recall = self.calculate_preconditions_semantic_performance(learned_domain)
+        precision, recall = self.calculate_preconditions_semantic_performance(learned_domain, compiled_models)
         for action_name in learned_domain.actions:
             action_stats = {
                 "action_name": action_name,
@@ -5,9 +5,9 @@ from typing import List
 from typing import Optional
 
 from pddl_plus_parser.lisp_parsers import DomainParser
-from pddl_plus_parser.lisp_parsers import ProblemParser, TrajectoryParser
 
 from experiments import NumericPerformanceCalculator
+from experiments.observations_loader import ObservationsLoader, OBSERVATIONS_CACHE_DIRECTORY_NAME
 from utilities import LearningAlgorithmType
 
 
@@ -23,17 +23,12 @@ def init_numeric_performance_calculator(working_directory_path: Path, domain_fil
     :return: the initialized numeric performance calculator object.
     """
     domain_path = working_directory_path / domain_file_name
-    model_domain = partial_domain = DomainParser(domain_path=domain_path, partial_parsing=False).parse_domain()
-    observations = []
-    for trajectory_file_path in working_directory_path.glob("*.trajectory"):
-        problem_path = working_directory_path / f"{trajectory_file_path.stem}.pddl"
-        problem = ProblemParser(problem_path, partial_domain).parse_problem()
-        if executing_agents is not None:
-            new_observation = TrajectoryParser(partial_domain, problem).parse_trajectory(
-                trajectory_file_path, executing_agents=executing_agents)
-        else:
-            new_observation = TrajectoryParser(partial_domain, problem).parse_trajectory(trajectory_file_path)
-        observations.append(new_observation)
+    model_domain = DomainParser(domain_path=domain_path, partial_parsing=False).parse_domain()
+    observations_loader = ObservationsLoader(
+        domain_path, partial_parsing=False,
+        cache_directory_path=working_directory_path / OBSERVATIONS_CACHE_DIRECTORY_NAME,
+        executing_agents=executing_agents)
+    observations = observations_loader.load_directory_observations(working_directory_path)
 
     return NumericPerformanceCalculator(model_domain=model_domain,
                                         observations=observations,
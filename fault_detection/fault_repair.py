@@ -1,23 +1,20 @@
 """Module that repairs faulty domains by fixing the action that contains the defect."""
+import copy
 import json
 import logging
-import re
 from pathlib import Path
 from typing import List, Tuple, Optional, Dict, NoReturn
 
 from pddl_plus_parser.exporters import ENHSPParser
 from pddl_plus_parser.exporters.numeric_trajectory_exporter import parse_action_call
 from pddl_plus_parser.lisp_parsers import DomainParser, ProblemParser
-from pddl_plus_parser.models import State, Observation, Operator, ActionCall, Domain
+import numpy as np
+from pddl_plus_parser.models import State, Observation, Operator, ActionCall, Domain, Action
 
 from fault_detection.defect_types import RepairAlgorithmType
-from sam_learning.core import LearnerDomain
+from sam_learning.core import LearnerDomain, CompiledNumericModel, ConditionType, compile_numeric_model
 from sam_learning.learners import NumericSAMLearner, ObliqueTreeModelLearner, SVCModelLearner
-from validators import VALID_PLAN, GOAL_NOT_REACHED, INAPPLICABLE_PLAN
-from validators.validator_script_data import run_validate_script
-
-FAULTY_ACTION_LOCATOR_REGEX = re.compile(r"Plan failed because of unsatisfied precondition in:\n\((\w+) [\w+ ]*\)",
-                                         flags=re.MULTILINE)
+from validators import validate_plan
 
 
 class FaultRepair:
@@ -27,6 +24,7 @@ class FaultRepair:
     model_domain_file_name: str
     model_domain_file_path: Path
     model_domain: Domain
+    model_compiled_actions: Dict[str, Tuple[Action, CompiledNumericModel]]
     fluents_map: Dict[str, List[str]]
     diagnosis_statistics: List[Dict[str, str]]
     logger: logging.Logger
@@ -41,6 +39,7 @@ class FaultRepair:
 
         self.diagnosis_statistics = []
         self.logger = logging.getLogger(__name__)
+        self.model_compiled_actions = self._compile_numeric_actions(self.model_domain)
 
     def _validate_applied_action(self, faulty_action_name: str, valid_next_state: State,
                                  faulty_next_state: State) -> bool:
@@ -76,20 +75,74 @@ class FaultRepair:
 
         return True
 
-    def _generate_grounded_operators(self, action_name: str,
-                                     faulty_domain: Domain, parameters: List[str]) -> Tuple[Operator, Operator]:
-        """Generates the valid and faulty grounded operators from the action descriptor.
+    def _compile_numeric_actions(self, domain: Domain) -> Dict[str, Tuple[Action, CompiledNumericModel]]:
+        """Compiles the numeric preconditions and effects of the domain's actions into matrix form.
+
+        Note: the returned actions contain only the discrete part of the original actions, so their operators check
+            and apply only the predicates. Actions with disjunctive numeric preconditions, conditional or universal
+            effects or non-linear numeric expressions are not compiled and are applied using their operators.
 
-        :param action_name: the name of the action that contains a defect.
-        :param faulty_domain: the domain the contains a defect.
+        :param domain: the domain containing the actions to compile.
+        :return: mapping between the names of the compiled actions to their discrete part and their compiled model.
+        """
+        compiled_actions = {}
+        for action_name, action in domain.actions.items():
+            if len(action.disjunctive_numeric_preconditions) > 0 or len(action.conditional_effects) > 0 or \
+                    len(action.universal_effects) > 0:
+                continue
+
+            try:
+                compiled_model = compile_numeric_model(
+                    action_name, ([condition.to_pddl() for condition in action.numeric_preconditions],
+                                  ConditionType.conjunctive), [effect.to_pddl() for effect in action.numeric_effects])
+
+            except ValueError:
+                self.logger.debug(f"The numeric expressions of {action_name} are not linear, not compiling it.")
+                continue
+
+            discrete_action = copy.copy(action)
+            discrete_action.numeric_preconditions = set()
+            discrete_action.numeric_effects = set()
+            compiled_actions[action_name] = (discrete_action, compiled_model)
+
+        return compiled_actions
+
+    def _apply_action(self, domain: Domain, compiled_actions: Dict[str, Tuple[Action, CompiledNumericModel]],
+                      action_name: str, parameters: List[str], previous_state: State) -> State:
+        """Applies the grounded action on the state, using the compiled model of the action when it exists.
+
+        :param domain: the domain containing the action.
+        :param compiled_actions: the compiled actions of the domain.
+        :param action_name: the name of the applied action.
         :param parameters: the parameters with which the action was executed.
-        :return: the faulty and valid grounded operators.
+        :param previous_state: the state the action is applied on.
+        :return: the state following the action's execution.
         """
-        valid_operator = Operator(action=self.model_domain.actions[action_name],
-                                  domain=self.model_domain, grounded_action_call=parameters)
-        possibly_faulty_operator = Operator(action=faulty_domain.actions[action_name],
-                                            domain=faulty_domain, grounded_action_call=parameters)
-        return possibly_faulty_operator, valid_operator
+        if action_name not in compiled_actions:
+            return Operator(action=domain.actions[action_name], domain=domain,
+                            grounded_action_call=parameters).apply(previous_state)
+
+        discrete_action, compiled_model = compiled_actions[action_name]
+        grounded_fluent_names = compiled_model.ground_fluent_names(
+            dict(zip(discrete_action.parameter_names, parameters)))
+        if any(fluent_name not in previous_state.state_fluents for fluent_name in grounded_fluent_names):
+            return Operator(action=domain.actions[action_name], domain=domain,
+                            grounded_action_call=parameters).apply(previous_state)
+
+        previous_values = np.array([[previous_state.state_fluents[fluent_name].value
+                                     for fluent_name in grounded_fluent_names]], dtype=np.float64)
+        if not compiled_model.preconditions_hold(previous_values)[0]:
+            self.logger.warning("Tried to apply an action to a state where the action's preconditions don't hold!")
+            raise ValueError()
+
+        next_state = Operator(action=discrete_action, domain=domain,
+                              grounded_action_call=parameters).apply(previous_state)
+        for fluent_name, next_value in zip(grounded_fluent_names, compiled_model.apply_effects(previous_values)[0]):
+            next_fluent = copy.copy(previous_state.state_fluents[fluent_name])
+            next_fluent.set_value(float(next_value))
+            next_state.state_fluents[fluent_name] = next_fluent
+
+        return next_state
 
     def _is_plan_applicable(self, problem_file_path: Path, solution_file_path: Path) -> Tuple[bool, Optional[str]]:
         """Validates that the solution file contains a valid plan.
@@ -99,19 +152,13 @@ class FaultRepair:
 
         :return: whether the plan is valid and the name of the faulty action if it is not.
         """
-        validation_file_path = \
-            run_validate_script(domain_file_path=self.model_domain_file_path,
-                                problem_file_path=problem_file_path, solution_file_path=solution_file_path)
-
-        with open(validation_file_path, "r") as validation_file:
-            validation_file_content = validation_file.read()
-            if VALID_PLAN in validation_file_content or GOAL_NOT_REACHED in validation_file_content:
-                return True, None
+        validation_result = validate_plan(domain_file_path=self.model_domain_file_path,
+                                          problem_file_path=problem_file_path, solution_file_path=solution_file_path)
+        if validation_result.is_valid or validation_result.goal_not_reached:
+            return True, None
 
-            if INAPPLICABLE_PLAN in validation_file_content:
-                match = FAULTY_ACTION_LOCATOR_REGEX.search(validation_file_content)
-                faulty_action_name = match.group(1)
-                return False, faulty_action_name
+        if validation_result.is_inapplicable:
+            return False, validation_result.failed_action_name
 
     def _observe_single_plan(
             self, faulty_domain: Domain, problem_file_path: Path,
@@ -133,6 +180,7 @@ class FaultRepair:
         valid_observation = Observation()
         faulty_observation = Observation()
         faulty_action_name = None
+        faulty_compiled_actions = self._compile_numeric_actions(faulty_domain)
         valid_previous_state = State(predicates=problem.initial_state_predicates,
                                      fluents=problem.initial_state_fluents, is_init=True)
         faulty_previous_state = valid_previous_state
@@ -142,10 +190,10 @@ class FaultRepair:
             descriptor = parse_action_call(grounded_action)
             action_name = descriptor.name
             parameters = descriptor.parameters
-            faulty_operator, valid_operator = self._generate_grounded_operators(action_name, faulty_domain, parameters)
-
-            valid_next_state = valid_operator.apply(valid_previous_state)
-            faulty_next_state = faulty_operator.apply(faulty_previous_state)
+            valid_next_state = self._apply_action(self.model_domain, self.model_compiled_actions, action_name,
+                                                  parameters, valid_previous_state)
+            faulty_next_state = self._apply_action(faulty_domain, faulty_compiled_actions, action_name, parameters,
+                                                   faulty_previous_state)
             valid_observation.add_component(valid_previous_state, ActionCall(action_name, parameters), valid_next_state)
             is_state_identical = self._validate_applied_action(action_name, valid_next_state, faulty_next_state)
             if not is_state_identical:
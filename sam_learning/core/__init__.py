@@ -1,8 +1,13 @@
+from .compact_trajectory import CompactTrajectory, convert_to_compact_trajectory
+from .compiled_numeric_model import CompiledNumericModel, compile_numeric_model
 from .dependency_set import DependencySet
 from .exceptions import NotSafeActionError
+from .fluent_values_matrix import FluentValuesMatrix
+from .incremental_convex_hull import IncrementalConvexHull
 from .learner_domain import LearnerAction, LearnerDomain
 from .learning_types import EquationSolutionType, ConditionType
 from .literals_cnf import LiteralCNF
+from .literals_interner import LiteralsInterner
 from .matching_utils import extract_effects, contains_duplicates, create_signature_permutations, \
     create_fully_observable_predicates
 from .numeric_fluent_learner_algorithm import NumericFluentStateStorage, ConditionType
@@ -12,5 +17,7 @@ from .numeric_utils import construct_multiplication_strings, prettify_coefficien
 from .oblique_tree_fluents_learning import ObliqueTreeFluentsLearning
 from .polynomial_fluents_learning_algorithm import PolynomialFluentsLearningAlgorithm
 from .predicates_matcher import PredicatesMatcher
+from .regression_statistics import LinearRegressionStatistics
+from .streaming_trajectory import StreamingObservation, iterate_trajectory_expressions
 from .svm_fluents_learning import SVMFluentsLearning
 from .vocabulary_creator import VocabularyCreator
@@ -0,0 +1,248 @@
+"""Module containing the compact columnar representation of observed trajectories."""
+import json
+import logging
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Union, Optional
+
+import numpy as np
+from pddl_plus_parser.models import Observation, State, ActionCall, GroundedPredicate, PDDLFunction, PDDLObject, \
+    Domain
+
+from sam_learning.core.learner_domain import LearnerDomain
+from sam_learning.core.literals_interner import LiteralsInterner
+
+METADATA_FILE_NAME = "metadata.json"
+FACTS_FILE_NAME = "facts.npy"
+COMPONENTS_FILE_NAME = "components.npy"
+FLUENTS_FILE_NAME = "fluents.npy"
+MISSING_ID = -1
+
+
+def _create_padded_table(rows: List[List[int]], row_length: int) -> np.ndarray:
+    """Creates an integer table from rows with different lengths, padding the rows with the missing ID.
+
+    :param rows: the rows of the table.
+    :param row_length: the minimal length of the table rows.
+    :return: the integer table.
+    """
+    table_width = max([row_length] + [len(row) for row in rows])
+    table = np.full((len(rows), table_width), MISSING_ID, dtype=np.int32)
+    for row_index, row in enumerate(rows):
+        table[row_index, :len(row)] = row
+
+    return table
+
+
+def convert_to_compact_trajectory(observation: Observation, output_directory_path: Path) -> None:
+    """Converts an observation to the compact trajectory format.
+
+    Note: the predicates, objects and action names are interned to integer IDs, the facts and the action calls are
+        stored as integer tables and the numeric fluents are stored as a (states x fluents) float64 matrix in which
+        fluents that are not defined in a state are set to NaN.
+
+    :param observation: the observation to convert.
+    :param output_directory_path: the directory in which the compact trajectory files are written.
+    """
+    output_directory_path.mkdir(parents=True, exist_ok=True)
+    objects, predicates, actions, fluents = (LiteralsInterner() for _ in range(4))
+    objects_types = {}
+    for object_name, pddl_object in observation.grounded_objects.items():
+        objects.intern(object_name)
+        objects_types[object_name] = pddl_object.type.name
+
+    states_ids = {}
+    facts_rows = []
+    fluents_rows = []
+    fluents_objects = {}
+
+    def intern_state(state: State) -> int:
+        if id(state) in states_ids:
+            return states_ids[id(state)]
+
+        state_index = len(fluents_rows)
+        states_ids[id(state)] = state_index
+        for grounded_predicates in state.state_predicates.values():
+            for grounded_predicate in grounded_predicates:
+                facts_rows.append([state_index, predicates.intern(grounded_predicate.name)] +
+                                  [objects.intern(object_name)
+                                   for object_name in grounded_predicate.object_mapping.values()])
+
+        state_fluents_values = {}
+        for fluent_str, fluent in state.state_fluents.items():
+            for object_name, object_type in fluent.signature.items():
+                objects_types.setdefault(object_name, object_type.name)
+
+            fluents_objects[fluent_str] = (fluent.name, [objects.intern(object_name)
+                                                         for object_name in fluent.signature])
+            state_fluents_values[fluents.intern(fluent_str)] = fluent.value
+
+        fluents_rows.append(state_fluents_values)
+        return state_index
+
+    components_rows = []
+    for component in observation.components:
+        previous_state_index = intern_state(component.previous_state)
+        next_state_index = intern_state(component.next_state)
+        action_call = component.grounded_action_call
+        components_rows.append([previous_state_index, next_state_index, actions.intern(action_call.name)] +
+                               [objects.intern(object_name) for object_name in action_call.parameters])
+
+    fluents_matrix = np.full((len(fluents_rows), len(fluents)), np.nan, dtype=np.float64)
+    for state_index, state_fluents_values in enumerate(fluents_rows):
+        for fluent_id, value in state_fluents_values.items():
+            fluents_matrix[state_index, fluent_id] = value
+
+    metadata = {
+        "objects": objects.indexed_literals,
+        "objects_types": [objects_types.get(object_name) for object_name in objects.indexed_literals],
+        "problem_objects": [objects.literals_indexes[object_name] for object_name in observation.grounded_objects],
+        "predicates": predicates.indexed_literals,
+        "actions": actions.indexed_literals,
+        "fluents": [[fluent_str, *fluents_objects[fluent_str]] for fluent_str in fluents.indexed_literals],
+    }
+    with open(output_directory_path / METADATA_FILE_NAME, "wt") as metadata_file:
+        json.dump(metadata, metadata_file)
+
+    np.save(output_directory_path / FACTS_FILE_NAME, _create_padded_table(facts_rows, row_length=2))
+    np.save(output_directory_path / COMPONENTS_FILE_NAME, _create_padded_table(components_rows, row_length=3))
+    np.save(output_directory_path / FLUENTS_FILE_NAME, fluents_matrix)
+
+
+class CompactTrajectory:
+    """Reader of trajectories stored in the compact format.
+
+    Note: the fluents matrix is memory-mapped so that the numeric values are read directly from the file.
+    """
+
+    logger: logging.Logger
+    trajectory_directory_path: Path
+    object_names: List[str]
+    object_types: List[Optional[str]]
+    problem_object_ids: List[int]
+    predicate_names: List[str]
+    action_names: List[str]
+    fluent_names: List[str]
+    fluents_ids: Dict[str, int]
+    facts: np.ndarray
+    components: np.ndarray
+    fluents_matrix: np.ndarray
+
+    def __init__(self, trajectory_directory_path: Path):
+        self.logger = logging.getLogger(__name__)
+        self.trajectory_directory_path = trajectory_directory_path
+        with open(trajectory_directory_path / METADATA_FILE_NAME, "rt") as metadata_file:
+            metadata = json.load(metadata_file)
+
+        self.object_names = metadata["objects"]
+        self.object_types = metadata["objects_types"]
+        self.problem_object_ids = metadata["problem_objects"]
+        self.predicate_names = metadata["predicates"]
+        self.action_names = metadata["actions"]
+        self._fluents_data = metadata["fluents"]
+        self.fluent_names = [fluent_str for fluent_str, _, _ in self._fluents_data]
+        self.fluents_ids = {fluent_str: fluent_id for fluent_id, fluent_str in enumerate(self.fluent_names)}
+        self.facts = np.load(trajectory_directory_path / FACTS_FILE_NAME)
+        self.components = np.load(trajectory_directory_path / COMPONENTS_FILE_NAME)
+        self.fluents_matrix = np.load(trajectory_directory_path / FLUENTS_FILE_NAME, mmap_mode="r")
+
+    def __len__(self) -> int:
+        return self.components.shape[0]
+
+    @property
+    def previous_state_indexes(self) -> np.ndarray:
+        """The indexes of the states prior to the execution of each component's action."""
+        return self.components[:, 0]
+
+    @property
+    def next_state_indexes(self) -> np.ndarray:
+        """The indexes of the states following the execution of each component's action."""
+        return self.components[:, 1]
+
+    def get_action_call(self, component_index: int) -> ActionCall:
+        """Returns the action call of the trajectory component.
+
+        :param component_index: the index of the component in the trajectory.
+        :return: the grounded action call.
+        """
+        component = self.components[component_index]
+        return ActionCall(name=self.action_names[component[2]],
+                          grounded_parameters=[self.object_names[object_id] for object_id in component[3:]
+                                               if object_id != MISSING_ID])
+
+    def get_fluent_columns(self, fluent_names: List[str],
+                           state_indexes: Optional[np.ndarray] = None) -> np.ndarray:
+        """Slices the values of the fluents from the fluents matrix.
+
+        :param fluent_names: the grounded fluents whose values are returned.
+        :param state_indexes: the states to return the values for, all the states are returned if not given.
+        :return: the (states x fluents) matrix of the values, NaN marks fluents that are not defined in the state.
+        """
+        columns = [self.fluents_ids[fluent_name] for fluent_name in fluent_names]
+        if state_indexes is None:
+            return self.fluents_matrix[:, columns]
+
+        return self.fluents_matrix[np.ix_(state_indexes, columns)]
+
+    def _create_states_predicates(self, domain: Union[Domain, LearnerDomain]) -> Dict[int, Dict[str, set]]:
+        """Creates the grounded predicates of each of the states from the facts table.
+
+        :param domain: the domain containing the lifted predicates.
+        :return: mapping between the state index and its grounded predicates.
+        """
+        states_predicates = defaultdict(lambda: defaultdict(set))
+        for fact in self.facts:
+            lifted_predicate = domain.predicates[self.predicate_names[fact[1]]]
+            object_mapping = {parameter_name: self.object_names[object_id] for parameter_name, object_id in
+                              zip(lifted_predicate.signature, fact[2:])}
+            states_predicates[int(fact[0])][lifted_predicate.untyped_representation].add(GroundedPredicate(
+                name=lifted_predicate.name, signature=lifted_predicate.signature, object_mapping=object_mapping))
+
+        return states_predicates
+
+    def _create_state_fluents(self, domain: Union[Domain, LearnerDomain], state_index: int) -> Dict[str, PDDLFunction]:
+        """Creates the grounded numeric fluents of the state from the fluents matrix.
+
+        :param domain: the domain containing the types of the objects.
+        :param state_index: the index of the state.
+        :return: the grounded fluents defined in the state.
+        """
+        state_fluents = {}
+        state_values = self.fluents_matrix[state_index]
+        for fluent_id, (fluent_str, fluent_name, object_ids) in enumerate(self._fluents_data):
+            if np.isnan(state_values[fluent_id]):
+                continue
+
+            fluent = PDDLFunction(name=fluent_name, signature={
+                self.object_names[object_id]: domain.types[self.object_types[object_id]] for object_id in object_ids})
+            fluent.set_value(float(state_values[fluent_id]))
+            state_fluents[fluent_str] = fluent
+
+        return state_fluents
+
+    def to_observation(self, domain: Union[Domain, LearnerDomain], include_fluents: bool = True) -> Observation:
+        """Creates the observation represented by the compact trajectory.
+
+        :param domain: the domain containing the lifted predicates and the types of the objects.
+        :param include_fluents: whether to create the numeric fluents of the states, learners that read the fluents
+            directly from the fluents matrix should not create them.
+        :return: the observation with the states containing the grounded predicates (and fluents).
+        """
+        observation = Observation()
+        observation.add_problem_objects({
+            self.object_names[object_id]: PDDLObject(name=self.object_names[object_id],
+                                                     type=domain.types[self.object_types[object_id]])
+            for object_id in self.problem_object_ids})
+        states_predicates = self._create_states_predicates(domain)
+        states = {}
+        for state_index in np.unique(self.components[:, :2]):
+            state_index = int(state_index)
+            state_fluents = self._create_state_fluents(domain, state_index) if include_fluents else {}
+            states[state_index] = State(predicates=states_predicates[state_index], fluents=state_fluents,
+                                        is_init=state_index == 0)
+
+        for component_index, (previous_state_index, next_state_index) in enumerate(self.components[:, :2]):
+            observation.add_component(states[int(previous_state_index)], self.get_action_call(component_index),
+                                      states[int(next_state_index)])
+
+        return observation
@@ -0,0 +1,290 @@
+"""Module containing the matrix form of the linear numeric preconditions and effects that were learned for an action."""
+import re
+from typing import List, Dict, Tuple, Union
+
+import numpy as np
+
+from sam_learning.core.learning_types import ConditionType
+
+EXPRESSION_TOKENS_REGEX = re.compile(r"\(|\)|[^\s()]+")
+NUMERIC_OPERATORS = {"+", "-", "*", "/"}
+ASSIGNMENT_OPERATORS = {"assign", "increase", "decrease"}
+CONDITION_OPERATORS = {"<=", ">=", "=", "and"}
+
+Expression = Union[str, List["Expression"]]
+LinearExpression = Tuple[Dict[str, float], float]  # fluent -> coefficient, constant.
+
+
+def _parse_expressions(expressions_str: str) -> List[Expression]:
+    """Parses the PDDL expressions in the string into nested lists of tokens.
+
+    :param expressions_str: the string containing one or more PDDL expressions.
+    :return: the parsed expressions.
+    """
+    expressions_stack = [[]]
+    for token in EXPRESSION_TOKENS_REGEX.findall(expressions_str):
+        if token == "(":
+            expressions_stack.append([])
+
+        elif token == ")":
+            if len(expressions_stack) == 1:
+                raise ValueError(f"Unbalanced parentheses in the expression - {expressions_str}")
+
+            closed_expression = expressions_stack.pop()
+            expressions_stack[-1].append(closed_expression)
+
+        else:
+            expressions_stack[-1].append(token)
+
+    if len(expressions_stack) != 1:
+        raise ValueError(f"Unbalanced parentheses in the expression - {expressions_str}")
+
+    return expressions_stack[0]
+
+
+def _fluent_representation(expression: List[str]) -> str:
+    """Returns the untyped representation of the fluent as it appears in the learned model.
+
+    :param expression: the parsed fluent, i.e., its name followed by its parameters.
+    :return: the untyped representation of the fluent.
+    """
+    fluent_name, *parameters = expression
+    return f"({fluent_name} {' '.join(parameters)})"
+
+
+def _combine(first: LinearExpression, second: LinearExpression, second_sign: float = 1.0) -> LinearExpression:
+    """Sums two linear expressions.
+
+    :param first: the first linear expression.
+    :param second: the second linear expression.
+    :param second_sign: the sign multiplying the second expression (-1 for subtraction).
+    :return: the linear expression of the sum.
+    """
+    coefficients = dict(first[0])
+    for fluent, coefficient in second[0].items():
+        coefficients[fluent] = coefficients.get(fluent, 0.0) + second_sign * coefficient
+
+    return coefficients, first[1] + second_sign * second[1]
+
+
+def _scale(expression: LinearExpression, factor: float) -> LinearExpression:
+    """Multiplies the linear expression by a constant.
+
+    :param expression: the linear expression.
+    :param factor: the multiplying constant.
+    :return: the scaled linear expression.
+    """
+    return {fluent: factor * coefficient for fluent, coefficient in expression[0].items()}, factor * expression[1]
+
+
+def _to_linear_expression(expression: Expression) -> LinearExpression:
+    """Converts a parsed numeric expression to its linear form.
+
+    :param expression: the parsed numeric expression.
+    :return: the coefficients of the fluents and the constant of the expression.
+    """
+    if isinstance(expression, str):
+        return {}, float(expression)
+
+    if len(expression) == 0 or expression[0] not in NUMERIC_OPERATORS:
+        return {_fluent_representation(expression): 1.0}, 0.0
+
+    operator, *operands = expression
+    if operator == "-" and len(operands) == 1:
+        return _scale(_to_linear_expression(operands[0]), -1.0)
+
+    if len(operands) != 2:
+        raise ValueError(f"The numeric operator {operator} must have two operands - {expression}")
+
+    left_operand, right_operand = (_to_linear_expression(operand) for operand in operands)
+    if operator == "+":
+        return _combine(left_operand, right_operand)
+
+    if operator == "-":
+        return _combine(left_operand, right_operand, second_sign=-1.0)
+
+    if operator == "*" and len(left_operand[0]) == 0:
+        return _scale(right_operand, left_operand[1])
+
+    if operator == "*" and len(right_operand[0]) == 0:
+        return _scale(left_operand, right_operand[1])
+
+    if operator == "/" and len(right_operand[0]) == 0:
+        return _scale(left_operand, 1 / right_operand[1])
+
+    raise ValueError(f"The expression is not linear - {expression}")
+
+
+def _to_inequalities(condition: Expression) -> List[LinearExpression]:
+    """Converts a parsed numeric condition to linear inequalities of the form a x + c <= 0.
+
+    :param condition: the parsed numeric condition.
+    :return: the linear expressions that must be non-positive for the condition to hold.
+    """
+    if isinstance(condition, str) or len(condition) == 0 or condition[0] not in CONDITION_OPERATORS:
+        raise ValueError(f"The numeric condition is not supported - {condition}")
+
+    operator, *operands = condition
+    if operator == "and":
+        return [inequality for operand in operands for inequality in _to_inequalities(operand)]
+
+    left_side, right_side = (_to_linear_expression(operand) for operand in operands)
+    difference = _combine(left_side, right_side, second_sign=-1.0)
+    if operator == "<=":
+        return [difference]
+
+    if operator == ">=":
+        return [_scale(difference, -1.0)]
+
+    return [difference, _scale(difference, -1.0)]
+
+
+class CompiledNumericModel:
+    """The matrix form of the linear numeric preconditions and effects of a single lifted action.
+
+    Note: the preconditions are a disjunction of polytopes, each represented by the inequalities A x <= b, where x
+        contains the values of the fluents in the order of fluent_names. Conjunctive preconditions are a single
+        polytope. The effects are represented by a single matrix E so that the values after applying the action are
+        E [x, 1], all the effects are evaluated on the values prior to the action's execution as in PDDL.
+    """
+
+    action_name: str
+    fluent_names: List[str]
+    preconditions: List[Tuple[np.ndarray, np.ndarray]]
+    effects_matrix: np.ndarray
+    affected_fluents: List[str]
+
+    def __init__(self, action_name: str, fluent_names: List[str], preconditions: List[Tuple[np.ndarray, np.ndarray]],
+                 effects_matrix: np.ndarray, affected_fluents: List[str]):
+        self.action_name = action_name
+        self.fluent_names = fluent_names
+        self.preconditions = preconditions
+        self.effects_matrix = effects_matrix
+        self.affected_fluents = affected_fluents
+
+    def ground_fluent_names(self, parameters_map: Dict[str, str]) -> List[str]:
+        """Grounds the fluents of the model so that their values can be taken from grounded states.
+
+        :param parameters_map: mapping between the action's parameters and the objects the action was called with.
+        :return: the grounded fluents in the order of the model's fluents.
+        """
+        grounded_fluent_names = []
+        for fluent in self.fluent_names:
+            fluent_name, *parameters = fluent.strip("()").split()
+            grounded_fluent_names.append(_fluent_representation(
+                [fluent_name, *[parameters_map.get(parameter, parameter) for parameter in parameters]]))
+
+        return grounded_fluent_names
+
+    def preconditions_hold(self, fluents_values: np.ndarray) -> np.ndarray:
+        """Checks whether the numeric preconditions hold in each of the states.
+
+        :param fluents_values: (states x fluents) matrix with the values of the model's fluents in the states.
+        :return: boolean vector with an entry per state.
+        """
+        preconditions_hold = np.zeros(fluents_values.shape[0], dtype=bool)
+        for inequalities_matrix, bounds in self.preconditions:
+            preconditions_hold |= np.all(fluents_values @ inequalities_matrix.T <= bounds, axis=1)
+
+        return preconditions_hold
+
+    def apply_effects(self, fluents_values: np.ndarray) -> np.ndarray:
+        """Applies the numeric effects of the action on each of the states.
+
+        :param fluents_values: (states x fluents) matrix with the values of the model's fluents in the states.
+        :return: (states x fluents) matrix with the values of the model's fluents after applying the action.
+        """
+        values_with_bias = np.c_[fluents_values, np.ones(fluents_values.shape[0])]
+        return (values_with_bias @ self.effects_matrix.T)[:, :-1]
+
+
+def _create_effects_matrix(parsed_effects: List[Expression], fluents_indexes: Dict[str, int]) -> np.ndarray:
+    """Combines the numeric effects into a single matrix operating on the fluents' values (with a bias term).
+
+    Note: the row of each assigned fluent is computed from the values prior to the action's execution, so the
+        matrix does not depend on the order of the effects.
+
+    :param parsed_effects: the parsed assignment effects of the action.
+    :param fluents_indexes: the index of each fluent in the model.
+    :return: the matrix of the combined effects.
+    """
+    num_fluents = len(fluents_indexes)
+    effects_matrix = np.eye(num_fluents + 1)
+    for operator, assigned_fluent, assigned_expression in parsed_effects:
+        coefficients, constant = _to_linear_expression(assigned_expression)
+        effect_row = np.zeros(num_fluents + 1)
+        for fluent, coefficient in coefficients.items():
+            effect_row[fluents_indexes[fluent]] += coefficient
+
+        effect_row[num_fluents] = constant
+        assigned_index = fluents_indexes[_fluent_representation(assigned_fluent)]
+        if operator == "assign":
+            effects_matrix[assigned_index] = effect_row
+
+        elif operator == "increase":
+            effects_matrix[assigned_index] += effect_row
+
+        else:
+            effects_matrix[assigned_index] -= effect_row
+
+    return effects_matrix
+
+
+def compile_numeric_model(action_name: str, numeric_preconditions: Tuple[List[str], ConditionType],
+                          numeric_effects: List[str]) -> CompiledNumericModel:
+    """Compiles the learned numeric preconditions and effects of the action into their matrix form.
+
+    :param action_name: the name of the action.
+    :param numeric_preconditions: the learned numeric preconditions and their type (conjunctive / disjunctive).
+    :param numeric_effects: the learned numeric effects.
+    :return: the compiled numeric model of the action.
+    """
+    preconditions_inequalities = []
+    if len(numeric_preconditions) > 0:
+        conditions, condition_type = numeric_preconditions
+        parsed_conditions = [_parse_expressions(condition) for condition in conditions]
+        if condition_type == ConditionType.disjunctive:
+            preconditions_inequalities = [[inequality for condition in expressions for inequality in
+                                           _to_inequalities(condition)] for expressions in parsed_conditions]
+
+        else:
+            preconditions_inequalities = [[inequality for expressions in parsed_conditions for condition in expressions
+                                           for inequality in _to_inequalities(condition)]]
+
+    else:
+        preconditions_inequalities.append([])
+
+    parsed_effects = [expression for effect in numeric_effects for expression in _parse_expressions(effect)]
+    if any(isinstance(effect, str) or len(effect) != 3 or effect[0] not in ASSIGNMENT_OPERATORS
+           for effect in parsed_effects):
+        raise ValueError(f"The numeric effects of the action {action_name} are not supported - {numeric_effects}")
+
+    fluents_indexes = {}
+    for polytope_inequalities in preconditions_inequalities:
+        for coefficients, _ in polytope_inequalities:
+            for fluent in coefficients:
+                fluents_indexes.setdefault(fluent, len(fluents_indexes))
+
+    for _, assigned_fluent, assigned_expression in parsed_effects:
+        fluents_indexes.setdefault(_fluent_representation(assigned_fluent), len(fluents_indexes))
+        for fluent in _to_linear_expression(assigned_expression)[0]:
+            fluents_indexes.setdefault(fluent, len(fluents_indexes))
+
+    preconditions = []
+    for polytope_inequalities in preconditions_inequalities:
+        inequalities_matrix = np.zeros((len(polytope_inequalities), len(fluents_indexes)))
+        bounds = np.zeros(len(polytope_inequalities))
+        for row_index, (coefficients, constant) in enumerate(polytope_inequalities):
+            for fluent, coefficient in coefficients.items():
+                inequalities_matrix[row_index, fluents_indexes[fluent]] = coefficient
+
+            bounds[row_index] = -constant
+
+        preconditions.append((inequalities_matrix, bounds))
+
+    affected_fluents = list(dict.fromkeys(_fluent_representation(assigned_fluent)
+                                          for _, assigned_fluent, _ in parsed_effects))
+    return CompiledNumericModel(action_name=action_name, fluent_names=list(fluents_indexes),
+                                preconditions=preconditions,
+                                effects_matrix=_create_effects_matrix(parsed_effects, fluents_indexes),
+                                affected_fluents=affected_fluents)
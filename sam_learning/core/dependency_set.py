@@ -1,11 +1,14 @@
 """Module representing the dependency set of an action."""
 import itertools
-from typing import Set, Dict, List, Tuple, Optional
+from types import MappingProxyType
+from typing import Set, Dict, List, Tuple, Optional, Iterable, Mapping, FrozenSet
 
 from pddl_plus_parser.models import Predicate
 
+from sam_learning.core.literals_interner import LiteralsInterner
 
-def create_antecedents_combination(antecedents: Set[str], max_antecedents_size) -> List[Set[str]]:
+
+def create_antecedents_combination(antecedents: Iterable[str], max_antecedents_size) -> List[Set[str]]:
     """Creates all possible subset combinations of antecedents.
 
     :param antecedents: the list of antecedents that may be trigger for conditional effects.
@@ -22,14 +25,42 @@ def create_antecedents_combination(antecedents: Set[str], max_antecedents_size)
 
 
 class DependencySet:
-    """Class representing the dependency set of an action."""
-    dependencies: Dict[str, List[Set[str]]]
+    """Class representing the dependency set of an action.
+
+    Note: the antecedents are stored as bitsets over the literals interned when the dependency set is initialized.
+    """
+    literals_interner: LiteralsInterner
+    antecedents: Dict[str, List[int]]
     max_size_antecedents: int
 
     def __init__(self, max_size_antecedents: int):
-        self.dependencies = {}
+        self.literals_interner = LiteralsInterner()
+        self.antecedents = {}
         self.max_size_antecedents = max_size_antecedents
 
+    @property
+    def dependencies(self) -> Mapping[str, Tuple[FrozenSet[str], ...]]:
+        """The antecedents of each of the literals represented as sets of literals.
+
+        Note: the view is created from the bitsets on each access and is read-only, the dependencies are changed by
+            assigning a new mapping or by the removal methods.
+
+        :return: the mapping between the literals and their possible antecedents.
+        """
+        return MappingProxyType({
+            literal: tuple(frozenset(self.literals_interner.from_bitset(antecedent)) for antecedent in antecedents)
+            for literal, antecedents in self.antecedents.items()})
+
+    @dependencies.setter
+    def dependencies(self, dependencies: Mapping[str, Iterable[Set[str]]]) -> None:
+        for antecedents in dependencies.values():
+            for antecedent in antecedents:
+                for literal in antecedent:
+                    self.literals_interner.intern(literal)
+
+        self.antecedents = {literal: [self.literals_interner.to_bitset(antecedent) for antecedent in antecedents]
+                            for literal, antecedents in dependencies.items()}
+
     def initialize_dependencies(self, lifted_literals: Set[Predicate]) -> None:
         """Initialize the dependencies with positive and negative literals.
 
@@ -37,8 +68,12 @@ class DependencySet:
         """
         literals_str = {literal.untyped_representation for literal in lifted_literals}
         literals_str.update({f"(not {literal.untyped_representation})" for literal in lifted_literals})
-        antecedents_combinations = create_antecedents_combination(literals_str, self.max_size_antecedents)
-        self.dependencies = {literal: antecedents_combinations.copy() for literal in literals_str}
+        sorted_literals = sorted(literals_str)
+        self.literals_interner = LiteralsInterner(sorted_literals)
+        antecedents_combinations = [
+            self.literals_interner.to_bitset(combination)
+            for combination in create_antecedents_combination(sorted_literals, self.max_size_antecedents)]
+        self.antecedents = {literal: antecedents_combinations.copy() for literal in literals_str}
 
     def remove_dependencies(self, literal: str, literals_to_remove: Set[str]) -> None:
         """Remove a dependency from the dependency set.
@@ -46,10 +81,35 @@ class DependencySet:
         :param literal: the literal that is dependent on the dependency.
         :param literals_to_remove: the literals that cannot be trigger candidates for the literal.
         """
-        dependencies_to_remove = create_antecedents_combination(literals_to_remove, self.max_size_antecedents)
-        for dependency in dependencies_to_remove:
-            if dependency in self.dependencies[literal]:
-                self.dependencies[literal].remove(dependency)
+        self.remove_literals_dependencies({literal}, literals_to_remove)
+
+    def _remove_antecedents(self, literal: str, literals_to_remove_bitset: int) -> None:
+        """Removes the antecedents composed only of the literals represented by the bitset.
+
+        :param literal: the literal that is dependent on the antecedents.
+        :param literals_to_remove_bitset: the bitset of the literals that cannot be trigger candidates for the literal.
+        """
+        self.antecedents[literal] = [antecedent for antecedent in self.antecedents[literal]
+                                     if antecedent & ~literals_to_remove_bitset]
+
+    def remove_literals_dependencies(self, literals: Set[str], literals_to_remove: Set[str]) -> None:
+        """Remove the dependencies composed only of the literals to remove from the dependency sets of the literals.
+
+        :param literals: the literals that are dependent on the dependencies.
+        :param literals_to_remove: the literals that cannot be trigger candidates for the literals.
+        """
+        literals_to_remove_bitset = self.literals_interner.to_bitset(literals_to_remove)
+        for literal in literals:
+            self._remove_antecedents(literal, literals_to_remove_bitset)
+
+    def remove_bitset_dependencies(self, literals_bitset: int, literals_to_remove_bitset: int) -> None:
+        """Remove the dependencies composed only of the literals to remove from the dependency sets of the literals.
+
+        :param literals_bitset: the bitset of the literals that are dependent on the dependencies.
+        :param literals_to_remove_bitset: the bitset of the literals that cannot be trigger candidates for the literals.
+        """
+        for literal in self.literals_interner.from_bitset(literals_bitset):
+            self._remove_antecedents(literal, literals_to_remove_bitset)
 
     def is_safe_conditional_effect(self, literal: str) -> bool:
         """Determines whether the literal is a conditional effect with safe number of antecedents.
@@ -57,7 +117,8 @@ class DependencySet:
         :param literal: the literal to check.
         :return: True if the dependency set is safe, False otherwise.
         """
-        return len(self.dependencies[literal]) == 1 and self.dependencies[literal][0] != {literal}
+        return len(self.antecedents[literal]) == 1 and \
+            self.antecedents[literal][0] != self.literals_interner.to_bitset([literal])
 
     def is_safe_literal(self, literal: str, preconditions_literals: Optional[Set[str]] = None) -> bool:
         """Determines whether the literal is safe in terms of number of antecedents.
@@ -69,7 +130,7 @@ class DependencySet:
         if preconditions_literals is not None:
             self.remove_dependencies(literal, preconditions_literals)
 
-        return len(self.dependencies[literal]) <= 1
+        return len(self.antecedents[literal]) <= 1
 
     def is_safe(self, preconditions_literals: Set[str]) -> bool:
         """Determines whether the dependency set of an action is safe for all possible lifted literals.
@@ -77,8 +138,10 @@ class DependencySet:
         :param preconditions_literals: the preconditions of the action.
         :return: True if the entire dependency set is safe, False otherwise.
         """
-        for literal in self.dependencies:
-            if not self.is_safe_literal(literal, preconditions_literals):
+        preconditions_bitset = self.literals_interner.to_bitset(preconditions_literals)
+        for literal in self.antecedents:
+            self._remove_antecedents(literal, preconditions_bitset)
+            if not self.is_safe_literal(literal):
                 return False
 
         return True
@@ -88,8 +151,7 @@ class DependencySet:
 
         :return: the safe conditional effects.
         """
-        safe_conditionals = self.dependencies[literal].copy()
-        safe_conditions = safe_conditionals.pop()
+        safe_conditions = self.literals_interner.from_bitset(self.antecedents[literal][-1])
         positive_predicates = set()
         negative_predicates = set()
         for condition in safe_conditions:
@@ -106,15 +168,16 @@ class DependencySet:
 
         :return: the negative and positive conditions that need to be added.
         """
-        safe_conditions = set()
-        for literal in self.dependencies:
+        safe_conditions_bitset = 0
+        for literal in self.antecedents:
             # assuming that at this point the precondition is already removed from the dependency set
             if not self.is_safe_literal(literal):
-                safe_conditions.update(*self.dependencies[literal])
+                for antecedent in self.antecedents[literal]:
+                    safe_conditions_bitset |= antecedent
 
         positive_predicates = set()
         negative_predicates = set()
-        for condition in safe_conditions:
+        for condition in self.literals_interner.from_bitset(safe_conditions_bitset):
             if condition.startswith("(not "):
                 positive_predicates.add(f"{condition[5:-1]}")
             else:
@@ -0,0 +1,195 @@
+"""Module representing a growable matrix storing the values of lifted numeric fluents, a column per fluent."""
+from collections.abc import Mapping
+from typing import Dict, List, Iterator, Optional, Iterable
+
+import numpy as np
+
+INITIAL_ROWS_CAPACITY = 16
+INITIAL_COLUMNS_CAPACITY = 4
+
+
+class FluentValuesMatrix(Mapping):
+    """Stores the values of the fluents in a preallocated float64 matrix that doubles its capacity when it is full.
+
+    Note: every fluent is assigned a column and its values are appended one after the other to that column, so a
+        fluent that was not observed in some of the states has fewer values than the others. Indexing the storage with
+        a fluent returns a read-only view of its values and not a copy.
+    """
+
+    _values: np.ndarray
+    _columns_indexes: Dict[str, int]
+    _columns_lengths: np.ndarray
+
+    def __init__(self):
+        self._values = np.full((INITIAL_ROWS_CAPACITY, INITIAL_COLUMNS_CAPACITY), np.nan)
+        self._columns_indexes = {}
+        self._columns_lengths = np.zeros(INITIAL_COLUMNS_CAPACITY, dtype=int)
+
+    def __getitem__(self, fluent: str) -> np.ndarray:
+        column_index = self._columns_indexes[fluent]
+        column_view = self._values[:self._columns_lengths[column_index], column_index]
+        column_view.flags.writeable = False
+        return column_view
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns_indexes)
+
+    def __len__(self) -> int:
+        return len(self._columns_indexes)
+
+    def __contains__(self, fluent: object) -> bool:
+        return fluent in self._columns_indexes
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FluentValuesMatrix):
+            return NotImplemented
+
+        return list(self) == list(other) and all(np.array_equal(self[fluent], other[fluent]) for fluent in self)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({ {fluent: self[fluent].tolist() for fluent in self} })"
+
+    @property
+    def num_rows(self) -> int:
+        """The number of values of the fluent that was observed the most times."""
+        num_columns = len(self._columns_indexes)
+        return int(self._columns_lengths[:num_columns].max()) if num_columns > 0 else 0
+
+    def _ensure_capacity(self, num_rows: int, num_columns: int) -> None:
+        """Doubles the dimensions of the matrix that are too small to contain the required number of rows / columns.
+
+        :param num_rows: the number of rows the matrix should be able to contain.
+        :param num_columns: the number of columns the matrix should be able to contain.
+        """
+        rows_capacity, columns_capacity = self._values.shape
+        if num_rows <= rows_capacity and num_columns <= columns_capacity:
+            return
+
+        while rows_capacity < num_rows:
+            rows_capacity *= 2
+
+        while columns_capacity < num_columns:
+            columns_capacity *= 2
+
+        values = np.full((rows_capacity, columns_capacity), np.nan)
+        values[:self._values.shape[0], :self._values.shape[1]] = self._values
+        self._values = values
+        self._columns_lengths = np.r_[self._columns_lengths,
+                                      np.zeros(columns_capacity - len(self._columns_lengths), dtype=int)]
+
+    def _get_column_index(self, fluent: str) -> int:
+        """Returns the column of the fluent, adding a new column if the fluent was not stored before.
+
+        :param fluent: the lifted fluent.
+        :return: the index of the fluent's column.
+        """
+        if fluent not in self._columns_indexes:
+            self._ensure_capacity(self._values.shape[0], len(self._columns_indexes) + 1)
+            self._columns_indexes[fluent] = len(self._columns_indexes)
+
+        return self._columns_indexes[fluent]
+
+    def append(self, fluent: str, value: float) -> None:
+        """Appends a single value to the values of the fluent.
+
+        :param fluent: the lifted fluent.
+        :param value: the value of the fluent.
+        """
+        column_index = self._get_column_index(fluent)
+        row_index = self._columns_lengths[column_index]
+        self._ensure_capacity(row_index + 1, len(self._columns_indexes))
+        self._values[row_index, column_index] = value
+        self._columns_lengths[column_index] += 1
+
+    def append_values(self, fluents_values: Dict[str, float]) -> None:
+        """Appends the values of the fluents, observed in a single state, to the matrix.
+
+        :param fluents_values: mapping between the lifted fluents and their values.
+        """
+        self.append_row(list(fluents_values), np.array(list(fluents_values.values()), dtype=float))
+
+    def append_row(self, fluents: List[str], values: np.ndarray) -> None:
+        """Appends a row of values, observed in a single state, to the matrix.
+
+        :param fluents: the lifted fluents the values belong to.
+        :param values: the values of the fluents, NaN marks fluents that are not defined in the state and are skipped.
+        """
+        defined_values = ~np.isnan(values)
+        if not defined_values.any():
+            return
+
+        columns_indexes = np.array([self._get_column_index(fluent)
+                                    for fluent, is_defined in zip(fluents, defined_values) if is_defined])
+        rows_indexes = self._columns_lengths[columns_indexes]
+        self._ensure_capacity(int(rows_indexes.max()) + 1, len(self._columns_indexes))
+        self._values[rows_indexes, columns_indexes] = values[defined_values]
+        self._columns_lengths[columns_indexes] += 1
+
+    def pop(self, fluent: str, default: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Removes the fluent from the matrix.
+
+        :param fluent: the lifted fluent to remove.
+        :param default: the value to return if the fluent is not stored.
+        :return: the values of the removed fluent.
+        """
+        if fluent not in self._columns_indexes:
+            return default
+
+        fluent_values = self[fluent].copy()
+        self.remove_fluents([fluent])
+        return fluent_values
+
+    def remove_fluents(self, fluents: Iterable[str]) -> None:
+        """Removes the columns of the fluents from the matrix.
+
+        :param fluents: the lifted fluents to remove.
+        """
+        removed_columns = [self._columns_indexes[fluent] for fluent in fluents if fluent in self._columns_indexes]
+        if len(removed_columns) == 0:
+            return
+
+        self._values = np.delete(self._values, removed_columns, axis=1)
+        self._columns_lengths = np.delete(self._columns_lengths, removed_columns)
+        remaining_fluents = [fluent for fluent in self._columns_indexes if self._columns_indexes[fluent] not in
+                             removed_columns]
+        self._columns_indexes = {fluent: index for index, fluent in enumerate(remaining_fluents)}
+
+    def has_aligned_columns(self) -> bool:
+        """Checks whether all the fluents have the same number of values, i.e., every row is a complete state.
+
+        :return: whether the columns of all the fluents have the same length.
+        """
+        return bool(np.all(self._columns_lengths[:len(self._columns_indexes)] == self.num_rows))
+
+    def keep_rows(self, rows_indexes: np.ndarray) -> None:
+        """Keeps only the given rows of the matrix, in their original order, and shrinks its capacity accordingly.
+
+        :param rows_indexes: the indexes of the rows to keep.
+        """
+        if not self.has_aligned_columns():
+            raise ValueError("Cannot select rows when the fluents have a different number of values!")
+
+        rows_indexes = np.sort(rows_indexes)
+        rows_capacity = max(INITIAL_ROWS_CAPACITY, 2 * len(rows_indexes))
+        values = np.full((rows_capacity, self._values.shape[1]), np.nan)
+        values[:len(rows_indexes)] = self._values[rows_indexes]
+        self._values = values
+        self._columns_lengths[:len(self._columns_indexes)] = len(rows_indexes)
+
+    def to_array(self, fluents: Optional[List[str]] = None, start_row: int = 0) -> np.ndarray:
+        """Returns the matrix containing the values of the fluents, a row per observed state.
+
+        Note: when all the fluents are requested in their stored order the returned matrix is a view and not a copy.
+            Missing values of fluents that were not observed in all the states are NaN.
+
+        :param fluents: the fluents to return the values of, in the order of their columns (default - all fluents).
+        :param start_row: the first row to return, used to get only the values that were added after that row.
+        :return: the (states x fluents) matrix containing the values of the fluents.
+        """
+        num_rows = self.num_rows
+        if fluents is None or list(fluents) == list(self._columns_indexes):
+            values_view = self._values[start_row:num_rows, :len(self._columns_indexes)]
+            values_view.flags.writeable = False
+            return values_view
+
+        return self._values[start_row:num_rows, [self._columns_indexes[fluent] for fluent in fluents]]
@@ -0,0 +1,95 @@
+"""Module representing a convex hull that is kept alive and updated only with the newly observed points."""
+from typing import List, Optional, Dict, Any
+
+import numpy as np
+from scipy.spatial import ConvexHull
+
+INTERIOR_POINTS_TOLERANCE = 1e-10
+MAX_NON_VERTICES_RATIO = 2
+
+
+class IncrementalConvexHull:
+    """Convex hull of the points observed for a set of fluents that is updated incrementally using Qhull.
+
+    Note: points that are strictly inside the hull are discarded before they reach Qhull and the hull is rebuilt from
+        its vertices once Qhull holds too many non-vertex points, so the memory is bounded by the size of the hull and
+        not by the number of observations. When the hull is copied or pickled only its vertices are kept and the Qhull
+        object is rebuilt the next time the hull is updated.
+    """
+
+    fluents: Optional[List[str]]
+    num_observed_points: int
+    _hull: Optional[ConvexHull]
+    _vertices_points: Optional[np.ndarray]
+
+    def __init__(self):
+        self.reset()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_hull"] = None
+        state["_vertices_points"] = self.vertices_points
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+
+    @property
+    def vertices_points(self) -> Optional[np.ndarray]:
+        """The points that are the vertices of the hull."""
+        if self._hull is None:
+            return self._vertices_points
+
+        return self._hull.points[self._hull.vertices]
+
+    @property
+    def equations(self) -> np.ndarray:
+        """The equations of the hull's facets in the form [normal, offset] so that normal * x + offset <= 0."""
+        return self._hull.equations
+
+    def is_strictly_inside(self, points: np.ndarray) -> np.ndarray:
+        """Checks which of the points are strictly inside the hull, i.e., cannot be vertices of the hull.
+
+        :param points: the points to check, in the order of the hull's fluents.
+        :return: boolean vector with an entry per point.
+        """
+        distances = points @ self.equations[:, :-1].T + self.equations[:, -1]
+        return np.all(distances < -INTERIOR_POINTS_TOLERANCE, axis=1)
+
+    def reset(self) -> None:
+        """Discards the hull so that it would be rebuilt from scratch."""
+        self.fluents = None
+        self.num_observed_points = 0
+        self._hull = None
+        self._vertices_points = None
+
+    def build(self, fluents: List[str], points: np.ndarray) -> None:
+        """Builds the hull of the points of the fluents from scratch.
+
+        :param fluents: the fluents that represent the dimensions of the hull.
+        :param points: all the points observed for the fluents.
+        """
+        self.reset()
+        self._hull = ConvexHull(points, incremental=True)
+        self.fluents = list(fluents)
+        self.num_observed_points = len(points)
+
+    def add_points(self, new_points: np.ndarray) -> None:
+        """Adds the newly observed points to the hull.
+
+        :param new_points: the points that were observed after the hull was last updated.
+        """
+        if self._hull is None:
+            self._hull = ConvexHull(np.r_[self._vertices_points, new_points], incremental=True)
+            self._vertices_points = None
+            self.num_observed_points += len(new_points)
+            return
+
+        self.num_observed_points += len(new_points)
+        outside_points = new_points[~self.is_strictly_inside(new_points)]
+        if len(outside_points) == 0:
+            return
+
+        self._hull.add_points(outside_points)
+        if len(self._hull.points) > MAX_NON_VERTICES_RATIO * len(self._hull.vertices):
+            self._hull = ConvexHull(self._hull.points[self._hull.vertices], incremental=True)
@@ -1,10 +1,11 @@
 """Module containing the datatype of the output domain that the learning algorithms return."""
 from collections import defaultdict
-from typing import Set, List, Dict, Tuple
+from typing import Set, List, Dict, Tuple, Optional
 
 from pddl_plus_parser.models import SignatureType, Predicate, PDDLType, PDDLConstant, PDDLFunction, Domain, \
     ConditionalEffect
 
+from .compiled_numeric_model import CompiledNumericModel
 from .learning_types import ConditionType
 
 DISJUNCTIVE_PRECONDITIONS_REQ = ":disjunctive-preconditions"
@@ -27,6 +28,7 @@ class LearnerAction:
     delete_effects: Set[Predicate]
     numeric_effects: List[str]  # set of the strings representing the equations creating the numeric effect.
     conditional_effects: Set[ConditionalEffect]
+    compiled_numeric_model: Optional[CompiledNumericModel]  # the matrix form of the numeric preconditions and effects.
 
     def __init__(self, name: str, signature: SignatureType):
         self.name = name
@@ -39,6 +41,7 @@ class LearnerAction:
         self.delete_effects = set()
         self.numeric_effects = []
         self.conditional_effects = set()
+        self.compiled_numeric_model = None
 
     def __str__(self):
         signature_str_items = []
@@ -184,6 +187,12 @@ class LearnerDomain:
                 )
         )
 
+    @property
+    def compiled_numeric_models(self) -> Dict[str, CompiledNumericModel]:
+        """The compiled numeric models of the actions whose numeric preconditions and effects were compiled."""
+        return {action_name: action.compiled_numeric_model for action_name, action in self.actions.items()
+                if action.compiled_numeric_model is not None}
+
     def _complete_missing_requirements(self) -> None:
         """Completes the requirements of the domain from the needed requirements of the learning algorithm."""
         for requirement in ADDED_LEARNING_REQUIREMENTS:
@@ -0,0 +1,66 @@
+"""Module representing the interning table that maps lifted literals to bit positions."""
+from typing import Dict, List, Iterable, Set
+
+
+class LiteralsInterner:
+    """Class that maps lifted literals to small integers so that sets of literals can be represented as bitsets."""
+
+    literals_indexes: Dict[str, int]
+    indexed_literals: List[str]
+
+    def __init__(self, literals: Iterable[str] = ()):
+        self.literals_indexes = {}
+        self.indexed_literals = []
+        for literal in literals:
+            self.intern(literal)
+
+    def __len__(self) -> int:
+        return len(self.indexed_literals)
+
+    def __contains__(self, literal: str) -> bool:
+        return literal in self.literals_indexes
+
+    def intern(self, literal: str) -> int:
+        """Returns the index of the literal, the literal is assigned the next free index if it was not seen before.
+
+        :param literal: the string representation of the lifted literal.
+        :return: the index of the literal.
+        """
+        if literal not in self.literals_indexes:
+            self.literals_indexes[literal] = len(self.indexed_literals)
+            self.indexed_literals.append(literal)
+
+        return self.literals_indexes[literal]
+
+    def to_bitset(self, literals: Iterable[str]) -> int:
+        """Converts the literals to a bitset in which the bits of the literals' indexes are set.
+
+        Note: literals that were not interned cannot be part of any bitset and are thus ignored.
+
+        :param literals: the literals to convert.
+        :return: the bitset representing the literals.
+        """
+        bitset = 0
+        for literal in literals:
+            index = self.literals_indexes.get(literal)
+            if index is not None:
+                bitset |= 1 << index
+
+        return bitset
+
+    def from_bitset(self, bitset: int) -> Set[str]:
+        """Converts the bitset back to the set of literals it represents.
+
+        :param bitset: the bitset to convert.
+        :return: the literals whose bits are set in the bitset.
+        """
+        literals = set()
+        index = 0
+        while bitset:
+            if bitset & 1:
+                literals.add(self.indexed_literals[index])
+
+            bitset >>= 1
+            index += 1
+
+        return literals
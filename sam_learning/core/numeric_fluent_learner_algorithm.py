@@ -1,25 +1,24 @@
 """Module that stores amd learns an action's numeric state fluents."""
-import itertools
 import logging
 import math
 import os
-from collections import defaultdict
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
 import matplotlib.pyplot as plt
 import numpy as np
-import sympy
 from pddl_plus_parser.models import PDDLFunction
-from scipy import stats
+from scipy import linalg
 from scipy.spatial import ConvexHull, convex_hull_plot_2d
 from scipy.spatial.qhull import QhullError
-from sklearn.linear_model import LinearRegression
 
 from sam_learning.core.exceptions import NotSafeActionError
+from sam_learning.core.fluent_values_matrix import FluentValuesMatrix
+from sam_learning.core.incremental_convex_hull import IncrementalConvexHull
 from sam_learning.core.learning_types import EquationSolutionType, ConditionType
 from sam_learning.core.numeric_utils import prettify_coefficients, construct_multiplication_strings, \
     construct_linear_equation_string, construct_non_circular_assignment
+from sam_learning.core.regression_statistics import LinearRegressionStatistics
 
 EPSILON = 1e-10
 LEGAL_LEARNING_SCORE = 1.00
@@ -31,28 +30,49 @@ class NumericFluentStateStorage:
 
     logger: logging.Logger
     action_name: str
-    previous_state_storage: Dict[str, List[float]]  # lifted function str -> numeric values.
-    next_state_storage: Dict[str, List[float]]  # lifted function str -> numeric values.
-
-    def __init__(self, action_name: str):
+    previous_state_storage: FluentValuesMatrix  # lifted function str -> numeric values.
+    next_state_storage: FluentValuesMatrix  # lifted function str -> numeric values.
+    previous_state_hull: IncrementalConvexHull
+    effects_statistics: LinearRegressionStatistics
+    rank_tolerance: Optional[float]
+    compaction_interval: Optional[int]
+    _full_rank_fluents: Optional[List[str]]
+    _num_rows_after_compaction: int
+
+    def __init__(self, action_name: str, rank_tolerance: Optional[float] = None,
+                 compaction_interval: Optional[int] = None):
         self.logger = logging.getLogger(__name__)
         self.action_name = action_name
-        self.previous_state_storage = defaultdict(list)
-        self.next_state_storage = defaultdict(list)
+        self.previous_state_storage = FluentValuesMatrix()
+        self.next_state_storage = FluentValuesMatrix()
+        self.previous_state_hull = IncrementalConvexHull()
+        self.effects_statistics = LinearRegressionStatistics()
+        self.rank_tolerance = rank_tolerance
+        self.compaction_interval = compaction_interval
+        self._full_rank_fluents = None
+        self._num_rows_after_compaction = 0
         # TODO: remove this once the action is fully tested.
         self.convex_hull_error_file_path = Path(os.environ["CONVEX_HULL_ERROR_PATH"])
 
     def _validate_legal_equations(self, values_matrix: np.ndarray) -> None:
         """Validates that there are enough independent equations which enable for a single solution for the equation.
 
+        Note: the rank of the matrix is computed using SVD with the storage's rank tolerance (numpy's default tolerance
+            if it is None). Since observations are only appended, once the matrix of the stored fluents has a full
+            rank it is not checked again.
+
         :param values_matrix: the matrix constructed based on the observations.
         """
+        stored_fluents = list(self.previous_state_storage.keys())
+        if self._full_rank_fluents == stored_fluents:
+            self.logger.debug("The values matrix already reached a full rank, no need to validate it again.")
+            return
+
         num_dimensions = values_matrix.shape[1] + 1
         num_rows = values_matrix.shape[0]
         values_matrix_with_bias = np.c_[values_matrix, np.ones(num_rows)]
-        _, indices = sympy.Matrix(values_matrix_with_bias).T.rref()
-        independent_rows_matrix = np.array([values_matrix_with_bias[index] for index in indices])
-        if independent_rows_matrix.shape[0] >= num_dimensions:
+        if np.linalg.matrix_rank(values_matrix_with_bias, tol=self.rank_tolerance) >= num_dimensions:
+            self._full_rank_fluents = stored_fluents
             return
 
         failure_reason = f"There are too few independent rows of data! " \
@@ -75,27 +95,26 @@ class NumericFluentStateStorage:
             raise NotSafeActionError(
                 self.action_name, failure_reason, EquationSolutionType.not_enough_data)
 
-    def _solve_function_linear_equations(self, values_matrix: np.ndarray,
-                                         function_post_values: np.ndarray) -> Tuple[List[float], float]:
-        """Solves the linear equations using a matrix form.
+    def _solve_functions_linear_equations(self, input_fluents: List[str],
+                                          affected_functions: List[str]) -> List[Tuple[List[float], float]]:
+        """Solves the linear equations of all the affected functions together using the regression statistics.
 
-        Note: the equation Ax=b is solved as: x = inverse(A)*b.
+        Note: the equations are solved using the statistics accumulated from all the observed transitions and not the
+            stored states, so the solution does not depend on the number of stored states or on their compaction.
 
-        :param values_matrix: the A matrix that contains the previous values of the function variables.
-        :param function_post_values: the resulting values after the linear change.
-        :return: the vector representing the coefficients for the function variables and the learning score (R^2).
+        :param input_fluents: the fluents whose previous values are the variables of the equations.
+        :param affected_functions: the functions whose post values are the results of the equations.
+        :return: the vectors representing the coefficients for the function variables and the learning scores (R^2)
+            of each of the functions.
         """
-        regressor = LinearRegression()
-        regressor.fit(values_matrix, function_post_values)
-        learning_score = regressor.score(values_matrix, function_post_values)
-        if learning_score < LEGAL_LEARNING_SCORE:
+        coefficients, learning_scores = self.effects_statistics.solve(input_fluents, affected_functions)
+        if np.any(learning_scores < LEGAL_LEARNING_SCORE):
             reason = "The learned effects are not safe since the R^2 is not high enough."
             self.logger.warning(reason)
             raise NotSafeActionError(self.action_name, reason, EquationSolutionType.no_solution_found)
 
-        coefficients = list(regressor.coef_) + [regressor.intercept_]
-        coefficients = prettify_coefficients(coefficients)
-        return coefficients, learning_score
+        return [(prettify_coefficients(list(function_coefficients)), learning_score)
+                for function_coefficients, learning_score in zip(coefficients.T, learning_scores)]
 
     def _convert_to_array_format(self, storage_name: str, relevant_fluents: Optional[List[str]] = None,
                                  should_filter_repetitive_values: bool = True) -> np.ndarray:
@@ -107,20 +126,19 @@ class NumericFluentStateStorage:
         :return: the array containing the functions' values.
         """
         if storage_name != "previous_state":
-            storage = self.next_state_storage
+            array = self.next_state_storage.to_array()
 
         elif relevant_fluents is not None:
-            storage_fluents = [fluent for fluent in relevant_fluents if fluent in self.previous_state_storage]
-            storage = {fluent: self.previous_state_storage[fluent] for fluent in storage_fluents}
+            array = self.previous_state_storage.to_array(
+                [fluent for fluent in relevant_fluents if fluent in self.previous_state_storage])
 
         else:
-            storage = self.previous_state_storage
+            array = self.previous_state_storage.to_array()
 
-        array = list(map(list, itertools.zip_longest(*storage.values(), fillvalue=None)))
         if should_filter_repetitive_values:
-            return np.unique(np.array(array), axis=0)
+            return np.unique(array, axis=0)
 
-        return np.array(array)
+        return array
 
     def _construct_pddl_inequality_scheme(self, coefficient_matrix: np.ndarray, border_points: np.ndarray,
                                           relevant_fluents: Optional[List[str]] = None) -> List[str]:
@@ -192,12 +210,186 @@ class NumericFluentStateStorage:
             return [prettify_coefficients(row) for row in A], prettify_coefficients(b)
 
         except (QhullError, ValueError) as e:
-            with open(self.convex_hull_error_file_path, "at") as error_file:
-                error_file.write(f"{e}\n")
+            self._raise_convex_hull_error(e)
 
-            failure_reason = "Convex hull encountered an error condition and no solution was found"
-            self.logger.warning(failure_reason)
-            raise NotSafeActionError(self.action_name, failure_reason, EquationSolutionType.convex_hull_not_found)
+    def _create_incremental_convex_hull_linear_inequalities(
+            self, points: np.ndarray, hull_fluents: List[str]) -> Tuple[List[List[float]], List[float]]:
+        """Updates the live convex hull with the newly observed states and returns the matrix of its inequalities.
+
+        Note: the hull is rebuilt from all the stored values only when the fluents of the hull change, otherwise only
+            the states that were added since the last update are added to the hull.
+
+        :param points: the filtered previous state values, used when the fluents' values cannot be taken from storage.
+        :param hull_fluents: the fluents that remained after filtering the convex hull inconsistencies.
+        :return: the matrix representing the inequalities of the planes created by the convex hull.
+        """
+        if any(fluent not in self.previous_state_storage for fluent in hull_fluents):
+            return self._create_convex_hull_linear_inequalities(points)
+
+        try:
+            self._update_convex_hull(hull_fluents)
+            num_dimensions = len(hull_fluents)
+            A = self.previous_state_hull.equations[:, :num_dimensions]
+            b = -self.previous_state_hull.equations[:, num_dimensions]
+            return [prettify_coefficients(row) for row in A], prettify_coefficients(b)
+
+        except (QhullError, ValueError) as e:
+            self.previous_state_hull.reset()
+            self._raise_convex_hull_error(e)
+
+    def _update_convex_hull(self, hull_fluents: List[str]) -> None:
+        """Adds the states that were stored since the last update to the live convex hull of the fluents.
+
+        :param hull_fluents: the fluents that represent the dimensions of the hull.
+        """
+        hull = self.previous_state_hull
+        if hull.fluents == hull_fluents and hull.num_observed_points <= self.previous_state_storage.num_rows:
+            hull.add_points(self.previous_state_storage.to_array(hull_fluents, start_row=hull.num_observed_points))
+            return
+
+        self.logger.debug(f"Building the convex hull of the fluents {hull_fluents} from scratch.")
+        hull.build(hull_fluents, self.previous_state_storage.to_array(hull_fluents))
+
+    def _find_convex_hull_fluents(self, relevant_fluents: Optional[List[str]] = None) -> Optional[List[str]]:
+        """Finds the fluents that would be the dimensions of the convex hull when constructing the preconditions.
+
+        Note: only the fluents that were observed in all the stored states are considered and the storage is not
+            modified, i.e., the constant and linearly dependent fluents are only filtered out of the result.
+
+        :param relevant_fluents: the fluents that are relevant to the preconditions (default - all the fluents).
+        :return: the fluents of the convex hull or None if the preconditions would not be learned as a convex hull.
+        """
+        num_rows = self.previous_state_storage.num_rows
+        relevant_fluents = [fluent for fluent in (relevant_fluents or self.previous_state_storage)
+                            if len(self.previous_state_storage.get(fluent, [])) == num_rows]
+        if len(relevant_fluents) < 2:
+            return None
+
+        _, filtered_previous_state_matrix, remained_fluents = self._filter_all_convex_hull_inconsistencies(
+            self.previous_state_storage.to_array(relevant_fluents), relevant_fluents)
+        if filtered_previous_state_matrix.shape[0] < len(relevant_fluents) + 1 or \
+                filtered_previous_state_matrix.shape[1] < 2:
+            return None
+
+        return remained_fluents
+
+    def update_hull(self, relevant_fluents: Optional[List[str]] = None) -> None:
+        """Adds the states that were stored since the last update to the live convex hull of the preconditions.
+
+        Note: this allows copies of the storage, that only keep the vertices of the hull, to construct the
+            preconditions without updating the hull with all the states that were observed since it was last updated.
+
+        :param relevant_fluents: the fluents that are relevant to the preconditions (default - all the fluents).
+        """
+        hull_fluents = self._find_convex_hull_fluents(relevant_fluents)
+        if hull_fluents is None:
+            return
+
+        try:
+            self._update_convex_hull(hull_fluents)
+
+        except (QhullError, ValueError):
+            self.logger.debug(f"Could not update the convex hull of the action {self.action_name}.")
+            self.previous_state_hull.reset()
+
+    def _find_effects_basis_rows(self) -> Optional[np.ndarray]:
+        """Finds linearly independent stored states that determine the same numeric effects as all the stored states.
+
+        Note: this is possible only when the states (without duplicated fluents) have a full rank and every fluent in
+            the next state is an exact linear function of the previous state values. In this case the learned effects
+            are unique, so any subset of the states containing a basis of the previous state values results in the
+            same effects.
+
+        :return: the indexes of the basis states or None if the effects are not determined by the stored states.
+        """
+        previous_state_values = self.previous_state_storage.to_array()
+        _, distinct_columns = np.unique(previous_state_values, axis=1, return_index=True)
+        values_matrix = previous_state_values[:, np.sort(distinct_columns)]
+        values_matrix_with_bias = np.c_[values_matrix, np.ones(values_matrix.shape[0])]
+        num_dimensions = values_matrix_with_bias.shape[1]
+        if np.linalg.matrix_rank(values_matrix_with_bias, tol=self.rank_tolerance) < num_dimensions:
+            return None
+
+        if len(self.next_state_storage) > 0:
+            input_fluents = [list(self.previous_state_storage.keys())[column] for column in np.sort(distinct_columns)]
+            _, learning_scores = self.effects_statistics.solve(input_fluents, list(self.next_state_storage.keys()))
+            if np.any(learning_scores < LEGAL_LEARNING_SCORE):
+                return None
+
+        _, _, pivot_rows = linalg.qr(values_matrix_with_bias.T, mode="economic", pivoting=True)
+        return pivot_rows[:num_dimensions]
+
+    def compact_storage(self) -> None:
+        """Drops the stored states that can affect neither the safe preconditions nor the numeric effects.
+
+        Note: a state is dropped only if it is strictly inside the live convex hull and is not one of the basis states
+            determining the effects. The kept states have the same hull, the same constant and linearly dependent
+            fluents, the same extreme values and determine the same effects, so the learned model does not change.
+            If the preconditions were not constructed yet, the hull of all the non-constant and independent fluents
+            is built. Its projection on any subset of the fluents is the hull of the projected kept vertices, so the
+            preconditions learned later from a subset of the fluents do not change either.
+        """
+        hull = self.previous_state_hull
+        if not self.previous_state_storage.has_aligned_columns() or \
+                not self.next_state_storage.has_aligned_columns() or \
+                self.next_state_storage.num_rows not in (0, self.previous_state_storage.num_rows):
+            self.logger.debug("The stored states cannot be compacted since they are not complete.")
+            return
+
+        hull_fluents = hull.fluents
+        if hull_fluents is None or any(fluent not in self.previous_state_storage for fluent in hull_fluents):
+            hull_fluents = self._find_convex_hull_fluents()
+
+        if hull_fluents is None:
+            self.logger.debug("The stored states cannot be compacted since they do not span a convex hull yet.")
+            return
+
+        try:
+            self._update_convex_hull(hull_fluents)
+
+        except (QhullError, ValueError):
+            hull.reset()
+            return
+
+        effects_basis_rows = self._find_effects_basis_rows()
+        if effects_basis_rows is None:
+            self.logger.debug("The effects are not determined yet, keeping all the stored states.")
+            return
+
+        hull_points = self.previous_state_storage.to_array(hull.fluents)
+        previous_state_values = self.previous_state_storage.to_array()
+        kept_rows = ~hull.is_strictly_inside(hull_points)
+        kept_rows[[0, *effects_basis_rows, *np.argmin(previous_state_values, axis=0),
+                   *np.argmax(previous_state_values, axis=0)]] = True
+        # keeping enough distinct states so that the preconditions would still be learned as a convex hull.
+        num_missing_states = len(self.previous_state_storage) + 1 - len(np.unique(hull_points[kept_rows], axis=0))
+        if num_missing_states > 0:
+            _, distinct_rows = np.unique(hull_points, axis=0, return_index=True)
+            kept_rows[[row for row in np.sort(distinct_rows) if not kept_rows[row]][:num_missing_states]] = True
+
+        if np.all(kept_rows):
+            return
+
+        kept_rows_indexes = np.flatnonzero(kept_rows)
+        self.logger.debug(f"Compacting the storage of action {self.action_name} from {len(kept_rows)} states to "
+                          f"{len(kept_rows_indexes)} states.")
+        self.previous_state_storage.keep_rows(kept_rows_indexes)
+        if len(self.next_state_storage) > 0:
+            self.next_state_storage.keep_rows(kept_rows_indexes)
+
+        hull.num_observed_points = len(kept_rows_indexes)
+
+    def _raise_convex_hull_error(self, error: Exception) -> None:
+        """Records the error raised while creating the convex hull and marks the action as not safe.
+
+        :param error: the error raised by Qhull.
+        """
+        with open(self.convex_hull_error_file_path, "at") as error_file:
+            error_file.write(f"{error}\n")
+
+        failure_reason = "Convex hull encountered an error condition and no solution was found"
+        self.logger.warning(failure_reason)
+        raise NotSafeActionError(self.action_name, failure_reason, EquationSolutionType.convex_hull_not_found)
 
     def _display_convex_hull(self, display_mode: bool, hull: ConvexHull, num_dimensions: int) -> None:
         """Displays the convex hull in as a plot.
@@ -214,19 +406,25 @@ class NumericFluentStateStorage:
     def _remove_duplicated_variables(self, silent: bool = False) -> Dict[str, str]:
         """removes variables that are basically duplication of other variables. This happens in some domains.
 
+        Note: the columns are grouped by the bytes of their values, so the duplicates are found in a single sort
+            instead of comparing every pair of fluents. Every duplicated fluent is mapped to the first fluent of its
+            group.
+
         :param silent: whether to print the removed variables.
         :return: the mapping between the removed function to the one that is identical to it.
         """
-        duplicated_numeric_functions = []
-        duplicate_map = {}
-        for function1, function2 in itertools.combinations(self.previous_state_storage, 2):
-            if self.previous_state_storage[function1] == self.previous_state_storage[function2]:
-                duplicated_numeric_functions.append(function2)
-                duplicate_map[function2] = function1
-
+        fluents = list(self.previous_state_storage.keys())
+        if len(fluents) == 0:
+            return {}
+
+        # adding zero turns -0.0 to 0.0 so that columns with equal values would have equal bytes.
+        columns_values = np.ascontiguousarray(self.previous_state_storage.to_array().T + 0.0)
+        columns_keys = columns_values.view(np.dtype((np.void, columns_values.dtype.itemsize * columns_values.shape[1])))
+        _, first_columns, columns_groups = np.unique(columns_keys.ravel(), return_index=True, return_inverse=True)
+        duplicate_map = {fluent: fluents[first_columns[group]] for fluent, group in
+                         zip(fluents, columns_groups.ravel()) if fluents[first_columns[group]] != fluent}
         if not silent:
-            for func in duplicated_numeric_functions:
-                self.previous_state_storage.pop(func, None)
+            self.previous_state_storage.remove_fluents(duplicate_map.keys())
 
         return duplicate_map
 
@@ -238,8 +436,9 @@ class NumericFluentStateStorage:
         :param equality_strs: the equality conditions that are already present in the preconditions.
         :return: the preconditions string and the condition type.
         """
-        min_value = min(self.previous_state_storage.get(relevant_fluent, [0]))
-        max_value = max(self.previous_state_storage.get(relevant_fluent, [0]))
+        fluent_values = self.previous_state_storage.get(relevant_fluent, np.zeros(1))
+        min_value = fluent_values.min()
+        max_value = fluent_values.max()
         conditions = [f"(>= {relevant_fluent} {min_value})", f"(<= {relevant_fluent} {max_value})"]
         conditions.extend(equality_strs)
         return conditions, ConditionType.conjunctive
@@ -293,7 +492,8 @@ class NumericFluentStateStorage:
 
         Notice:
             This method does not ignore the identical features but adds a new condition stating that these
-            features must be equal.
+            features must be equal. The correlations of all the fluents are computed at once as the Gram matrix of
+            their normalized columns, and each dependent fluent is compared to the first fluent it depends on.
 
         :param previous_state_matrix: the matrix of the previous state values.
         :param remained_fluents: the list of fluents remained after removing constant features.
@@ -301,28 +501,34 @@ class NumericFluentStateStorage:
             the strings of the values that are identical.
         """
         self.logger.info(f"Detecting linear dependent features and removing them for action - {self.action_name}")
-        linear_dependent_fluent_strs = []
-        fluents_indexes_to_remove = []
-        removed_fluents = []
-        filtered_matrix = previous_state_matrix.copy()
-        for function1, function2 in itertools.combinations(self.previous_state_storage, 2):
-            if function1 not in remained_fluents or function2 not in remained_fluents:
-                continue
+        candidate_fluents = [fluent for fluent in self.previous_state_storage if fluent in remained_fluents]
+        if len(candidate_fluents) < 2:
+            return previous_state_matrix, [], []
 
-            function1_values = self.previous_state_storage[function1]
-            function2_values = self.previous_state_storage[function2]
-            correlation_coeff, p_value = stats.pearsonr(function1_values, function2_values)
-            if abs(correlation_coeff - 1) <= EPSILON:
-                self.logger.debug(f"The two functions {function1} and {function2} are linearly dependent.")
-                # extracting the linear dependency parameter
-                linear_coeff = self._extract_numeric_linear_coefficient(function1_values, function2_values)
-                linear_dependent_fluent_strs.append(f"(= {function1} (* {linear_coeff} {function2}))")
-                fluents_indexes_to_remove.append(remained_fluents.index(function2))
-                removed_fluents.append(function2)
+        # the Pearson correlation of two columns is the dot product of the columns after centering and normalizing them.
+        candidates_values = self.previous_state_storage.to_array(candidate_fluents)
+        centered_values = candidates_values - candidates_values.mean(axis=0)
+        normalized_values = centered_values / np.linalg.norm(centered_values, axis=0)
+        correlation_matrix = np.nan_to_num(normalized_values.T @ normalized_values, nan=0.0)
+        dependent_pairs = np.triu(np.abs(correlation_matrix - 1) <= EPSILON, k=1)
 
-        if len(fluents_indexes_to_remove) > 0:
-            filtered_matrix = np.delete(previous_state_matrix, fluents_indexes_to_remove, axis=1)
+        linear_dependent_fluent_strs = []
+        removed_fluents = []
+        removed_columns = np.flatnonzero(dependent_pairs.any(axis=0))
+        representative_columns = np.argmax(dependent_pairs[:, removed_columns], axis=0)
+        for representative_index, column_index in sorted(zip(representative_columns, removed_columns)):
+            function1, function2 = candidate_fluents[representative_index], candidate_fluents[column_index]
+            self.logger.debug(f"The two functions {function1} and {function2} are linearly dependent.")
+            linear_coeff = self._extract_numeric_linear_coefficient(candidates_values[:, representative_index],
+                                                                    candidates_values[:, column_index])
+            linear_dependent_fluent_strs.append(f"(= {function1} (* {linear_coeff} {function2}))")
+            removed_fluents.append(function2)
+
+        if len(removed_fluents) == 0:
+            return previous_state_matrix, [], []
 
+        removed_indexes = [remained_fluents.index(fluent) for fluent in removed_fluents]
+        filtered_matrix = np.delete(previous_state_matrix, removed_indexes, axis=1)
         return filtered_matrix, linear_dependent_fluent_strs, removed_fluents
 
     def _filter_all_convex_hull_inconsistencies(
@@ -359,31 +565,88 @@ class NumericFluentStateStorage:
 
         :param state_fluents: the lifted state fluents that were matched for the action.
         """
-        for state_fluent_lifted_str, state_fluent_data in state_fluents.items():
-            self.previous_state_storage[state_fluent_lifted_str].append(state_fluent_data.value)
+        self.add_previous_state_values({state_fluent_lifted_str: state_fluent_data.value
+                                        for state_fluent_lifted_str, state_fluent_data in state_fluents.items()})
 
     def add_to_next_state_storage(self, state_fluents: Dict[str, PDDLFunction]) -> None:
         """Adds the matched lifted state fluents to the next state storage.
 
         :param state_fluents: the lifted state fluents that were matched for the action.
         """
-        for state_fluent_lifted_str, state_fluent_data in state_fluents.items():
-            self.next_state_storage[state_fluent_lifted_str].append(state_fluent_data.value)
+        self.add_next_state_values({state_fluent_lifted_str: state_fluent_data.value
+                                    for state_fluent_lifted_str, state_fluent_data in state_fluents.items()})
+
+    def add_previous_state_values(self, state_values: Dict[str, float]) -> None:
+        """Adds the values of the matched lifted state fluents to the previous state storage.
+
+        :param state_values: the values of the lifted state fluents that were matched for the action.
+        """
+        self.add_previous_state_row(list(state_values), np.array(list(state_values.values()), dtype=float))
+
+    def add_next_state_values(self, state_values: Dict[str, float]) -> None:
+        """Adds the values of the matched lifted state fluents to the next state storage.
+
+        :param state_values: the values of the lifted state fluents that were matched for the action.
+        """
+        self.add_next_state_row(list(state_values), np.array(list(state_values.values()), dtype=float))
+
+    def add_previous_state_row(self, fluents: List[str], values: np.ndarray) -> None:
+        """Adds a row of values of the matched lifted state fluents to the previous state storage.
+
+        :param fluents: the lifted state fluents that were matched for the action.
+        :param values: the values of the fluents, NaN marks fluents that are not defined in the state.
+        """
+        self.previous_state_storage.append_row(fluents, values)
+
+    def add_next_state_row(self, fluents: List[str], values: np.ndarray) -> None:
+        """Adds a row of values of the matched lifted state fluents to the next state storage.
+
+        :param fluents: the lifted state fluents that were matched for the action.
+        :param values: the values of the fluents, NaN marks fluents that are not defined in the state.
+        """
+        self.next_state_storage.append_row(fluents, values)
+        for state_fluent_lifted_str, value in zip(fluents, values):
+            if np.isnan(value):
+                continue
+
             if len(self.previous_state_storage.get(state_fluent_lifted_str, [])) != \
                     len(self.next_state_storage[state_fluent_lifted_str]):
                 self.logger.debug("This is a case where effects create new fluents - should adjust the previous state.")
-                self.previous_state_storage[state_fluent_lifted_str].append(0)
+                self.previous_state_storage.append(state_fluent_lifted_str, 0)
+
+        self._add_transition_statistics()
+        if self.compaction_interval is not None and \
+                self.previous_state_storage.num_rows - self._num_rows_after_compaction >= self.compaction_interval:
+            self.compact_storage()
+            self._num_rows_after_compaction = self.previous_state_storage.num_rows
+
+    def _add_transition_statistics(self) -> None:
+        """Adds the values of the last stored transition to the regression statistics of the effects.
+
+        Note: the values are taken from the last row of the storages so that fluents added by subclasses (e.g.,
+            polynomial fluents) are included as well. Fluents that were not observed in the transition are skipped.
+        """
+        transition_values = []
+        for storage in (self.previous_state_storage, self.next_state_storage):
+            last_row = storage.to_array(start_row=max(storage.num_rows - 1, 0))
+            last_values = last_row[0] if len(last_row) > 0 else []
+            transition_values.append({fluent: value for fluent, value in zip(storage, last_values)
+                                      if not np.isnan(value)})
+
+        self.effects_statistics.add_sample(*transition_values)
 
     def filter_out_inconsistent_state_variables(self) -> None:
         """Filters out fluents that appear only in part of the states since they are not safe.
 
         :return: only the safe state variables that appear in *all* states.
         """
-        max_function_len = max([len(values) for values in self.previous_state_storage.values()])
-        self.previous_state_storage = {lifted_function: state_values for lifted_function, state_values in
-                                       self.previous_state_storage.items() if len(state_values) == max_function_len}
-        self.next_state_storage = {lifted_function: state_values for lifted_function, state_values in
-                                   self.next_state_storage.items() if len(state_values) == max_function_len}
+        max_function_len = self.previous_state_storage.num_rows
+        self.previous_state_storage.remove_fluents([
+            lifted_function for lifted_function, state_values in self.previous_state_storage.items()
+            if len(state_values) != max_function_len])
+        self.next_state_storage.remove_fluents([
+            lifted_function for lifted_function, state_values in self.next_state_storage.items()
+            if len(state_values) != max_function_len])
 
     def construct_safe_linear_inequalities(
             self, relevant_fluents: Optional[List[str]] = None) -> Tuple[List[str], ConditionType]:
@@ -392,7 +655,7 @@ class NumericFluentStateStorage:
         :return: the inequality strings and the type of equations that were constructed (injunctive / disjunctive)
         """
         if relevant_fluents is None:
-            relevant_fluents = self.previous_state_storage.keys()
+            relevant_fluents = list(self.previous_state_storage.keys())
 
         if len(relevant_fluents) == 1:
             self.logger.debug("Only one dimension is needed in the preconditions!")
@@ -411,7 +674,8 @@ class NumericFluentStateStorage:
         if filtered_previous_state_matrix.shape[1] < 2:
             return self._construct_single_dimension_inequalities(remained_fluents[0], equality_strs)
 
-        A, b = self._create_convex_hull_linear_inequalities(filtered_previous_state_matrix, display_mode=False)
+        A, b = self._create_incremental_convex_hull_linear_inequalities(
+            filtered_previous_state_matrix, remained_fluents)
         inequalities_strs = self._construct_pddl_inequality_scheme(A, b, remained_fluents)
         inequalities_strs.extend(equality_strs)
 
@@ -425,27 +689,38 @@ class NumericFluentStateStorage:
         self.logger.info(f"Constructing the fluent assignment equations for action {self.action_name}.")
         assignment_statements = []
         duplicate_map = self._remove_duplicated_variables()
-        for lifted_function, next_state_values in self.next_state_storage.items():
+        for lifted_function in self.next_state_storage:
             self._validate_safe_equation_solving(lifted_function)
-            function_post_values = np.array(next_state_values)
-            values_matrix = self._convert_to_array_format("previous_state", should_filter_repetitive_values=False)
-            self._validate_legal_equations(values_matrix)
-            self.logger.debug("After validating that the learning process is safe then trying to see if the "
-                              "action affects the numeric fluent.")
-
-            searched_function = lifted_function if lifted_function not in duplicate_map else duplicate_map[
-                lifted_function]
-            if not any([(next_val - prev_val) != 0 for
-                        prev_val, next_val in zip(self.previous_state_storage[searched_function], next_state_values)]):
+
+        if len(self.next_state_storage) == 0:
+            return assignment_statements
+
+        values_matrix = self._convert_to_array_format("previous_state", should_filter_repetitive_values=False)
+        self._validate_legal_equations(values_matrix)
+        self.logger.debug("After validating that the learning process is safe then trying to see if the "
+                          "action affects the numeric fluents.")
+
+        affected_functions = []
+        for lifted_function, next_state_values in self.next_state_storage.items():
+            searched_function = duplicate_map.get(lifted_function, lifted_function)
+            previous_state_values = self.previous_state_storage[searched_function]
+            num_values = min(len(previous_state_values), len(next_state_values))
+            if np.array_equal(previous_state_values[:num_values], next_state_values[:num_values]):
                 self.logger.debug(f"The action {self.action_name} does not affect the fluent - {lifted_function}")
                 continue
 
-            coefficient_vector, learning_score = self._solve_function_linear_equations(values_matrix,
-                                                                                       function_post_values)
-            self.logger.debug(f"Learned the coefficients for the numeric equations with r^2 score of {learning_score}")
+            affected_functions.append(lifted_function)
 
-            functions_including_dummy = list(self.previous_state_storage.keys()) + ["(dummy)"]
-            if coefficient_vector[list(self.previous_state_storage.keys()).index(searched_function)] != 0:
+        if len(affected_functions) == 0:
+            return assignment_statements
+
+        functions_solutions = self._solve_functions_linear_equations(
+            list(self.previous_state_storage.keys()), affected_functions)
+        functions_including_dummy = list(self.previous_state_storage.keys()) + ["(dummy)"]
+        for lifted_function, (coefficient_vector, learning_score) in zip(affected_functions, functions_solutions):
+            searched_function = duplicate_map.get(lifted_function, lifted_function)
+            self.logger.debug(f"Learned the coefficients for the numeric equations with r^2 score of {learning_score}")
+            if coefficient_vector[functions_including_dummy.index(searched_function)] != 0:
                 self.logger.debug("the assigned party is a part of the equation, "
                                   "cannot use circular dependency so changing the format!")
                 coefficients_map = {lifted_func: coef for lifted_func, coef in
@@ -1,9 +1,9 @@
 """Module to match action call parameters to the functions observed in the state."""
 import logging
 from itertools import permutations
-from typing import List, Dict
+from typing import List, Dict, Collection
 
-from pddl_plus_parser.models import Domain, PDDLFunction, ActionCall, Action
+from pddl_plus_parser.models import Domain, PDDLFunction, ActionCall, Action, SignatureType
 
 
 class NumericFunctionMatcher:
@@ -36,18 +36,16 @@ class NumericFunctionMatcher:
 
         return possible_untyped_signatures
 
-    def lift_matched_parameters(self, executed_action: Action, grounded_call_parameters: List[str],
-                                grounded_function: PDDLFunction) -> PDDLFunction:
-        """Matches the parameters of the function to the lifted action definition.
+    def _lift_function_objects(self, executed_action: Action, grounded_call_parameters: List[str],
+                               grounded_objects: List[str]) -> SignatureType:
+        """Lifts the objects of a grounded function according to the action's parameters and the domain's constants.
 
         :param executed_action: the lifted action that was called in the observation.
         :param grounded_call_parameters: the observed action call objects.
-        :param grounded_function: the observed numeric function.
-        :return: the lifted function definition with the value set according to the observation.
+        :param grounded_objects: the objects of the grounded function.
+        :return: the lifted signature of the function.
         """
-        self.logger.info("Starting to lift the matched parameters!")
         lifted_parameters = executed_action.parameter_names
-        grounded_objects = list(grounded_function.signature.keys())
         lifted_signature = {}
         for function_obj in grounded_objects:
             if function_obj in self.matcher_domain.constants:
@@ -58,6 +56,20 @@ class NumericFunctionMatcher:
                 lifted_param_type = executed_action.signature[lifted_param_name]
                 lifted_signature[lifted_param_name] = lifted_param_type
 
+        return lifted_signature
+
+    def lift_matched_parameters(self, executed_action: Action, grounded_call_parameters: List[str],
+                                grounded_function: PDDLFunction) -> PDDLFunction:
+        """Matches the parameters of the function to the lifted action definition.
+
+        :param executed_action: the lifted action that was called in the observation.
+        :param grounded_call_parameters: the observed action call objects.
+        :param grounded_function: the observed numeric function.
+        :return: the lifted function definition with the value set according to the observation.
+        """
+        self.logger.info("Starting to lift the matched parameters!")
+        lifted_signature = self._lift_function_objects(
+            executed_action, grounded_call_parameters, list(grounded_function.signature.keys()))
         lifted_state_function = PDDLFunction(name=grounded_function.name,
                                              signature=lifted_signature)
         lifted_state_function.set_value(grounded_function.value)
@@ -100,3 +112,38 @@ class NumericFunctionMatcher:
                     possible_matches[matched_lifted_function.untyped_representation] = matched_lifted_function
 
         return possible_matches
+
+    def match_state_function_names(self, action_call: ActionCall,
+                                   grounded_function_names: Collection[str]) -> Dict[str, str]:
+        """Match the names of the grounded state functions to the action without creating the function objects.
+
+        :param action_call: the action that was called in the observation.
+        :param grounded_function_names: the untyped representations of the grounded numeric state fluents.
+        :return: a dictionary mapping the lifted functions' representations to the matching grounded functions.
+        """
+        self.logger.debug(f"Matching the state function names to the grounded action - {str(action_call)}")
+        executed_action = self.matcher_domain.actions[action_call.name]
+        possible_matches = {}
+        for domain_function in self.matcher_domain.functions.values():
+            if len(domain_function.signature) > len(action_call.parameters) and len(self.matcher_domain.constants) == 0:
+                continue
+
+            if len(domain_function.signature) == 0:
+                if domain_function.untyped_representation in grounded_function_names:
+                    possible_matches[domain_function.untyped_representation] = \
+                        domain_function.untyped_representation
+
+                continue
+
+            call_parameters = action_call.parameters + list(self.matcher_domain.constants.keys())
+            for grounded_objects in permutations(call_parameters, len(domain_function.signature)):
+                grounded_function_name = f"({domain_function.name} {' '.join(grounded_objects)})"
+                if grounded_function_name not in grounded_function_names:
+                    continue
+
+                lifted_signature = self._lift_function_objects(
+                    executed_action, action_call.parameters, list(grounded_objects))
+                lifted_function = PDDLFunction(name=domain_function.name, signature=lifted_signature)
+                possible_matches[lifted_function.untyped_representation] = grounded_function_name
+
+        return possible_matches
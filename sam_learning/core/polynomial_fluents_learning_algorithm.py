@@ -3,9 +3,9 @@ import itertools
 from typing import Dict, List, Optional, Tuple
 
 import numpy
-from pddl_plus_parser.models import PDDLFunction
 
 from sam_learning.core import ConditionType
+from sam_learning.core.fluent_values_matrix import FluentValuesMatrix
 from sam_learning.core.numeric_fluent_learner_algorithm import NumericFluentStateStorage
 
 
@@ -20,8 +20,9 @@ class PolynomialFluentsLearningAlgorithm(NumericFluentStateStorage):
     polynom_degree: int
     is_verbose: bool
 
-    def __init__(self, action_name: str, polynom_degree: int, is_verbose: bool = False):
-        super().__init__(action_name)
+    def __init__(self, action_name: str, polynom_degree: int, is_verbose: bool = False,
+                 compaction_interval: Optional[int] = None):
+        super().__init__(action_name, compaction_interval=compaction_interval)
         self.polynom_degree = polynom_degree
         self.is_verbose = is_verbose
 
@@ -44,51 +45,53 @@ class PolynomialFluentsLearningAlgorithm(NumericFluentStateStorage):
         """
         return self._create_polynomial_string_recursive(fluents)
 
-    def _add_polynom_to_storage(self, state_fluents: Dict[str, PDDLFunction],
-                                storage: Dict[str, List[float]]) -> None:
+    def _add_polynom_to_storage(self, state_values: Dict[str, float],
+                                storage: FluentValuesMatrix) -> None:
         """Adds the polynomial representation of the state fluents to the storage.
 
-        :param state_fluents: the numeric fluents present in the input state.
+        :param state_values: the values of the numeric fluents present in the input state.
         :param storage: the storage to update.
         """
         if self.polynom_degree == 1:
-            for first_fluent, second_fluent in itertools.combinations(list(state_fluents.keys()), r=2):
+            for first_fluent, second_fluent in itertools.combinations(list(state_values.keys()), r=2):
                 multiplied_fluent = self.create_polynomial_string([first_fluent, second_fluent])
-                storage[multiplied_fluent].append(
-                    state_fluents[first_fluent].value * state_fluents[second_fluent].value)
+                storage.append(multiplied_fluent, state_values[first_fluent] * state_values[second_fluent])
             return
 
         for degree in range(2, self.polynom_degree + 1):
             for fluent_combination in itertools.combinations_with_replacement(
-                    list(state_fluents.keys()), r=degree):
+                    list(state_values.keys()), r=degree):
                 polynomial_fluent = self.create_polynomial_string(list(fluent_combination))
-                values = [state_fluents[fluent].value for fluent in fluent_combination]
-                self.previous_state_storage[polynomial_fluent].append(numpy.prod(values))
+                values = [state_values[fluent] for fluent in fluent_combination]
+                self.previous_state_storage.append(polynomial_fluent, numpy.prod(values))
 
-    def add_to_previous_state_storage(self, state_fluents: Dict[str, PDDLFunction]) -> None:
-        """Adds the matched lifted state fluents to the previous state storage.
+    def add_previous_state_row(self, fluents: List[str], values: numpy.ndarray) -> None:
+        """Adds a row of values of the matched lifted state fluents to the previous state storage.
 
-        :param state_fluents: the lifted state fluents that were matched for the action.
+        :param fluents: the lifted state fluents that were matched for the action.
+        :param values: the values of the fluents, NaN marks fluents that are not defined in the state.
         """
-        super().add_to_previous_state_storage(state_fluents)
+        super().add_previous_state_row(fluents, values)
         if self.polynom_degree == 0:
             return
 
-        self._add_polynom_to_storage(state_fluents, self.previous_state_storage)
+        state_values = {fluent: float(value) for fluent, value in zip(fluents, values) if not numpy.isnan(value)}
+        self._add_polynom_to_storage(state_values, self.previous_state_storage)
 
-    def add_to_next_state_storage(self, state_fluents: Dict[str, PDDLFunction]) -> None:
-        """Adds the matched lifted state fluents to the next state storage.
+    def add_next_state_row(self, fluents: List[str], values: numpy.ndarray) -> None:
+        """Adds a row of values of the matched lifted state fluents to the next state storage.
 
-        :param state_fluents: the lifted state fluents that were matched for the action.
+        :param fluents: the lifted state fluents that were matched for the action.
+        :param values: the values of the fluents, NaN marks fluents that are not defined in the state.
         """
-        super().add_to_next_state_storage(state_fluents)
+        super().add_next_state_row(fluents, values)
         if self.polynom_degree == 0:
             return
 
         for fluent in self.next_state_storage:
             if len(self.previous_state_storage.get(fluent, [])) != len(self.next_state_storage[fluent]):
                 self.logger.debug("This is a case where effects create new fluents - should adjust the previous state.")
-                self.previous_state_storage[fluent].append(0)
+                self.previous_state_storage.append(fluent, 0)
 
     def construct_safe_linear_inequalities(
             self, relevant_fluents: Optional[List[str]] = None) -> Tuple[List[str], ConditionType]:
@@ -1,10 +1,15 @@
 """Matches predicates to their corresponding actions based on the common types."""
 import logging
-from typing import List, Tuple, Optional
+from collections import defaultdict
+from itertools import product
+from typing import List, Tuple, Optional, Dict, Iterable, Set, Union, FrozenSet
 
-from pddl_plus_parser.models import Domain, Predicate, GroundedPredicate, ActionCall, PDDLObject
+from pddl_plus_parser.models import Domain, Predicate, GroundedPredicate, ActionCall, PDDLObject, State
 
-from sam_learning.core.matching_utils import contains_duplicates, create_signature_permutations
+from sam_learning.core.matching_utils import contains_duplicates
+
+
+LiftingTable = Dict[Tuple[int, ...], Predicate]
 
 
 class PredicatesMatcher:
@@ -12,54 +17,95 @@ class PredicatesMatcher:
 
     matcher_domain: Domain
     logger: logging.Logger
+    _lifting_tables: Dict[str, Dict[Tuple[str, Tuple[str, ...]], LiftingTable]]
+    _liftable_literals: Dict[str, FrozenSet[Predicate]]
 
     def __init__(self, domain: Domain):
         self.logger = logging.getLogger(__name__)
         self.matcher_domain = domain
+        self._lifting_tables = defaultdict(dict)
+        self._liftable_literals = {}
 
-    @staticmethod
-    def _extract_combinations_data(possible_combinations: Tuple[Tuple[str]]) -> Tuple[List[str], List[str]]:
-        """extracts the data of the combinations so that the matcher would be able to use it.
+    def _create_lifting_table(self, action_name: str,
+                              grounded_predicate: Union[GroundedPredicate, Predicate]) -> LiftingTable:
+        """Creates the table mapping the positions of the predicate's objects in the action's call to the lifted
+            predicate.
 
-        :param possible_combinations: the possible combinations of the parameters.
-        :return: the extracted parameters and the objects.
-        """
-        call_objects = []
-        lifted_params = []
-        for obj, param in possible_combinations:
-            call_objects.append(obj)
-            lifted_params.append(param)
-
-        return call_objects, lifted_params
-
-    def _filter_out_impossible_combinations(self, grounded_predicate: GroundedPredicate,
-                                            possible_matches: List[Predicate],
-                                            possible_grounded_params: List[List[str]]) -> List[Predicate]:
-        """Filters out signature permutations that don't match the original predicate's order.
-
-        :param grounded_predicate: the grounded predicate that is being matches.
-        :param possible_matches: the possible matching permutations generated.
-        :param possible_grounded_params: the list of objects that represent the lifted parameters.
-            used to filter out wrong permutations.
-        :return: the correct possible matches that fit the original parameters order.
+        Note: the positions refer to the action's parameters followed by the domain's constants. Predicates with no
+            parameters are mapped from the empty positions tuple and thus match every action.
+
+        :param action_name: the name of the action that the predicate is lifted according to.
+        :param grounded_predicate: a grounded predicate whose name and signature types the table is created for.
+        :return: the table mapping the objects' positions to the matching lifted predicate.
         """
-        self.logger.debug("Filtering out impossible matches from the matches list.")
-        filtered_matches = []
-        for match, grounded_matching_objects in zip(possible_matches, possible_grounded_params):
-            is_possible_match = True
-            if grounded_predicate.grounded_objects != grounded_matching_objects:
+        self.logger.debug(f"Creating the lifting table of the predicate {grounded_predicate.name} "
+                          f"for the action {action_name}.")
+        lifted_action_data = self.matcher_domain.actions[action_name]
+        constants = self.matcher_domain.constants
+        lifted_parameters = list(lifted_action_data.signature.keys()) + list(constants.keys())
+        parameters_types = list(lifted_action_data.signature.values()) + \
+            [constant.type for constant in constants.values()]
+        compatible_positions = [
+            [position for position, parameter_type in enumerate(parameters_types)
+             if parameter_type.is_sub_type(predicate_parameter_type)]
+            for predicate_parameter_type in grounded_predicate.signature.values()]
+
+        lifting_table = {}
+        for positions in product(*compatible_positions):
+            if contains_duplicates(list(positions)):
                 continue
 
-            for signature_item_type, grounded_predicate_signature_item_type in \
-                    zip(match.signature.values(), grounded_predicate.signature.values()):
-                if not signature_item_type.is_sub_type(grounded_predicate_signature_item_type):
-                    is_possible_match = False
-                    break
+            lifting_table[positions] = Predicate(name=grounded_predicate.name, signature={
+                lifted_parameters[position]: parameters_types[position] for position in positions})
+
+        return lifting_table
+
+    def _get_lifting_table(self, action_name: str,
+                           grounded_predicate: Union[GroundedPredicate, Predicate]) -> LiftingTable:
+        """Returns the lifting table of the predicate for the action, the table is created on its first use.
+
+        :param action_name: the name of the action that the predicate is lifted according to.
+        :param grounded_predicate: the grounded predicate that is being lifted.
+        :return: the table mapping the objects' positions to the matching lifted predicate.
+        """
+        table_key = (grounded_predicate.name,
+                     tuple(parameter_type.name for parameter_type in grounded_predicate.signature.values()))
+        action_lifting_tables = self._lifting_tables[action_name]
+        if table_key not in action_lifting_tables:
+            action_lifting_tables[table_key] = self._create_lifting_table(action_name, grounded_predicate)
+
+        return action_lifting_tables[table_key]
+
+    def _create_objects_positions_map(self, action_call: ActionCall) -> Dict[str, List[int]]:
+        """Maps each of the objects in the action call and each of the domain constants to their positions.
+
+        :param action_call: the action that was called in the observation.
+        :return: the mapping between the object names and their positions in the action call followed by the constants.
+        """
+        objects_positions = defaultdict(list)
+        for position, object_name in enumerate(action_call.parameters + list(self.matcher_domain.constants.keys())):
+            objects_positions[object_name].append(position)
+
+        return objects_positions
 
-            if is_possible_match:
-                filtered_matches.append(match)
+    def _lift_grounded_predicate(self, grounded_predicate: GroundedPredicate, action_call: ActionCall,
+                                 objects_positions: Dict[str, List[int]]) -> List[Predicate]:
+        """Lifts the grounded predicate by looking up the positions of its objects in the predicate's lifting table.
+
+        :param grounded_predicate: the grounded predicate that was observed.
+        :param action_call: the action that was called in the observation.
+        :param objects_positions: the positions of the objects in the action call followed by the constants.
+        :return: lifted predicates with signatures matching the action.
+        """
+        lifting_table = self._get_lifting_table(action_call.name, grounded_predicate)
+        possible_matches = []
+        for positions in product(*(objects_positions.get(object_name, [])
+                                   for object_name in grounded_predicate.object_mapping.values())):
+            lifted_predicate = lifting_table.get(positions)
+            if lifted_predicate is not None:
+                possible_matches.append(lifted_predicate)
 
-        return filtered_matches
+        return possible_matches
 
     def match_predicate_to_action_literals(
             self, grounded_predicate: GroundedPredicate, action_call: ActionCall,
@@ -70,38 +116,13 @@ class PredicatesMatcher:
         :param action_call: the action that was called in the observation.
         :return: lifted predicates with signatures matching the action.
         """
-        self.logger.info(f"Trying to match the grounded predicate - {grounded_predicate.untyped_representation} "
-                         f"to the action call {str(action_call)}")
-        if len(grounded_predicate.signature) == 0:
-            self.logger.debug("The predicate has no parameters, by default matches the action!")
-            return [Predicate(name=grounded_predicate.name, signature={})]
-
-        lifted_action_data = self.matcher_domain.actions[action_call.name]
-        constants = self.matcher_domain.constants
-        grounded_predicate_call = grounded_predicate.grounded_objects
-        action_grounded_objects = action_call.parameters + list(constants.keys())
-        lifted_action_params = list(lifted_action_data.signature.keys()) + list(constants.keys())
+        self.logger.debug("Trying to match the grounded predicate - %s to the action call %s",
+                          grounded_predicate.untyped_representation, action_call)
         if contains_duplicates(action_call.parameters):
             self.logger.debug(f"Action {str(action_call)} was executed with duplicated objects!")
 
-        possible_parameter_permutations = create_signature_permutations(
-            action_grounded_objects, lifted_action_params, len(grounded_predicate_call))
-        possible_matches = []
-        grounded_base_params = []
-        for possible_permutation in possible_parameter_permutations:
-            possible_match_action_objects, lifted_parameters = self._extract_combinations_data(possible_permutation)
-            if set(possible_match_action_objects) == set(grounded_predicate_call):
-                combined_types = {**lifted_action_data.signature}
-                combined_types.update({name: constants[name].type for name in constants})
-                possible_matches.append(Predicate(
-                    name=grounded_predicate.name, signature={
-                        lifted_parameter_name: combined_types[lifted_parameter_name] for lifted_parameter_name in
-                        lifted_parameters
-                    }))
-                grounded_base_params.append(possible_match_action_objects)
-
-        possible_matches = self._filter_out_impossible_combinations(grounded_predicate, possible_matches, grounded_base_params)
-        return possible_matches
+        return self._lift_grounded_predicate(
+            grounded_predicate, action_call, self._create_objects_positions_map(action_call))
 
     def get_possible_literal_matches(
             self, grounded_action_call: ActionCall, state_literals: List[GroundedPredicate]) -> List[Predicate]:
@@ -111,14 +132,87 @@ class PredicatesMatcher:
         :param state_literals: the list of literals that we try to match according to the action.
         :return: a list of possible preconditions for the action that is being executed.
         """
-        self.logger.info(f"Finding the possible matches for the grounded action - {str(grounded_action_call)}")
+        self.logger.debug("Finding the possible matches for the grounded action - %s", grounded_action_call)
+        objects_positions = self._create_objects_positions_map(grounded_action_call)
         possible_matches = []
         for state_predicate in state_literals:
-            matches = self.match_predicate_to_action_literals(state_predicate, grounded_action_call)
-            if matches is None:
+            possible_matches.extend(self._lift_grounded_predicate(
+                state_predicate, grounded_action_call, objects_positions))
+
+        return possible_matches
+
+    def _lift_relevant_literals(self, grounded_action_call: ActionCall, grounded_literals: Iterable[GroundedPredicate],
+                                objects_positions: Dict[str, List[int]]) -> Set[Predicate]:
+        """Lifts the literals whose objects all appear in the action call or in the domain's constants.
+
+        :param grounded_action_call: the grounded action that was executed according to the trajectory.
+        :param grounded_literals: the grounded literals to lift.
+        :param objects_positions: the positions of the objects in the action call followed by the constants.
+        :return: the set of lifted literals matching the action.
+        """
+        lifted_literals = set()
+        for grounded_literal in grounded_literals:
+            if any(object_name not in objects_positions for object_name in grounded_literal.object_mapping.values()):
                 continue
 
-            possible_matches.extend(matches)
+            lifted_literals.update(self._lift_grounded_predicate(
+                grounded_literal, grounded_action_call, objects_positions))
 
-        return possible_matches
+        return lifted_literals
+
+    def lift_state_literals(
+            self, grounded_action_call: ActionCall, positive_literals: Union[State, Iterable[GroundedPredicate]],
+            negative_literals: Optional[Iterable[GroundedPredicate]] = None) -> Tuple[Set[Predicate], Set[Predicate]]:
+        """Lifts the positive and the negative literals of a state according to the action in a single pass.
+
+        Note: literals containing objects that are neither the action's parameters nor the domain's constants cannot
+            be lifted and are thus dropped before the matching.
+
+        :param grounded_action_call: the grounded action that was executed according to the trajectory.
+        :param positive_literals: the state or the grounded literals that are true in the state.
+        :param negative_literals: the grounded literals that are false in the state if the state is fully observable.
+        :return: the lifted positive and negative literals matching the action.
+        """
+        self.logger.debug("Lifting the state literals according to the grounded action - %s", grounded_action_call)
+        objects_positions = self._create_objects_positions_map(grounded_action_call)
+        if isinstance(positive_literals, State):
+            positive_literals = (grounded_literal for grounded_literals in positive_literals.state_predicates.values()
+                                 for grounded_literal in grounded_literals)
+
+        lifted_positive_literals = self._lift_relevant_literals(
+            grounded_action_call, positive_literals, objects_positions)
+        lifted_negative_literals = self._lift_relevant_literals(
+            grounded_action_call, negative_literals or [], objects_positions)
+        return lifted_positive_literals, lifted_negative_literals
+
+    def get_liftable_literals(self, action_name: str) -> FrozenSet[Predicate]:
+        """Returns all the lifted literals that can be bound to the action's parameters and the domain's constants.
+
+        Note: the literals are computed from the lifting tables of the domain's predicates and are thus never grounded.
+
+        :param action_name: the name of the action that the literals are lifted according to.
+        :return: the set of all the literals that can be lifted according to the action.
+        """
+        if action_name not in self._liftable_literals:
+            self._liftable_literals[action_name] = frozenset(
+                lifted_literal for predicate in self.matcher_domain.predicates.values()
+                for lifted_literal in self._get_lifting_table(action_name, predicate).values())
+
+        return self._liftable_literals[action_name]
+
+    def lift_closed_world_state_literals(
+            self, grounded_action_call: ActionCall,
+            positive_literals: Union[State, Iterable[GroundedPredicate]]) -> Tuple[Set[Predicate], Set[Predicate]]:
+        """Lifts the positive literals of a state and computes the negative literals under the closed world assumption.
 
+        Note: the negative literals are the literals that can be lifted according to the action but are not matched by
+            any of the positive literals, thus the negative grounded literals of the state are never enumerated.
+
+        :param grounded_action_call: the grounded action that was executed according to the trajectory.
+        :param positive_literals: the state or the grounded literals that are true in the state.
+        :return: the lifted positive and negative literals matching the action.
+        """
+        lifted_positive_literals, _ = self.lift_state_literals(grounded_action_call, positive_literals)
+        lifted_negative_literals = self.get_liftable_literals(grounded_action_call.name).difference(
+            lifted_positive_literals)
+        return lifted_positive_literals, set(lifted_negative_literals)
@@ -0,0 +1,108 @@
+"""Module containing the sufficient statistics used to learn the linear numeric effects of an action."""
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+PREVIOUS_STATE = "previous"
+NEXT_STATE = "next"
+BIAS_COLUMN = ("bias", "")
+RESIDUALS_TOLERANCE = 1e-10
+
+Column = Tuple[str, str]  # (state type, lifted fluent)
+
+
+class LinearRegressionStatistics:
+    """Accumulates the observed (pre-state, post-state) samples of an action into the triangular factor R of the
+    samples matrix, so that the linear effects can be learned without keeping the history of the samples.
+
+    Note: the samples matrix Z contains a column per fluent in the previous state, a bias column and a column per
+        fluent in the next state. Since Z^T Z = R^T R, the normal equations of any subset of the columns (and the
+        residuals of their least squares solution) are computed from R instead of Z. R is updated using a QR
+        factorization once enough samples were buffered, so each sample costs O(d^2) and solving costs O(d^3), where d
+        is the number of columns. Fluents that are observed for the first time are assumed to be zero in the samples
+        observed before them.
+    """
+
+    num_samples: int
+    _columns_indexes: Dict[Column, int]
+    _triangular_factor: np.ndarray
+    _pending_samples: List[np.ndarray]
+
+    def __init__(self):
+        self.num_samples = 0
+        self._columns_indexes = {BIAS_COLUMN: 0}
+        self._triangular_factor = np.zeros((1, 1))
+        self._pending_samples = []
+
+    def _get_column_index(self, column: Column) -> int:
+        """Returns the index of the column in the factor, adding a zero column if the column was not seen before.
+
+        :param column: the state type and the lifted fluent of the column.
+        :return: the index of the column.
+        """
+        if column not in self._columns_indexes:
+            num_columns = len(self._columns_indexes)
+            self._columns_indexes[column] = num_columns
+            self._triangular_factor = np.pad(self._triangular_factor, ((0, 1), (0, 1)))
+            self._pending_samples = [np.r_[sample, 0.0] for sample in self._pending_samples]
+
+        return self._columns_indexes[column]
+
+    def _flush_pending_samples(self) -> None:
+        """Updates the triangular factor with the samples that were buffered since the last update."""
+        if len(self._pending_samples) == 0:
+            return
+
+        num_columns = len(self._columns_indexes)
+        stacked_matrix = np.vstack([self._triangular_factor, *self._pending_samples])
+        self._triangular_factor = np.linalg.qr(stacked_matrix, mode="r")[:num_columns]
+        self._pending_samples = []
+
+    def add_sample(self, previous_state_values: Dict[str, float], next_state_values: Dict[str, float]) -> None:
+        """Adds the values of the fluents before and after the action's execution to the statistics.
+
+        :param previous_state_values: the values of the lifted fluents in the previous state.
+        :param next_state_values: the values of the lifted fluents in the next state.
+        """
+        sample_columns = [(self._get_column_index((PREVIOUS_STATE, fluent)), value)
+                          for fluent, value in previous_state_values.items()]
+        sample_columns.extend((self._get_column_index((NEXT_STATE, fluent)), value)
+                              for fluent, value in next_state_values.items())
+        sample = np.zeros(len(self._columns_indexes))
+        sample[0] = 1.0
+        for column_index, value in sample_columns:
+            sample[column_index] = value
+
+        self._pending_samples.append(sample)
+        self.num_samples += 1
+        if len(self._pending_samples) >= len(self._columns_indexes):
+            self._flush_pending_samples()
+
+    def solve(self, input_fluents: List[str],
+              output_fluents: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Solves the least squares problems of the next state values of the output fluents as linear functions of the
+        previous state values of the input fluents.
+
+        :param input_fluents: the fluents of the previous state that are the variables of the linear functions.
+        :param output_fluents: the fluents of the next state whose values are learned.
+        :return: (input fluents + 1) x (output fluents) matrix with the coefficients of the inputs followed by the
+            intercept of each output and the learning score (R^2) of each output.
+        """
+        self._flush_pending_samples()
+        input_columns = [self._columns_indexes[(PREVIOUS_STATE, fluent)] for fluent in input_fluents]
+        input_factor = self._triangular_factor[:, [*input_columns, self._columns_indexes[BIAS_COLUMN]]]
+        output_factor = self._triangular_factor[:, [self._columns_indexes[(NEXT_STATE, fluent)]
+                                                    for fluent in output_fluents]]
+        coefficients, *_ = np.linalg.lstsq(input_factor, output_factor, rcond=None)
+        residuals = np.sum((input_factor @ coefficients - output_factor) ** 2, axis=0)
+
+        bias_factor = self._triangular_factor[:, [self._columns_indexes[BIAS_COLUMN]]]
+        centered_outputs = output_factor - bias_factor @ (bias_factor.T @ output_factor) / self.num_samples
+        total_variances = np.sum(centered_outputs ** 2, axis=0)
+        outputs_scale = np.sum(output_factor ** 2, axis=0)
+        is_exact = residuals <= RESIDUALS_TOLERANCE ** 2 * outputs_scale
+        is_constant = total_variances <= RESIDUALS_TOLERANCE ** 2 * outputs_scale
+        with np.errstate(divide="ignore", invalid="ignore"):
+            learning_scores = np.where(is_exact, 1.0, np.where(is_constant, 0.0, 1 - residuals / total_variances))
+
+        return coefficients, learning_scores
@@ -0,0 +1,143 @@
+"""Module containing observations whose components are parsed lazily while streaming the trajectory file."""
+import re
+from pathlib import Path
+from typing import Iterator, List, Union, Optional, Dict
+
+from pddl_plus_parser.lisp_parsers import TrajectoryParser
+from pddl_plus_parser.models import Domain, Problem, ObservedComponent, MultiAgentComponent, PDDLObject, State, \
+    ActionCall
+
+COMMENT_REGEX = re.compile(r";.*")
+STATE_EXPRESSIONS = {":init", ":state"}
+ACTION_EXPRESSION = "operator:"
+JOINT_ACTION_EXPRESSION = "operators:"
+
+Expression = Union[str, List["Expression"]]
+TrajectoryComponent = Union[ObservedComponent, MultiAgentComponent]
+
+
+def iterate_trajectory_expressions(trajectory_file_path: Path) -> Iterator[Expression]:
+    """Reads the trajectory file line by line and yields each of its top-level expressions once it is complete.
+
+    Note: the tokens are extracted the same way the PDDL tokenizer extracts them, but only the expression that is
+        currently being read is kept in memory.
+
+    :param trajectory_file_path: the path to the trajectory file.
+    :return: generator of the expressions of the trajectory (states and action calls).
+    """
+    expressions_stack = []
+    with open(trajectory_file_path, "rt", encoding="utf-8") as trajectory_file:
+        for line in trajectory_file:
+            if line.strip().startswith(";"):
+                continue
+
+            line_tokens = COMMENT_REGEX.sub("", line).lower().replace("(", " ( ").replace(")", " ) ").split()
+            for token in line_tokens:
+                if token == "(":
+                    expressions_stack.append([])
+                    continue
+
+                if token == ")":
+                    if len(expressions_stack) == 0:
+                        raise SyntaxError("Unexpected ) while parsing the trajectory")
+
+                    expression = expressions_stack.pop()
+                    if len(expressions_stack) == 1:
+                        yield expression
+
+                    elif len(expressions_stack) > 1:
+                        expressions_stack[-1].append(expression)
+
+                    continue
+
+                if len(expressions_stack) > 1:
+                    expressions_stack[-1].append(token)
+
+    if len(expressions_stack) > 0:
+        raise SyntaxError("Unexpected EOF while parsing the trajectory")
+
+
+class StreamedComponents:
+    """Re-iterable view of the components of a trajectory, each iteration streams the trajectory file again."""
+
+    trajectory_parser: TrajectoryParser
+    trajectory_file_path: Path
+    executing_agents: Optional[List[str]]
+    _num_components: Optional[int]
+
+    def __init__(self, trajectory_parser: TrajectoryParser, trajectory_file_path: Path,
+                 executing_agents: Optional[List[str]] = None):
+        self.trajectory_parser = trajectory_parser
+        self.trajectory_file_path = trajectory_file_path
+        self.executing_agents = executing_agents
+        self._num_components = None
+
+    def __len__(self) -> int:
+        if self._num_components is None:
+            self._num_components = sum(1 for expression in iterate_trajectory_expressions(self.trajectory_file_path)
+                                       if expression[0] in (ACTION_EXPRESSION, JOINT_ACTION_EXPRESSION))
+
+        return self._num_components
+
+    def __iter__(self) -> Iterator[TrajectoryComponent]:
+        previous_state = None
+        action_call = None
+        for expression in iterate_trajectory_expressions(self.trajectory_file_path):
+            if expression[0] in STATE_EXPRESSIONS:
+                if action_call is not None:
+                    next_state = self.trajectory_parser.parse_state(expression[1:])
+                    yield self._create_component(previous_state, action_call, next_state)
+                    action_call = None
+
+                previous_state = self.trajectory_parser.parse_state(expression[1:])
+                continue
+
+            if previous_state is None or action_call is not None:
+                raise SyntaxError("Encountered an action call that does not follow a state!")
+
+            if expression[0] == ACTION_EXPRESSION:
+                action_call = self.trajectory_parser.parse_action_call(expression[1:])
+
+            elif expression[0] == JOINT_ACTION_EXPRESSION:
+                action_call = self.trajectory_parser.parse_joint_action(expression[1:], self.executing_agents)
+
+            else:
+                raise SyntaxError(f"Received illegal trajectory expression - {expression[0]}")
+
+        if action_call is not None:
+            raise SyntaxError("Encountered a trajectory without a next state!")
+
+    def _create_component(self, previous_state: State, action_call: Union[ActionCall, List[ActionCall]],
+                          next_state: State) -> TrajectoryComponent:
+        """Creates the component of the trajectory according to the type of the executed action.
+
+        :param previous_state: the state prior to the action's execution.
+        :param action_call: the executed action call or the joint action in multi-agent trajectories.
+        :param next_state: the state following the action's execution.
+        :return: the trajectory component.
+        """
+        if self.executing_agents is not None:
+            return MultiAgentComponent(previous_state, action_call, next_state)
+
+        return ObservedComponent(previous_state, action_call, next_state)
+
+
+class StreamingObservation:
+    """Observation whose components are parsed lazily from the trajectory file whenever they are iterated.
+
+    Note: since the components are not stored, only the state of the component that is currently handled is kept in
+        memory. Iterating the components more than once reads the trajectory file again.
+    """
+
+    trajectory_file_path: Path
+    grounded_objects: Dict[str, PDDLObject]
+    agents_in_observation: Optional[List[str]]
+    components: StreamedComponents
+
+    def __init__(self, domain: Domain, problem: Problem, trajectory_file_path: Path,
+                 executing_agents: Optional[List[str]] = None):
+        self.trajectory_file_path = trajectory_file_path
+        self.grounded_objects = problem.objects
+        self.agents_in_observation = executing_agents
+        self.components = StreamedComponents(TrajectoryParser(domain, problem), trajectory_file_path,
+                                             executing_agents)
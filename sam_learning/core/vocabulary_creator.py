@@ -1,70 +1,109 @@
 import logging
-from collections import defaultdict
-from itertools import permutations
-from typing import List, Tuple, Dict, Set, Union
+from collections import defaultdict, OrderedDict
+from itertools import product
+from typing import List, Tuple, Dict, Union, FrozenSet
 
-from pddl_plus_parser.models import Predicate, PDDLObject, GroundedPredicate, PDDLType, Domain
+from pddl_plus_parser.models import Predicate, PDDLObject, GroundedPredicate, Domain
 
 from sam_learning.core import LearnerDomain
 
+MAX_VOCABULARY_CACHE_SIZE = 4096
 
-def choose_objects_subset(array: List[str], subset_size: int) -> List[Tuple[str]]:
-    """Choose r items our of a list size n.
-
-    :param array: the input list.
-    :param subset_size: the size of the subset.
-    :return: a list containing subsets of the original list.
-    """
-    return list(permutations(array, subset_size))
+VocabularyCacheKey = Tuple[str, Tuple[Tuple[str, str], ...]]
 
 
 class VocabularyCreator:
     """Creates predicate vocabulary from a domain containing action signatures and predicate definitions."""
 
-    def __init__(self):
+    logger: logging.Logger
+    max_cache_size: int
+    _vocabulary_cache: "OrderedDict[VocabularyCacheKey, Dict[str, FrozenSet[GroundedPredicate]]]"
+
+    def __init__(self, max_cache_size: int = MAX_VOCABULARY_CACHE_SIZE):
         self.logger = logging.getLogger(__name__)
+        self.max_cache_size = max_cache_size
+        self._vocabulary_cache = OrderedDict()
 
-    def _validate_type_matching(self, grounded_signatures: Dict[str, PDDLType], predicate: Predicate) -> bool:
-        """Validates that the types of the grounded signature match the types of the predicate signature.
+    @staticmethod
+    def _create_cache_key(domain: Union[LearnerDomain, Domain],
+                          observed_objects: Dict[str, PDDLObject]) -> VocabularyCacheKey:
+        """Creates the key of the vocabulary cache from the typed objects that the vocabulary is created from.
+
+        :param domain: the domain containing the predicates and the action signatures.
+        :param observed_objects: the objects that were observed in the trajectory.
+        :return: the key representing the domain and the typed objects.
+        """
+        typed_objects = tuple(sorted((object_name, pddl_object.type.name)
+                                     for object_name, pddl_object in observed_objects.items()))
+        return domain.name, typed_objects
+
+    @staticmethod
+    def _index_objects_by_parameter_types(
+            predicate: Predicate, possible_objects: Dict[str, PDDLObject],
+            type_compatible_objects: Dict[str, List[str]]) -> List[List[str]]:
+        """Finds for each of the predicate's parameters the objects whose type is compatible with the parameter's type.
 
-        :param grounded_signatures: the grounded predicate signature.
         :param predicate: the lifted predicate.
-        :return: whether the types match.
+        :param possible_objects: the objects and constants that can ground the predicate.
+        :param type_compatible_objects: the compatible objects that were already computed, indexed by the type name.
+        :return: a list containing, for each parameter, the names of the objects that can be assigned to it.
         """
-        for object_name, predicate_parameter in zip(grounded_signatures, predicate.signature):
-            parameter_type = predicate.signature[predicate_parameter]
-            grounded_type = grounded_signatures[object_name]
-            if not grounded_type.is_sub_type(parameter_type):
-                self.logger.debug(f"The combination of objects - {grounded_signatures}"
-                                  f" does not fit {predicate.name}'s signature")
-                return False
+        compatible_objects = []
+        for parameter_type in predicate.signature.values():
+            if parameter_type.name not in type_compatible_objects:
+                type_compatible_objects[parameter_type.name] = [
+                    object_name for object_name, pddl_object in possible_objects.items()
+                    if pddl_object.type.is_sub_type(parameter_type)]
 
-        return True
+            compatible_objects.append(type_compatible_objects[parameter_type.name])
 
-    def create_vocabulary(self, domain: Union[LearnerDomain, Domain],
-                          observed_objects: Dict[str, PDDLObject]) -> Dict[str, Set[GroundedPredicate]]:
-        """Create a vocabulary of random combinations of the predicates parameters and objects.
+        return compatible_objects
+
+    def _generate_vocabulary(self, domain: Union[LearnerDomain, Domain],
+                             observed_objects: Dict[str, PDDLObject]) -> Dict[str, FrozenSet[GroundedPredicate]]:
+        """Generates the grounded predicates using only objects whose types match the predicates' signatures.
 
         :param domain: the domain containing the predicates and the action signatures.
         :param observed_objects: the objects that were observed in the trajectory.
-        :return: list containing all the predicates with the different combinations of parameters.
+        :return: the grounded predicates indexed by the lifted predicate representation.
         """
         vocabulary = defaultdict(set)
-        possible_objects = list(observed_objects.keys()) + list(domain.constants.keys())
-        objects_and_consts = list(observed_objects.values()) + list(domain.constants.values())
+        possible_objects = {**observed_objects, **domain.constants}
+        type_compatible_objects = {}
         for predicate in domain.predicates.values():
-            predicate_name = predicate.name
-            signature_permutations = choose_objects_subset(possible_objects, len(predicate.signature))
-            for signature_permutation in signature_permutations:
-                grounded_signature = {object_name: objects_and_consts[possible_objects.index(object_name)].type
-                                      for object_name in signature_permutation}
-                if not self._validate_type_matching(grounded_signature, predicate):
+            compatible_objects = self._index_objects_by_parameter_types(
+                predicate, possible_objects, type_compatible_objects)
+            for objects_combination in product(*compatible_objects):
+                if len(set(objects_combination)) < len(objects_combination):
                     continue
 
-                grounded_predicate = GroundedPredicate(name=predicate_name, signature=predicate.signature,
+                grounded_predicate = GroundedPredicate(name=predicate.name, signature=predicate.signature,
                                                        object_mapping={parameter_name: object_name for
                                                                        object_name, parameter_name in
-                                    zip(grounded_signature, predicate.signature)})
+                                                                       zip(objects_combination, predicate.signature)})
                 vocabulary[predicate.untyped_representation].add(grounded_predicate)
 
+        return {lifted_predicate: frozenset(grounded_predicates)
+                for lifted_predicate, grounded_predicates in vocabulary.items()}
+
+    def create_vocabulary(self, domain: Union[LearnerDomain, Domain],
+                          observed_objects: Dict[str, PDDLObject]) -> Dict[str, FrozenSet[GroundedPredicate]]:
+        """Create a vocabulary of all the groundings of the predicates using objects that match their parameters' types.
+
+        Note: the vocabulary is cached according to the typed objects, thus the returned sets should not be modified.
+
+        :param domain: the domain containing the predicates and the action signatures.
+        :param observed_objects: the objects that were observed in the trajectory.
+        :return: the type-compatible grounded predicates indexed by the lifted predicate representation.
+        """
+        cache_key = self._create_cache_key(domain, observed_objects)
+        if cache_key in self._vocabulary_cache:
+            self._vocabulary_cache.move_to_end(cache_key)
+            return self._vocabulary_cache[cache_key]
+
+        vocabulary = self._generate_vocabulary(domain, observed_objects)
+        self._vocabulary_cache[cache_key] = vocabulary
+        if len(self._vocabulary_cache) > self.max_cache_size:
+            self._vocabulary_cache.popitem(last=False)
+
         return vocabulary
@@ -1,11 +1,12 @@
 """Module containing the algorithm to learn action models with conditional effects."""
 import logging
-from typing import Dict, List, Optional, Set, Tuple
+from copy import deepcopy
+from typing import Dict, List, Optional, Set, Tuple, Iterable
 
 from pddl_plus_parser.models import Domain, State, GroundedPredicate, ActionCall, Observation, \
     ObservedComponent, Predicate, ConditionalEffect, PDDLConstant
 
-from sam_learning.core import DependencySet, LearnerDomain, extract_effects, LearnerAction
+from sam_learning.core import DependencySet, LearnerDomain, extract_effects, LearnerAction, LiteralsInterner
 from sam_learning.learners import SAMLearner
 
 NOT_PREFIX = "(not"
@@ -66,7 +67,7 @@ class ConditionalSAM(SAMLearner):
         self.logger.debug("Initializing the dependency set and the effects for the action %s.", grounded_action.name)
         grounded_predicates = self._merge_positive_and_negative_predicates(self.previous_state_positive_predicates,
                                                                            self.previous_state_negative_predicates)
-        lifted_predicates = self.matcher.get_possible_literal_matches(grounded_action, list(grounded_predicates))
+        lifted_predicates, _ = self.matcher.lift_state_literals(grounded_action, grounded_predicates)
         dependency_set = DependencySet(self.max_antecedents_size)
         dependency_set.initialize_dependencies(set(lifted_predicates))
         self.dependency_set[grounded_action.name] = dependency_set
@@ -80,52 +81,62 @@ class ConditionalSAM(SAMLearner):
         """
         self.logger.debug(f"updating the effects for the action {grounded_action.name}.")
         observed_action = self.partial_domain.actions[grounded_action.name]
-        positive_next_state_matches = self.matcher.get_possible_literal_matches(
-            grounded_action, list(self.next_state_positive_predicates))
-        negative_next_state_matches = self.matcher.get_possible_literal_matches(
-            grounded_action, list(self.next_state_negative_predicates))
+        positive_next_state_matches, negative_next_state_matches = self.matcher.lift_state_literals(
+            grounded_action, self.next_state_positive_predicates, self.next_state_negative_predicates)
         observed_action.add_effects.difference_update(negative_next_state_matches)
         observed_action.delete_effects.difference_update(positive_next_state_matches)
         self.logger.debug(f"Done filtering out predicates that cannot be effects.")
 
+    def _get_literals_interner(self, grounded_action: ActionCall) -> LiteralsInterner:
+        """Returns the interner indexing the literals of the action's dependency set.
+
+        :param grounded_action: the action that is being executed.
+        :return: the literals interner of the action's dependency set.
+        """
+        if grounded_action.name not in self.dependency_set:
+            raise ValueError(f"The dependency set of the action {grounded_action.name} must be initialized before "
+                             f"its literals are represented as bitsets!")
+
+        return self.dependency_set[grounded_action.name].literals_interner
+
     def _find_literals_not_in_state(
             self, grounded_action: ActionCall, positive_predicates: Set[GroundedPredicate],
-            negative_predicates: Set[GroundedPredicate]) -> Set[str]:
+            negative_predicates: Set[GroundedPredicate]) -> int:
         """Finds literals that are not present in the current state.
 
+        Note: the action's dependency set must be initialized since its interner indexes the literals.
+
         :param grounded_action: the action that is being executed.
         :param positive_predicates: the positive state predicates.
         :param negative_predicates: the negative state predicates.
-        :return: the set of strings representing the literals that are not in the state.
+        :return: the bitset of the literals that are not in the state, indexed by the action's dependency set.
         """
-        state_positive_literals = self.matcher.get_possible_literal_matches(
-            grounded_action, list(positive_predicates))
-        state_negative_literals = self.matcher.get_possible_literal_matches(
-            grounded_action, list(negative_predicates))
+        state_positive_literals, state_negative_literals = self.matcher.lift_state_literals(
+            grounded_action, positive_predicates, negative_predicates)
         # since we want to capture the literals NOT in s' we will transpose the literals values.
-        missing_state_literals_str = [f"{NOT_PREFIX} {literal.untyped_representation})" for literal in
-                                      state_positive_literals]
-        missing_state_literals_str.extend([literal.untyped_representation for literal in state_negative_literals])
-        return set(missing_state_literals_str)
+        literals_interner = self._get_literals_interner(grounded_action)
+        return literals_interner.to_bitset(
+            f"{NOT_PREFIX} {literal.untyped_representation})" for literal in state_positive_literals) | \
+            literals_interner.to_bitset(literal.untyped_representation for literal in state_negative_literals)
 
     def _find_literals_existing_in_state(
-            self, grounded_action: ActionCall, positive_predicates, negative_predicates) -> Set[str]:
+            self, grounded_action: ActionCall, positive_predicates, negative_predicates) -> int:
         """Finds the literals present in the current state.
 
+        Note: the action's dependency set must be initialized since its interner indexes the literals.
+
         :param grounded_action: the action that is being executed.
         :param positive_predicates: the positive state predicates.
         :param negative_predicates: the negative state predicates.
-        :return: the set of strings representing the literals that are in the state.
+        :return: the bitset of the literals that are in the state, indexed by the action's dependency set.
         """
-        state_positive_literals = self.matcher.get_possible_literal_matches(
-            grounded_action, list(positive_predicates))
-        state_negative_literals = self.matcher.get_possible_literal_matches(
-            grounded_action, list(negative_predicates))
+        state_positive_literals, state_negative_literals = self.matcher.lift_state_literals(
+            grounded_action, positive_predicates, negative_predicates)
         # since we want to capture the literals ARE in s' we will transpose the literals values.
-        existing_state_literals_str = [literal.untyped_representation for literal in state_positive_literals]
-        existing_state_literals_str.extend([f"{NOT_PREFIX} {literal.untyped_representation})" for literal in
-                                            state_negative_literals])
-        return set(existing_state_literals_str)
+        literals_interner = self._get_literals_interner(grounded_action)
+        return literals_interner.to_bitset(literal.untyped_representation for literal in state_positive_literals) | \
+            literals_interner.to_bitset(
+                f"{NOT_PREFIX} {literal.untyped_representation})" for literal in state_negative_literals)
 
     def _remove_existing_previous_state_dependencies(self, grounded_action: ActionCall) -> None:
         """Removes the literals that exist in the previous state from the dependency set of a literal that is
@@ -133,13 +144,12 @@ class ConditionalSAM(SAMLearner):
 
         :param grounded_action: the action that is being executed.
         """
-        missing_next_state_literals_str = self._find_literals_not_in_state(
+        missing_next_state_literals = self._find_literals_not_in_state(
             grounded_action, self.next_state_positive_predicates, self.next_state_negative_predicates)
-        existing_previous_state_literals_str = self._find_literals_existing_in_state(
+        existing_previous_state_literals = self._find_literals_existing_in_state(
             grounded_action, self.previous_state_positive_predicates, self.previous_state_negative_predicates)
-        for literal in missing_next_state_literals_str:
-            self.dependency_set[grounded_action.name].remove_dependencies(
-                literal=literal, literals_to_remove=existing_previous_state_literals_str)
+        self.dependency_set[grounded_action.name].remove_bitset_dependencies(
+            literals_bitset=missing_next_state_literals, literals_to_remove_bitset=existing_previous_state_literals)
 
     def _remove_non_existing_previous_state_dependencies(
             self, grounded_action: ActionCall, previous_state: State, next_state: State) -> None:
@@ -152,17 +162,16 @@ class ConditionalSAM(SAMLearner):
         :return:
         """
         grounded_add_effects, grounded_del_effects = extract_effects(previous_state, next_state)
-        lifted_add_effects = self.matcher.get_possible_literal_matches(
-            grounded_action, list(grounded_add_effects))
-        lifted_delete_effects = self.matcher.get_possible_literal_matches(
-            grounded_action, list(grounded_del_effects))
-        effects_str = [literal.untyped_representation for literal in lifted_add_effects]
-        effects_str.extend([f"{NOT_PREFIX} {literal.untyped_representation})" for literal in lifted_delete_effects])
-        missing_pre_state_literals_str = self._find_literals_not_in_state(
+        lifted_add_effects, lifted_delete_effects = self.matcher.lift_state_literals(
+            grounded_action, grounded_add_effects, grounded_del_effects)
+        literals_interner = self._get_literals_interner(grounded_action)
+        effects = literals_interner.to_bitset(literal.untyped_representation for literal in lifted_add_effects) | \
+            literals_interner.to_bitset(
+                f"{NOT_PREFIX} {literal.untyped_representation})" for literal in lifted_delete_effects)
+        missing_pre_state_literals = self._find_literals_not_in_state(
             grounded_action, self.previous_state_positive_predicates, self.previous_state_negative_predicates)
-        for literal in effects_str:
-            self.dependency_set[grounded_action.name].remove_dependencies(
-                literal=literal, literals_to_remove=missing_pre_state_literals_str)
+        self.dependency_set[grounded_action.name].remove_bitset_dependencies(
+            literals_bitset=effects, literals_to_remove_bitset=missing_pre_state_literals)
 
     def _remove_not_possible_dependencies(
             self, grounded_action: ActionCall, previous_state: State, next_state: State) -> None:
@@ -224,7 +233,7 @@ class ConditionalSAM(SAMLearner):
         :param action: the action that is being constructed.
         :param action_dependency_set: the action's dependency set.
         """
-        for literal, dependencies in action_dependency_set.dependencies.items():
+        for literal in action_dependency_set.antecedents:
             if not action_dependency_set.is_safe_conditional_effect(literal):
                 self.logger.debug(f"The literal {literal} is not a conditional effect.")
                 continue
@@ -320,19 +329,31 @@ class ConditionalSAM(SAMLearner):
             self._construct_conditional_effects_from_dependency_set(action, self.dependency_set[action.name])
             self.safe_actions.append(action.name)
 
-    def learn_action_model(self, observations: List[Observation]) -> Tuple[LearnerDomain, Dict[str, str]]:
-        """Learn the SAFE action model from the input trajectories.
+    def _construct_action_model(self) -> Tuple[LearnerDomain, Dict[str, str]]:
+        """Constructs the safe action model from the data collected in the dependency sets.
 
-        :param observations: the list of trajectories that are used to learn the safe action model.
-        :return: a domain containing the actions that were learned.
+        :return: a domain containing the actions that were learned and the learning report.
         """
-        self.logger.info("Starting to learn the action model!")
-        super().deduce_initial_inequality_preconditions()
-        for observation in observations:
-            self.current_trajectory_objects = observation.grounded_objects
-            for component in observation.components:
-                self.handle_single_trajectory_component(component)
-
         self.construct_safe_actions()
         learning_report = super()._construct_learning_report()
         return self.partial_domain, learning_report
+
+    def _copy_learning_state(self) -> "ConditionalSAM":
+        """Creates a copy of the learner that does not share the dependency sets with the current learner.
+
+        :return: a copy of the learner that does not share the mutable learning state with the current learner.
+        """
+        learner_copy = super()._copy_learning_state()
+        learner_copy.dependency_set = deepcopy(self.dependency_set)
+        return learner_copy
+
+    def learn_action_model(self, observations: Iterable[Observation]) -> Tuple[LearnerDomain, Dict[str, str]]:
+        """Learn the SAFE action model from the input trajectories.
+
+        :param observations: the trajectories that are used to learn the safe action model, the observations and their
+            components are consumed lazily.
+        :return: a domain containing the actions that were learned.
+        """
+        self.logger.info("Starting to learn the action model!")
+        self.add_observations(observations)
+        return self._construct_action_model()
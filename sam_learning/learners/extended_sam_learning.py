@@ -1,6 +1,6 @@
 """An extension to the SAM learning algorithm that can learn when the matching process is not injective."""
 from collections import defaultdict
-from typing import List, Tuple, Dict, Set
+from typing import List, Tuple, Dict, Set, Iterable
 
 from pddl_plus_parser.models import Observation, Predicate, ActionCall, State, Domain, ObservedComponent, \
     GroundedPredicate
@@ -92,11 +92,9 @@ class ExtendedSAM(SAMLearner):
         :param state_predicates: the grounded predicates observed in the post state.
         """
         self.logger.info(f"Removing impossible effects of action {grounded_action.name} based on rule 2 of SAM.")
-        observed_predicates = set()
-        for lifted_predicate, grounded_predicates in state_predicates.items():
-            observed_predicates.update(grounded_predicates)
-
-        lifted_matches = self.matcher.get_possible_literal_matches(grounded_action, list(observed_predicates))
+        observed_predicates = [grounded_predicate for grounded_predicates in state_predicates.values()
+                               for grounded_predicate in grounded_predicates]
+        lifted_matches, _ = self.matcher.lift_state_literals(grounded_action, observed_predicates)
         self.possible_add_effects[grounded_action.name].intersection_update(lifted_matches)
         self.possible_delete_effects[grounded_action.name].difference_update(lifted_matches)
 
@@ -185,10 +183,11 @@ class ExtendedSAM(SAMLearner):
                 self.logger.debug(f"Not all ambiguities were solved! Creating proxy actions for {action.name}.")
                 # TODO: complete this part.
 
-    def learn_action_model(self, observations: List[Observation]) -> Tuple[LearnerDomain, Dict[str, str]]:
+    def learn_action_model(self, observations: Iterable[Observation]) -> Tuple[LearnerDomain, Dict[str, str]]:
         """Learn the SAFE action model from the input trajectories.
 
-        :param observations: the list of trajectories that are used to learn the safe action model.
+        :param observations: the trajectories that are used to learn the safe action model, the observations and their
+            components are consumed lazily.
         :return: a domain containing the actions that were learned.
         """
         self.logger.info("Starting to learn the action model!")
@@ -1,7 +1,7 @@
 """Module to learn action models from multi-agent trajectories with joint actions."""
 import logging
 from collections import defaultdict
-from typing import Dict, List, Tuple, Set, Optional
+from typing import Dict, List, Tuple, Set, Optional, Iterable
 
 from pddl_plus_parser.models import Predicate, Domain, MultiAgentComponent, NOP_ACTION, \
     MultiAgentObservation, ActionCall, State, GroundedPredicate, JointActionCall
@@ -370,10 +370,10 @@ class MultiAgentSAM(SAMLearner):
                                                                   action.negative_preconditions)
 
     def learn_combined_action_model(
-            self, observations: List[MultiAgentObservation]) -> Tuple[LearnerDomain, Dict[str, str]]:
+            self, observations: Iterable[MultiAgentObservation]) -> Tuple[LearnerDomain, Dict[str, str]]:
         """Learn the SAFE action model from the input multi-agent trajectories.
 
-        :param observations: the multi-agent observations.
+        :param observations: the multi-agent observations, consumed lazily.
         :return: a domain containing the actions that were learned.
         """
         self.logger.info("Starting to learn the action model!")
@@ -1,11 +1,11 @@
 """Extension to SAM Learning that can learn numeric state variables."""
-
-from typing import List, Dict, Tuple, Optional
+from copy import deepcopy
+from typing import List, Dict, Tuple, Optional, Iterable
 
 from pddl_plus_parser.models import Observation, ActionCall, State, Domain
 
 from sam_learning.core import LearnerDomain, NumericFluentStateStorage, NumericFunctionMatcher, NotSafeActionError, \
-    PolynomialFluentsLearningAlgorithm
+    PolynomialFluentsLearningAlgorithm, CompactTrajectory, LearnerAction, CompiledNumericModel, compile_numeric_model
 from sam_learning.learners import SAMLearner
 
 
@@ -15,12 +15,21 @@ class NumericSAMLearner(SAMLearner):
     storage: Dict[str, NumericFluentStateStorage]
     function_matcher: NumericFunctionMatcher
     preconditions_fluent_map: Dict[str, List[str]]
+    storage_compaction_interval: Optional[int]
+    current_compact_trajectory: Optional[CompactTrajectory]
+    current_component_index: int
+    _matched_fluents_cache: Dict[str, Dict[str, str]]
 
-    def __init__(self, partial_domain: Domain, preconditions_fluent_map: Optional[Dict[str, List[str]]] = None):
-        super().__init__(partial_domain)
+    def __init__(self, partial_domain: Domain, preconditions_fluent_map: Optional[Dict[str, List[str]]] = None,
+                 implicit_negative_literals: bool = False, storage_compaction_interval: Optional[int] = None):
+        super().__init__(partial_domain, implicit_negative_literals)
         self.storage = {}
         self.function_matcher = NumericFunctionMatcher(partial_domain)
         self.preconditions_fluent_map = preconditions_fluent_map
+        self.storage_compaction_interval = storage_compaction_interval
+        self.current_compact_trajectory = None
+        self.current_component_index = 0
+        self._matched_fluents_cache = {}
 
     def add_new_action(self, grounded_action: ActionCall, previous_state: State, next_state: State) -> None:
         """Adds a new action to the learned domain.
@@ -31,13 +40,8 @@ class NumericSAMLearner(SAMLearner):
         """
         super().add_new_action(grounded_action, previous_state, next_state)
         self.logger.debug(f"Creating the new storage for the action - {grounded_action.name}.")
-        previous_state_lifted_matches = self.function_matcher.match_state_functions(
-            grounded_action, previous_state.state_fluents)
-        next_state_lifted_matches = self.function_matcher.match_state_functions(
-            grounded_action, next_state.state_fluents)
-        self.storage[grounded_action.name] = NumericFluentStateStorage(grounded_action.name)
-        self.storage[grounded_action.name].add_to_previous_state_storage(previous_state_lifted_matches)
-        self.storage[grounded_action.name].add_to_next_state_storage(next_state_lifted_matches)
+        self.storage[grounded_action.name] = self._create_action_storage(grounded_action.name)
+        self._add_numeric_state_values(grounded_action, previous_state, next_state)
         self.logger.debug(f"Done creating the numeric state variable storage for the action - {grounded_action.name}")
 
     def update_action(
@@ -53,28 +57,94 @@ class NumericSAMLearner(SAMLearner):
         super().update_action(grounded_action, previous_state, next_state)
         self.logger.debug(
             f"Adding the numeric state variables to the numeric storage of action - {action_name}.")
-        previous_state_lifted_matches = self.function_matcher.match_state_functions(
-            grounded_action, previous_state.state_fluents)
-        next_state_lifted_matches = self.function_matcher.match_state_functions(
-            grounded_action, next_state.state_fluents)
-        self.storage[action_name].add_to_previous_state_storage(previous_state_lifted_matches)
-        self.storage[action_name].add_to_next_state_storage(next_state_lifted_matches)
+        self._add_numeric_state_values(grounded_action, previous_state, next_state)
         self.logger.debug(f"Done updating the numeric state variable storage for the action - {grounded_action.name}")
 
-    def learn_action_model(self, observations: List[Observation]) -> Tuple[LearnerDomain, Dict[str, str]]:
-        """Learn the SAFE action model from the input observations.
+    def _create_action_storage(self, action_name: str) -> NumericFluentStateStorage:
+        """Creates the storage of the numeric state fluents of the action.
+
+        :param action_name: the name of the action.
+        :return: the storage learning the numeric preconditions and effects of the action.
+        """
+        return NumericFluentStateStorage(action_name, compaction_interval=self.storage_compaction_interval)
+
+    def _add_numeric_state_values(self, grounded_action: ActionCall, previous_state: State, next_state: State) -> None:
+        """Adds the values of the numeric fluents matched for the action to the action's storage.
+
+        Note: when a compact trajectory is handled, the values are sliced from the trajectory's fluents matrix
+            instead of the states' fluents.
+
+        :param grounded_action: the grounded action that was observed.
+        :param previous_state: the state that the action was executed on.
+        :param next_state: the state that was created after executing the action on the previous state.
+        """
+        action_storage = self.storage[grounded_action.name]
+        if self.current_compact_trajectory is None:
+            action_storage.add_to_previous_state_storage(
+                self.function_matcher.match_state_functions(grounded_action, previous_state.state_fluents))
+            action_storage.add_to_next_state_storage(
+                self.function_matcher.match_state_functions(grounded_action, next_state.state_fluents))
+            return
+
+        action_call_str = str(grounded_action)
+        if action_call_str not in self._matched_fluents_cache:
+            self._matched_fluents_cache[action_call_str] = self.function_matcher.match_state_function_names(
+                grounded_action, self.current_compact_trajectory.fluents_ids)
+
+        matched_fluents = self._matched_fluents_cache[action_call_str]
+        lifted_fluents = list(matched_fluents.keys())
+        state_indexes = self.current_compact_trajectory.components[self.current_component_index][:2]
+        previous_values, next_values = self.current_compact_trajectory.get_fluent_columns(
+            [matched_fluents[fluent] for fluent in lifted_fluents], state_indexes)
+        action_storage.add_previous_state_row(lifted_fluents, previous_values)
+        action_storage.add_next_state_row(lifted_fluents, next_values)
+
+    def add_compact_trajectories(self, trajectories: Iterable[CompactTrajectory]) -> None:
+        """Adds observations stored in the compact trajectory format to the learning process.
+
+        Note: the numeric values are sliced from the trajectories' fluents matrices so no numeric fluent objects are
+            created for the observed states.
+
+        :param trajectories: the compact trajectories that are used to update the learned action model.
+        """
+        if not self.inequalities_deduced:
+            self.deduce_initial_inequality_preconditions()
+            self.inequalities_deduced = True
+
+        try:
+            for trajectory in trajectories:
+                observation = trajectory.to_observation(self.partial_domain, include_fluents=False)
+                self.current_trajectory_objects = observation.grounded_objects
+                self.current_compact_trajectory = trajectory
+                self._matched_fluents_cache = {}
+                for component_index, component in enumerate(observation.components):
+                    self.current_component_index = component_index
+                    self.handle_single_trajectory_component(component)
+
+        finally:
+            self.current_compact_trajectory = None
+            self._matched_fluents_cache = {}
+
+    def _compile_numeric_model(self, action: LearnerAction) -> Optional[CompiledNumericModel]:
+        """Compiles the learned numeric preconditions and effects of the action into their matrix form.
+
+        :param action: the action whose numeric preconditions and effects were learned.
+        :return: the compiled numeric model or None if the learned preconditions or effects are not linear.
+        """
+        try:
+            return compile_numeric_model(action.name, action.numeric_preconditions, action.numeric_effects)
+
+        except ValueError as e:
+            self.logger.debug(f"Could not compile the numeric model of the action - {action.name}, reason - {e}")
+            return None
+
+    def _construct_action_model(self) -> Tuple[LearnerDomain, Dict[str, str]]:
+        """Constructs the safe action model from the numeric and discrete data collected from the observations.
 
-        :param observations: the list of trajectories that are used to learn the safe action model.
         :return: a domain containing the actions that were learned and the metadata about the learning.
         """
-        self.logger.info("Starting to learn the action model!")
         allowed_actions = {}
         learning_metadata = {}
-        super().deduce_initial_inequality_preconditions()
-        for observation in observations:
-            for component in observation.components:
-                self.handle_single_trajectory_component(component)
-
         for action_name, action in self.partial_domain.actions.items():
             if action_name not in self.storage:
                 self.logger.debug(f"The action - {action_name} has not been observed in the trajectories!")
@@ -90,6 +160,7 @@ class NumericSAMLearner(SAMLearner):
                         self.preconditions_fluent_map[action_name])
 
                 action.numeric_effects = self.storage[action_name].construct_assignment_equations()
+                action.compiled_numeric_model = self._compile_numeric_model(action)
                 allowed_actions[action_name] = action
                 learning_metadata[action_name] = "OK"
 
@@ -100,6 +171,47 @@ class NumericSAMLearner(SAMLearner):
         self.partial_domain.actions = allowed_actions
         return self.partial_domain, learning_metadata
 
+    def _copy_learning_state(self) -> "NumericSAMLearner":
+        """Creates a copy of the learner that does not share the numeric storage with the current learner.
+
+        Note: the live convex hulls of the learner are updated with the newly stored states before copying, so the
+            copy only has to rebuild the hulls from their vertices.
+
+        :return: a copy of the learner that does not share the mutable learning state with the current learner.
+        """
+        for action_name, storage in self.storage.items():
+            if self.preconditions_fluent_map is None:
+                storage.update_hull()
+
+            elif len(self.preconditions_fluent_map.get(action_name, [])) > 0:
+                storage.update_hull(self.preconditions_fluent_map[action_name])
+
+        learner_copy = super()._copy_learning_state()
+        learner_copy.storage = deepcopy(self.storage)
+        return learner_copy
+
+    def learn_action_model_from_compact_trajectories(
+            self, trajectories: Iterable[CompactTrajectory]) -> Tuple[LearnerDomain, Dict[str, str]]:
+        """Learn the SAFE action model from trajectories stored in the compact format.
+
+        :param trajectories: the compact trajectories that are used to learn the safe action model.
+        :return: a domain containing the actions that were learned and the metadata about the learning.
+        """
+        self.logger.info("Starting to learn the action model from the compact trajectories!")
+        self.add_compact_trajectories(trajectories)
+        return self._construct_action_model()
+
+    def learn_action_model(self, observations: Iterable[Observation]) -> Tuple[LearnerDomain, Dict[str, str]]:
+        """Learn the SAFE action model from the input observations.
+
+        :param observations: the trajectories that are used to learn the safe action model, the observations and their
+            components are consumed lazily.
+        :return: a domain containing the actions that were learned and the metadata about the learning.
+        """
+        self.logger.info("Starting to learn the action model!")
+        self.add_observations(observations)
+        return self._construct_action_model()
+
 
 class PolynomialSAMLearning(NumericSAMLearner):
     """The Extension of SAM that is able to learn polynomial state variables."""
@@ -107,26 +219,17 @@ class PolynomialSAMLearning(NumericSAMLearner):
     polynom_degree: int
 
     def __init__(self, partial_domain: Domain, preconditions_fluent_map: Optional[Dict[str, List[str]]] = None,
-                 polynomial_degree: int = 1):
-        super().__init__(partial_domain, preconditions_fluent_map)
+                 polynomial_degree: int = 1, implicit_negative_literals: bool = False,
+                 storage_compaction_interval: Optional[int] = None):
+        super().__init__(partial_domain, preconditions_fluent_map, implicit_negative_literals,
+                         storage_compaction_interval)
         self.polynom_degree = polynomial_degree
 
-    def add_new_action(self, grounded_action: ActionCall, previous_state: State, next_state: State) -> None:
-        """Adds a new action to the learned domain.
+    def _create_action_storage(self, action_name: str) -> PolynomialFluentsLearningAlgorithm:
+        """Creates the storage of the numeric state fluents of the action.
 
-        :param grounded_action: the grounded action that was executed according to the observation.
-        :param previous_state: the state that the action was executed on.
-        :param next_state: the state that was created after executing the action on the previous
-            state.
+        :param action_name: the name of the action.
+        :return: the storage learning the polynomial preconditions and effects of the action.
         """
-        super().add_new_action(grounded_action, previous_state, next_state)
-        self.logger.debug(f"Creating the new storage for the action - {grounded_action.name}.")
-        previous_state_lifted_matches = self.function_matcher.match_state_functions(
-            grounded_action, previous_state.state_fluents)
-        next_state_lifted_matches = self.function_matcher.match_state_functions(
-            grounded_action, next_state.state_fluents)
-        self.storage[grounded_action.name] = PolynomialFluentsLearningAlgorithm(
-            grounded_action.name, self.polynom_degree, is_verbose=True)
-        self.storage[grounded_action.name].add_to_previous_state_storage(previous_state_lifted_matches)
-        self.storage[grounded_action.name].add_to_next_state_storage(next_state_lifted_matches)
-        self.logger.debug(f"Done creating the numeric state variable storage for the action - {grounded_action.name}")
+        return PolynomialFluentsLearningAlgorithm(action_name, self.polynom_degree, is_verbose=True,
+                                                  compaction_interval=self.storage_compaction_interval)
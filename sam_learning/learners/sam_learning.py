@@ -1,8 +1,9 @@
 """The Safe Action Model Learning algorithm module."""
 import logging
 from collections import defaultdict
+from copy import copy, deepcopy
 from itertools import combinations
-from typing import List, Tuple, Dict, Set, Optional
+from typing import List, Tuple, Dict, Set, Optional, Iterable
 
 from pddl_plus_parser.models import Observation, Predicate, ActionCall, State, Domain, ObservedComponent, PDDLObject, \
     GroundedPredicate
@@ -27,8 +28,10 @@ class SAMLearner:
     next_state_negative_predicates: Set[GroundedPredicate]
     next_state_positive_predicates: Set[GroundedPredicate]
     current_trajectory_objects: Dict[str, PDDLObject]
+    inequalities_deduced: bool
+    implicit_negative_literals: bool
 
-    def __init__(self, partial_domain: Domain):
+    def __init__(self, partial_domain: Domain, implicit_negative_literals: bool = False):
         self.logger = logging.getLogger(__name__)
         self.partial_domain = LearnerDomain(domain=partial_domain)
         self.matcher = PredicatesMatcher(partial_domain)
@@ -40,6 +43,8 @@ class SAMLearner:
         self.next_state_positive_predicates = set()
         self.next_state_negative_predicates = set()
         self.current_trajectory_objects = {}
+        self.inequalities_deduced = False
+        self.implicit_negative_literals = implicit_negative_literals
 
     def _create_complete_world_state(self, relevant_objects: Dict[str, PDDLObject],
                                      state: State) -> Tuple[Set[GroundedPredicate], Set[GroundedPredicate]]:
@@ -80,6 +85,15 @@ class SAMLearner:
         :param previous_state: the state prior to the action's execution.
         :param next_state: the state following the action's execution.
         """
+        if self.implicit_negative_literals:
+            self.logger.debug("Negative literals are implicit, only the positive state predicates are kept.")
+            self.previous_state_positive_predicates = {
+                predicate for predicates in previous_state.state_predicates.values() for predicate in predicates}
+            self.next_state_positive_predicates = {
+                predicate for predicates in next_state.state_predicates.values() for predicate in predicates}
+            self.previous_state_negative_predicates, self.next_state_negative_predicates = set(), set()
+            return
+
         relevant_objects = {object_name: object_data for object_name, object_data in
                             self.current_trajectory_objects.items()
                             if object_name in current_action.parameters}
@@ -89,7 +103,7 @@ class SAMLearner:
             self._create_complete_world_state(relevant_objects=relevant_objects, state=next_state)
 
     def _handle_action_effects(self, grounded_action: ActionCall, previous_state: State,
-                               next_state: State) -> Tuple[List[Predicate], List[Predicate]]:
+                               next_state: State) -> Tuple[Set[Predicate], Set[Predicate]]:
         """Finds the effects generated from the previous and the next state on this current step.
 
         :param grounded_action: the grounded action that was executed according to the trajectory.
@@ -101,9 +115,7 @@ class SAMLearner:
         self.logger.debug(f"Starting to learn the effects of {str(grounded_action)}.")
         grounded_add_effects, grounded_del_effects = extract_effects(previous_state, next_state)
         self.logger.debug("Updating the negative state predicates based on the action's execution.")
-        lifted_add_effects = self.matcher.get_possible_literal_matches(grounded_action, list(grounded_add_effects))
-        lifted_delete_effects = self.matcher.get_possible_literal_matches(grounded_action, list(grounded_del_effects))
-        return lifted_add_effects, lifted_delete_effects
+        return self.matcher.lift_state_literals(grounded_action, grounded_add_effects, grounded_del_effects)
 
     def _update_action_preconditions(
             self, grounded_action: ActionCall, previous_state: State,
@@ -114,13 +126,8 @@ class SAMLearner:
         :param previous_state: the state that was seen prior to the action's execution.
         """
         current_action = action_to_update or self.partial_domain.actions[grounded_action.name]
-        possible_preconditions = set()
-        for lifted_predicate_name, grounded_state_predicates in previous_state.state_predicates.items():
-            self.logger.debug(f"trying to match the predicate - {lifted_predicate_name} "
-                              f"to the action call - {str(grounded_action)}")
-            lifted_matches = self.matcher.get_possible_literal_matches(grounded_action, list(grounded_state_predicates))
-            possible_preconditions.update(lifted_matches)
-
+        self.logger.debug(f"trying to match the state predicates to the action call - {str(grounded_action)}")
+        possible_preconditions, _ = self.matcher.lift_state_literals(grounded_action, previous_state)
         if len(possible_preconditions) > 0:
             current_action.positive_preconditions.intersection_update(possible_preconditions)
             current_action.negative_preconditions.difference_update(possible_preconditions)
@@ -130,18 +137,6 @@ class SAMLearner:
                                 f"inconsistency occurred, since we do not allow for duplicates we do not update the "
                                 f"preconditions.")
 
-    def _add_negative_predicates(self, grounded_action: ActionCall) -> Set[Predicate]:
-        """Adds a negative predicate to the action when it is first encountered.
-
-        :param grounded_action: the action that was encountered.
-        :return: the possible negative predicates that were added to the action.
-        """
-        possible_negative_predicates = set()
-        lifted_matches = self.matcher.get_possible_literal_matches(
-            grounded_action, list(self.previous_state_negative_predicates))
-        possible_negative_predicates.update(lifted_matches)
-        return possible_negative_predicates
-
     def _add_new_action_preconditions(self, grounded_action: ActionCall,
                                       action_to_update: Optional[LearnerAction] = None) -> None:
         """General method to add new action's discrete preconditions.
@@ -151,11 +146,13 @@ class SAMLearner:
             created based on the partial domain.
         """
         observed_action = action_to_update or self.partial_domain.actions[grounded_action.name]
-        possible_preconditions = set()
-        negative_predicates = self._add_negative_predicates(grounded_action)
-        lifted_matches = self.matcher.get_possible_literal_matches(
-            grounded_action, list(self.previous_state_positive_predicates))
-        possible_preconditions.update(lifted_matches)
+        if self.implicit_negative_literals:
+            possible_preconditions, negative_predicates = self.matcher.lift_closed_world_state_literals(
+                grounded_action, self.previous_state_positive_predicates)
+
+        else:
+            possible_preconditions, negative_predicates = self.matcher.lift_state_literals(
+                grounded_action, self.previous_state_positive_predicates, self.previous_state_negative_predicates)
 
         observed_action.positive_preconditions.update(possible_preconditions)
         observed_action.negative_preconditions.update(negative_predicates)
@@ -264,19 +261,62 @@ class SAMLearner:
         """Constructs the single-agent actions that are safe to execute."""
         pass
 
-    def learn_action_model(self, observations: List[Observation]) -> Tuple[LearnerDomain, Dict[str, str]]:
-        """Learn the SAFE action model from the input trajectories.
+    def _construct_action_model(self) -> Tuple[LearnerDomain, Dict[str, str]]:
+        """Constructs the safe action model from the data that was collected from the observations.
 
-        :param observations: the list of trajectories that are used to learn the safe action model.
-        :return: a domain containing the actions that were learned.
+        Note: this method finalizes the learner's state and thus should be called only once per learner instance.
+
+        :return: a domain containing the actions that were learned and the learning report.
         """
-        self.logger.info("Starting to learn the action model!")
-        self.deduce_initial_inequality_preconditions()
+        self.construct_safe_actions()
+        learning_report = {action_name: "OK" for action_name in self.partial_domain.actions}
+        return self.partial_domain, learning_report
+
+    def _copy_learning_state(self) -> "SAMLearner":
+        """Creates a copy of the learner in which the data collected from the observations can be finalized without
+            affecting the current learner.
+
+        :return: a copy of the learner that does not share the mutable learning state with the current learner.
+        """
+        learner_copy = copy(self)
+        learner_copy.partial_domain = deepcopy(self.partial_domain)
+        learner_copy.observed_actions = list(self.observed_actions)
+        learner_copy.safe_actions = list(self.safe_actions)
+        return learner_copy
+
+    def add_observations(self, observations: Iterable[Observation]) -> None:
+        """Adds new observations to the learning process without constructing the action model.
+
+        Note: can be called multiple times, each call continues learning from the data collected so far.
+
+        :param observations: the new trajectories that are used to update the learned action model.
+        """
+        if not self.inequalities_deduced:
+            self.deduce_initial_inequality_preconditions()
+            self.inequalities_deduced = True
+
         for observation in observations:
             self.current_trajectory_objects = observation.grounded_objects
             for component in observation.components:
                 self.handle_single_trajectory_component(component)
 
-        self.construct_safe_actions()
-        learning_report = {action_name: "OK" for action_name in self.partial_domain.actions}
-        return self.partial_domain, learning_report
+    def create_domain_snapshot(self) -> Tuple[LearnerDomain, Dict[str, str]]:
+        """Constructs the safe action model from all the observations that were added so far.
+
+        Note: the learner's state is not modified so more observations can be added after the snapshot is created.
+
+        :return: a domain containing the actions that were learned and the learning report.
+        """
+        self.logger.info("Creating a snapshot of the learned action model.")
+        return self._copy_learning_state()._construct_action_model()
+
+    def learn_action_model(self, observations: Iterable[Observation]) -> Tuple[LearnerDomain, Dict[str, str]]:
+        """Learn the SAFE action model from the input trajectories.
+
+        :param observations: the trajectories that are used to learn the safe action model, the observations and their
+            components are consumed lazily.
+        :return: a domain containing the actions that were learned.
+        """
+        self.logger.info("Starting to learn the action model!")
+        self.add_observations(observations)
+        return self._construct_action_model()
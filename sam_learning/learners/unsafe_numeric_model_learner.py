@@ -1,5 +1,5 @@
 """An action model learning algorithm that uses the Oblique Tree algorithm with some concepts of N-SAM Learning."""
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, Optional, Tuple, Union, Iterable
 
 from pddl_plus_parser.models import Domain, Observation
 
@@ -18,16 +18,21 @@ class UnsafeModelLearner(SAMLearner):
         self.polynom_degree = polynomial_degree
         self.faulty_action_name = faulty_action_name
 
-    def learn_unsafe_action_model(self, positive_observations: List[Observation],
-                                  negative_observations: List[Observation]) -> Tuple[LearnerDomain, Dict[str, str]]:
+    def learn_unsafe_action_model(self, positive_observations: Iterable[Observation],
+                                  negative_observations: Iterable[Observation]) -> Tuple[LearnerDomain, Dict[str, str]]:
         """Learns the action model from the given observations using unsafe methods.
 
+        Note: the unsafe methods pass over the observations several times, so the observations are collected to a list.
+            Streaming observations keep their components on disk and read them again on each pass.
+
         :param positive_observations: the observations to learn the action model from.
         :param negative_observations: the negative observations containing faults in them.
         :return: the learned action model and the mapping from the action names to the action names in the
             learned domain.
         """
         self.logger.info("Learning the action model from the given observations.")
+        positive_observations = list(positive_observations)
+        negative_observations = list(negative_observations)
         allowed_actions = {}
         learning_metadata = {}
         super().deduce_initial_inequality_preconditions()
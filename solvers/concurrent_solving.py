@@ -0,0 +1,47 @@
+"""Module responsible for running a solver on the problems of a directory, possibly concurrently."""
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List
+
+PROBLEM_FILES_GLOB = "pfile*.pddl"
+WORKING_DIRECTORY_PREFIX = "solver_workdir_"
+
+logger = logging.getLogger(__name__)
+
+
+def solve_in_isolated_directory(solve_problem: Callable[[Path, Path], None], problem_file_path: Path) -> None:
+    """Solves the problem inside a fresh working directory so that the files the solver writes relative to its
+        working directory do not collide with the files of solvers running concurrently.
+
+    :param solve_problem: the function solving a single problem given the problem path and a working directory.
+    :param problem_file_path: the path to the problem file.
+    """
+    with tempfile.TemporaryDirectory(prefix=WORKING_DIRECTORY_PREFIX) as working_directory_path:
+        solve_problem(problem_file_path, Path(working_directory_path))
+
+
+def solve_problems(problems_directory_path: Path, solve_problem: Callable[[Path, Path], None],
+                   max_workers: int = 1) -> None:
+    """Solves all the problems in the directory.
+
+    Note: the solvers run as subprocesses, so threads are enough to run them concurrently.
+
+    :param problems_directory_path: the path to the problems directory.
+    :param solve_problem: the function solving a single problem given the problem path and a working directory.
+    :param max_workers: the maximal number of problems to solve concurrently.
+    """
+    problem_file_paths: List[Path] = sorted(problems_directory_path.glob(PROBLEM_FILES_GLOB))
+    if max_workers <= 1 or len(problem_file_paths) <= 1:
+        for problem_file_path in problem_file_paths:
+            solve_in_isolated_directory(solve_problem, problem_file_path)
+
+        return
+
+    logger.info(f"Solving {len(problem_file_paths)} problems using {max_workers} concurrent workers.")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(solve_in_isolated_directory, solve_problem, problem_file_path)
+                   for problem_file_path in problem_file_paths]
+        for future in futures:
+            future.result()
@@ -1,14 +1,15 @@
 """Module responsible for running the Expressive Numeric Heuristic Planner (ENHSP)."""
 import logging
 import os
-import signal
-import subprocess
 import sys
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
 from jdk4py import JAVA
 
+from solvers.concurrent_solving import solve_problems, solve_in_isolated_directory
+from solvers.solver_process import run_solver_process
+
 ENHSP_FILE_PATH = os.environ["ENHSP_FILE_PATH"]
 MAX_RUNNING_TIME = 60  # seconds
 
@@ -23,38 +24,38 @@ class ENHSPSolver:
     """Class designated to use to activate the metric-FF solver on the cluster and parse its result."""
 
     logger: logging.Logger
+    cpu_time_limit: Optional[int]
+    memory_limit_mb: Optional[int]
 
-    def __init__(self):
+    def __init__(self, cpu_time_limit: Optional[int] = None, memory_limit_mb: Optional[int] = None):
         self.logger = logging.getLogger(__name__)
+        self.cpu_time_limit = cpu_time_limit
+        self.memory_limit_mb = memory_limit_mb
 
     def _run_enhsp_process(self, run_command: str, problem_file_path: Path,
-                           solving_stats: Dict[str, str]) -> None:
+                           solving_stats: Dict[str, str], working_directory_path: Path) -> None:
         """Runs the ENHSP process and monitors its execution time.
 
+        Note: the memory limit is applied to the JVM's heap in the run command and not to the virtual memory of the
+            process, since the JVM reserves much more virtual memory than it uses and fails to start under the limit.
+
         :param run_command: the command to run the ENHSP process.
         :param problem_file_path: the path to the problem file.
         :param solving_stats: the statistics of the solving process.
+        :param working_directory_path: the directory in which the ENHSP process runs.
         """
         self.logger.info(f"Starting to run ENHSP process for the problem - {problem_file_path.stem}")
-        process = subprocess.Popen(run_command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        try:
-            process.wait(timeout=MAX_RUNNING_TIME)
-
-        except subprocess.TimeoutExpired:
+        process = run_solver_process(run_command, working_directory_path, timeout=MAX_RUNNING_TIME,
+                                     cpu_time_limit=self.cpu_time_limit, capture_output=True)
+        if process is None:
             self.logger.debug(
                 f"ENHSP did not finish in time so was killed while trying to solve - {problem_file_path.stem}")
             solving_stats[problem_file_path.stem] = "timeout"
-            os.kill(process.pid, signal.SIGTERM)
-            os.system("pkill -f enhsp.jar")
-            return
-
-        if process.returncode is None:
-            solving_stats[problem_file_path.stem] = "timeout"
             return
 
         self.logger.info("ENHSP finished its execution!")
-        stdout = process.stdout.read()
-        stderr = process.stderr.read()
+        stdout = process.stdout
+        stderr = process.stderr
 
         if PROBLEM_SOLVED in stdout:
             self.logger.info(f"Solver succeeded in solving problem - {problem_file_path.stem}")
@@ -73,24 +74,53 @@ class ENHSPSolver:
             self.logger.critical(f"While solving problem encountered unknown error! STDERR - {stderr}")
             solving_stats[problem_file_path.stem] = "no_solution"
 
-    def execute_solver(self, problems_directory_path: Path, domain_file_path: Path) -> Dict[str, str]:
+    def _solve_problem(self, problem_file_path: Path, working_directory_path: Path, domain_file_path: Path,
+                       solving_stats: Dict[str, str]) -> None:
+        """Solves a single problem using ENHSP and outputs the solution next to the problem file.
+
+        :param problem_file_path: the path to the problem file.
+        :param working_directory_path: the directory in which the ENHSP process runs.
+        :param domain_file_path: the path to the domain file.
+        :param solving_stats: the statistics of the solving process.
+        """
+        self.logger.debug(f"Starting to work on solving problem - {problem_file_path.stem}")
+        solution_path = problem_file_path.parent / f"{problem_file_path.stem}.solution"
+        running_options = ["-o", str(domain_file_path.absolute()),
+                           "-f", str(problem_file_path.absolute()),
+                           "-planner", "sat-hmrphj",
+                           "-sp", str(solution_path.absolute())]
+        java_options = [] if self.memory_limit_mb is None else [f"-Xmx{self.memory_limit_mb}m"]
+        run_command = f"{' '.join([str(JAVA), *java_options])} -jar {ENHSP_FILE_PATH} {' '.join(running_options)}"
+        self._run_enhsp_process(run_command, problem_file_path, solving_stats, working_directory_path)
+
+    def solve_problem(self, problem_file_path: Path, domain_file_path: Path) -> Optional[str]:
+        """Solves a single problem using ENHSP in an isolated working directory.
+
+        :param problem_file_path: the path to the problem file.
+        :param domain_file_path: the path to the domain file.
+        :return: the solving status of the problem or None if the solver did not report a status.
+        """
+        solving_stats = {}
+        solve_in_isolated_directory(
+            lambda _, working_directory_path: self._solve_problem(
+                problem_file_path, working_directory_path, domain_file_path, solving_stats), problem_file_path)
+        return solving_stats.get(problem_file_path.stem)
+
+    def execute_solver(self, problems_directory_path: Path, domain_file_path: Path,
+                       max_workers: int = 1) -> Dict[str, str]:
         """Solves numeric and PDDL+ problems using the ENHSP algorithm, automatically outputs the solution into a file.
 
         :param problems_directory_path: the path to the problems directory.
         :param domain_file_path: the path to the domain file.
+        :param max_workers: the maximal number of problems to solve concurrently.
+        :return: mapping between the problem names and their solving status.
         """
         solving_stats = {}
         self.logger.info("Starting to solve the input problems using ENHSP solver.")
-        for problem_file_path in problems_directory_path.glob("pfile*.pddl"):
-            self.logger.debug(f"Starting to work on solving problem - {problem_file_path.stem}")
-            solution_path = problems_directory_path / f"{problem_file_path.stem}.solution"
-            running_options = ["-o", str(domain_file_path.absolute()),
-                               "-f", str(problem_file_path.absolute()),
-                               "-planner", "sat-hmrphj",
-                               "-sp", str(solution_path.absolute())]
-            run_command = f"{str(JAVA)} -jar {ENHSP_FILE_PATH} {' '.join(running_options)}"
-            self._run_enhsp_process(run_command, problem_file_path, solving_stats)
-
+        solve_problems(problems_directory_path,
+                       lambda problem_file_path, working_directory_path: self._solve_problem(
+                           problem_file_path, working_directory_path, domain_file_path, solving_stats),
+                       max_workers=max_workers)
         return solving_stats
 
 
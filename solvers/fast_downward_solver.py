@@ -1,21 +1,29 @@
 """Module responsible for running the Expressive Numeric Heuristic Planner (ENHSP)."""
 import logging
 import os
-import subprocess
 import sys
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
+
+from solvers.concurrent_solving import solve_problems, solve_in_isolated_directory
+from solvers.solver_process import run_solver_process
 
 FAST_DOWNWARD_DIR_PATH = os.environ["FAST_DOWNWARD_DIR_PATH"]
+MAX_RUNNING_TIME = 60  # seconds
+KILL_TIMEOUT_MARGIN = 10  # seconds
 
 
 class FastDownwardSolver:
     """Class designated to use to activate the metric-FF solver on the cluster and parse its result."""
 
     logger: logging.Logger
+    cpu_time_limit: Optional[int]
+    memory_limit_mb: Optional[int]
 
-    def __init__(self):
+    def __init__(self, cpu_time_limit: Optional[int] = None, memory_limit_mb: Optional[int] = None):
         self.logger = logging.getLogger(__name__)
+        self.cpu_time_limit = cpu_time_limit
+        self.memory_limit_mb = memory_limit_mb
 
     @staticmethod
     def _remove_cost_from_file(solution_path: Path) -> None:
@@ -29,54 +37,74 @@ class FastDownwardSolver:
         with open(solution_path, "w") as solution_file:
             solution_file.writelines(solution_lines[:-1])
 
-    @staticmethod
-    def _remove_sas_file(sas_file_path: Path) -> None:
-        """Removes the SAS file generated by the Fast Downward solver.
+    def _solve_problem(self, problem_file_path: Path, working_directory_path: Path, domain_file_path: Path,
+                       solving_stats: Dict[str, str]) -> None:
+        """Solves a single problem using Fast Downward and outputs the solution next to the problem file.
+
+        Note: the SAS file is written into the working directory of the problem so that concurrent solvers
+            do not overwrite each other's translation.
 
-        :param sas_file_path: the path to the SAS file.
+        :param problem_file_path: the path to the problem file.
+        :param working_directory_path: the directory in which the Fast Downward process runs.
+        :param domain_file_path: the path to the domain file.
+        :param solving_stats: the statistics of the solving process.
         """
-        if sas_file_path.exists():
-            sas_file_path.unlink()
+        self.logger.debug(f"Starting to work on solving problem - {problem_file_path.stem}")
+        solution_path = problem_file_path.parent / f"{problem_file_path.stem}.solution"
+        running_options = ["--overall-time-limit", f"{MAX_RUNNING_TIME}s",
+                           "--plan-file", str(solution_path.absolute()),
+                           "--sas-file", f"{domain_file_path.stem}_{problem_file_path.stem}_output.sas",
+                           str(domain_file_path.absolute()),
+                           str(problem_file_path.absolute()),
+                           "--evaluator", "'hcea=cea()'",
+                           "--search", "'lazy_greedy([hcea], preferred=[hcea])'"]
+        run_command = f"{Path(FAST_DOWNWARD_DIR_PATH).absolute() / 'fast-downward.py'} {' '.join(running_options)}"
+        process = run_solver_process(run_command, working_directory_path,
+                                     timeout=MAX_RUNNING_TIME + KILL_TIMEOUT_MARGIN,
+                                     cpu_time_limit=self.cpu_time_limit, memory_limit_mb=self.memory_limit_mb,
+                                     capture_output=True)
+        if process is None or process.returncode == 23 or process.returncode == 21:
+            self.logger.warning(f"Fast Downward timed out on problem {problem_file_path.stem}.")
+            solving_stats[problem_file_path.stem] = "timeout"
+        elif process.returncode == 0:
+            self.logger.info(f"Solver succeeded in solving problem - {problem_file_path.stem}")
+            solving_stats[problem_file_path.stem] = "ok"
+            self._remove_cost_from_file(solution_path)
+        elif process.returncode == 11 or process.returncode == 12:
+            self.logger.warning(f"Fast Downward returned status code {process.returncode} - plan unsolvable for problem {problem_file_path.stem}.")
+            solving_stats[problem_file_path.stem] = "no_solution"
+        else:
+            self.logger.critical(f"Fast Downward returned status code {process.returncode} - unknown error.")
+            solving_stats[problem_file_path.stem] = "no_solution"
+
+    def solve_problem(self, problem_file_path: Path, domain_file_path: Path) -> Optional[str]:
+        """Solves a single problem using Fast Downward in an isolated working directory.
+
+        :param problem_file_path: the path to the problem file.
+        :param domain_file_path: the path to the domain file.
+        :return: the solving status of the problem or None if the solver did not report a status.
+        """
+        solving_stats = {}
+        solve_in_isolated_directory(
+            lambda _, working_directory_path: self._solve_problem(
+                problem_file_path, working_directory_path, domain_file_path, solving_stats), problem_file_path)
+        return solving_stats.get(problem_file_path.stem)
 
-    def execute_solver(self, problems_directory_path: Path, domain_file_path: Path) -> Dict[str, str]:
+    def execute_solver(self, problems_directory_path: Path, domain_file_path: Path,
+                       max_workers: int = 1) -> Dict[str, str]:
         """Runs the Fast Downward solver on all the problems in the given directory.
 
-        :param problems_directory_path:
-        :param domain_file_path:
-        :return:
+        :param problems_directory_path: the path to the problems directory.
+        :param domain_file_path: the path to the domain file.
+        :param max_workers: the maximal number of problems to solve concurrently.
+        :return: mapping between the problem names and their solving status.
         """
         solving_stats = {}
-        os.chdir(FAST_DOWNWARD_DIR_PATH)
         self.logger.info("Starting to solve the input problems using Fast-Downward solver.")
-        for problem_file_path in problems_directory_path.glob("pfile*.pddl"):
-            self.logger.debug(f"Starting to work on solving problem - {problem_file_path.stem}")
-            solution_path = problems_directory_path / f"{problem_file_path.stem}.solution"
-            running_options = ["--overall-time-limit", "60s",
-                               "--plan-file", str(solution_path.absolute()),
-                               "--sas-file", f"{domain_file_path.stem}_output.sas",
-                               str(domain_file_path.absolute()),
-                               str(problem_file_path.absolute()),
-                               "--evaluator", "'hcea=cea()'",
-                               "--search", "'lazy_greedy([hcea], preferred=[hcea])'"]
-            run_command = f"./fast-downward.py {' '.join(running_options)}"
-            try:
-                subprocess.check_output(run_command, shell=True)
-                self.logger.info(f"Solver succeeded in solving problem - {problem_file_path.stem}")
-                solving_stats[problem_file_path.stem] = "ok"
-                self._remove_cost_from_file(solution_path)
-
-            except subprocess.CalledProcessError as e:
-                if e.returncode == 23 or e.returncode == 21:
-                    self.logger.warning(f"Fast Downward returned status code 23 - timeout on problem {problem_file_path.stem}.")
-                    solving_stats[problem_file_path.stem] = "timeout"
-                elif e.returncode == 11 or e.returncode == 12:
-                    self.logger.warning(f"Fast Downward returned status code {e.returncode} - plan unsolvable for problem {problem_file_path.stem}.")
-                    solving_stats[problem_file_path.stem] = "no_solution"
-                else:
-                    self.logger.critical(f"Fast Downward returned status code {e.returncode} - unknown error.")
-                    solving_stats[problem_file_path.stem] = "no_solution"
-
-        self._remove_sas_file(Path(FAST_DOWNWARD_DIR_PATH) / f"{domain_file_path.stem}_output.sas")
+        solve_problems(problems_directory_path,
+                       lambda problem_file_path, working_directory_path: self._solve_problem(
+                           problem_file_path, working_directory_path, domain_file_path, solving_stats),
+                       max_workers=max_workers)
         return solving_stats
 
 
@@ -1,13 +1,14 @@
 import logging
 import os
-import signal
-import subprocess
 import sys
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
 from pddl_plus_parser.exporters import MetricFFParser
 
+from solvers.concurrent_solving import solve_problems, solve_in_isolated_directory
+from solvers.solver_process import run_solver_process
+
 METRIC_FF_DIRECTORY = os.environ["METRIC_FF_DIRECTORY"]
 
 MAX_RUNNING_TIME = 60  # seconds
@@ -17,31 +18,28 @@ class MetricFFSolver:
     """Class designated to use to activate the metric-FF solver on the cluster and parse its result."""
 
     logger: logging.Logger
+    cpu_time_limit: Optional[int]
+    memory_limit_mb: Optional[int]
 
-    def __init__(self):
+    def __init__(self, cpu_time_limit: Optional[int] = None, memory_limit_mb: Optional[int] = None):
         self.logger = logging.getLogger(__name__)
         self.parser = MetricFFParser()
+        self.cpu_time_limit = cpu_time_limit
+        self.memory_limit_mb = memory_limit_mb
 
     def _run_metric_ff_process(self, run_command: str, solution_path: Path,
-                               problem_file_path: Path, solving_stats: Dict[str, str]) -> None:
+                               problem_file_path: Path, solving_stats: Dict[str, str],
+                               working_directory_path: Path) -> None:
         """Runs the metric-ff process."""
         self.logger.info(f"Metric-FF solver is working on - {problem_file_path.stem}")
-        process = subprocess.Popen(run_command, shell=True)
-        try:
-            process.wait(timeout=MAX_RUNNING_TIME)
-        except subprocess.TimeoutExpired:
+        process = run_solver_process(run_command, working_directory_path, timeout=MAX_RUNNING_TIME,
+                                     cpu_time_limit=self.cpu_time_limit, memory_limit_mb=self.memory_limit_mb)
+        if process is None:
             self.logger.warning(f"Metric-FF solver took more than {MAX_RUNNING_TIME} seconds to finish.")
-            os.kill(process.pid, signal.SIGTERM)
-            os.system("pkill -f ./ff")
             solution_path.unlink(missing_ok=True)
             solving_stats[problem_file_path.stem] = "timeout"
             return
 
-        if process.returncode is None:
-            solving_stats[problem_file_path.stem] = "timeout"
-            solution_path.unlink(missing_ok=True)
-            return
-
         if process.returncode != 0:
             self.logger.warning(f"Solver returned status code {process.returncode}.")
             solving_stats[problem_file_path.stem] = "no_solution"
@@ -59,21 +57,50 @@ class MetricFFSolver:
             self.logger.warning(f"Solver could not solve problem - {problem_file_path.stem}")
             solving_stats[problem_file_path.stem] = "no_solution"
 
-    def execute_solver(self, problems_directory_path: Path, domain_file_path: Path) -> Dict[str, str]:
+    def _solve_problem(self, problem_file_path: Path, working_directory_path: Path, domain_file_path: Path,
+                       solving_stats: Dict[str, str]) -> None:
+        """Solves a single problem using Metric-FF and outputs the solution next to the problem file.
+
+        :param problem_file_path: the path to the problem file.
+        :param working_directory_path: the directory in which the Metric-FF process runs.
+        :param domain_file_path: the path to the domain file.
+        :param solving_stats: the statistics of the solving process.
+        """
+        self.logger.debug(f"Starting to work on solving problem - {problem_file_path.stem}")
+        solution_path = problem_file_path.parent / f"{problem_file_path.stem}.solution"
+        run_command = f"{Path(METRIC_FF_DIRECTORY).absolute() / 'ff'} -o {domain_file_path.absolute()} " \
+                      f"-f {problem_file_path.absolute()} -s 0 > {solution_path.absolute()}"
+        self._run_metric_ff_process(run_command, solution_path, problem_file_path, solving_stats,
+                                    working_directory_path)
+
+    def solve_problem(self, problem_file_path: Path, domain_file_path: Path) -> Optional[str]:
+        """Solves a single problem using Metric-FF in an isolated working directory.
+
+        :param problem_file_path: the path to the problem file.
+        :param domain_file_path: the path to the domain file.
+        :return: the solving status of the problem or None if the solver did not report a status.
+        """
+        solving_stats = {}
+        solve_in_isolated_directory(
+            lambda _, working_directory_path: self._solve_problem(
+                problem_file_path, working_directory_path, domain_file_path, solving_stats), problem_file_path)
+        return solving_stats.get(problem_file_path.stem)
+
+    def execute_solver(self, problems_directory_path: Path, domain_file_path: Path,
+                       max_workers: int = 1) -> Dict[str, str]:
         """Solves numeric and PDDL+ problems using the Metric-FF algorithm and outputs the solution into a file.
 
         :param problems_directory_path: the path to the problems directory.
         :param domain_file_path: the path to the domain file.
+        :param max_workers: the maximal number of problems to solve concurrently.
+        :return: mapping between the problem names and their solving status.
         """
         solving_stats = {}
-        os.chdir(METRIC_FF_DIRECTORY)
         self.logger.info("Starting to solve the input problems using Metic-FF solver.")
-        for problem_file_path in problems_directory_path.glob("pfile*.pddl"):
-            self.logger.debug(f"Starting to work on solving problem - {problem_file_path.stem}")
-            solution_path = problems_directory_path / f"{problem_file_path.stem}.solution"
-            run_command = f"./ff -o {domain_file_path} -f {problem_file_path} -s 0 > {solution_path}"
-            self._run_metric_ff_process(run_command, solution_path, problem_file_path, solving_stats)
-
+        solve_problems(problems_directory_path,
+                       lambda problem_file_path, working_directory_path: self._solve_problem(
+                           problem_file_path, working_directory_path, domain_file_path, solving_stats),
+                       max_workers=max_workers)
         return solving_stats
 
 
@@ -0,0 +1,95 @@
+"""Module responsible for running solver processes with resource limits and killing them precisely."""
+import logging
+import os
+import signal
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+KILL_GRACE_PERIOD = 5  # seconds
+SHELL_SIGNAL_EXIT_OFFSET = 128
+RESOURCE_LIMIT_SIGNALS = {signal.SIGXCPU, signal.SIGKILL}
+
+logger = logging.getLogger(__name__)
+
+
+def _create_limited_command(run_command: str, cpu_time_limit: Optional[int], memory_limit_mb: Optional[int]) -> str:
+    """Prefixes the command with the shell's resource limits so that they apply to the solver and its children.
+
+    Note: the limits are set by the shell and not in a preexec function since the solvers may run from threads.
+
+    :param run_command: the command running the solver.
+    :param cpu_time_limit: the maximal CPU time of the solver in seconds.
+    :param memory_limit_mb: the maximal virtual memory of the solver in megabytes.
+    :return: the command running the solver under the resource limits.
+    """
+    limits = []
+    if cpu_time_limit is not None:
+        limits.append(f"ulimit -t {cpu_time_limit}")
+
+    if memory_limit_mb is not None:
+        limits.append(f"ulimit -v {memory_limit_mb * 1024}")
+
+    return " && ".join(limits + [run_command])
+
+
+def _is_killed_by_resource_limit(return_code: int) -> bool:
+    """Checks whether the solver was terminated by the signals sent to processes that exceed their CPU time limit.
+
+    Note: the shell reports a child terminated by a signal as 128 + the signal's number, while a shell that was
+        terminated itself has a negative return code.
+
+    :param return_code: the return code of the solver process.
+    :return: whether the solver was terminated by SIGXCPU or SIGKILL.
+    """
+    signal_number = -return_code if return_code < 0 else return_code - SHELL_SIGNAL_EXIT_OFFSET
+    return signal_number in RESOURCE_LIMIT_SIGNALS
+
+
+def _kill_process_group(process: subprocess.Popen) -> None:
+    """Kills the solver process together with all the processes it spawned, leaving other solvers running.
+
+    :param process: the solver process, which leads its own process group.
+    """
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.communicate(timeout=KILL_GRACE_PERIOD)
+
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.communicate()
+
+    except ProcessLookupError:
+        return
+
+
+def run_solver_process(run_command: str, working_directory_path: Path, timeout: int,
+                       cpu_time_limit: Optional[int] = None, memory_limit_mb: Optional[int] = None,
+                       capture_output: bool = False) -> Optional[subprocess.CompletedProcess]:
+    """Runs the solver command in its own session and kills its whole process group if it exceeds the timeout.
+
+    :param run_command: the shell command running the solver.
+    :param working_directory_path: the directory in which the solver runs.
+    :param timeout: the maximal wall-clock running time of the solver in seconds.
+    :param cpu_time_limit: the maximal CPU time of the solver in seconds, not limited if not given.
+    :param memory_limit_mb: the maximal virtual memory of the solver in megabytes, not limited if not given.
+    :param capture_output: whether to capture the standard output and error of the solver.
+    :return: the completed process or None if the solver was killed due to the timeout or the CPU time limit.
+    """
+    output_pipe = subprocess.PIPE if capture_output else None
+    process = subprocess.Popen(_create_limited_command(run_command, cpu_time_limit, memory_limit_mb), shell=True,
+                               cwd=working_directory_path, stdout=output_pipe, stderr=output_pipe,
+                               start_new_session=True)
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+
+    except subprocess.TimeoutExpired:
+        logger.debug(f"The solver process {process.pid} exceeded {timeout} seconds and is being killed.")
+        _kill_process_group(process)
+        return None
+
+    if _is_killed_by_resource_limit(process.returncode):
+        logger.debug(f"The solver process {process.pid} was killed by signal after exceeding its resource limits.")
+        return None
+
+    return subprocess.CompletedProcess(run_command, process.returncode, stdout or b"", stderr or b"")
@@ -0,0 +1,62 @@
+"""Module test for the compact trajectory format."""
+from pathlib import Path
+
+import numpy as np
+from pddl_plus_parser.lisp_parsers import DomainParser, ProblemParser, TrajectoryParser
+from pddl_plus_parser.models import Domain, Observation
+from pytest import fixture
+
+from sam_learning.core import CompactTrajectory, convert_to_compact_trajectory
+from tests.consts import NUMERIC_DOMAIN_PATH, NUMERIC_PROBLEM_PATH, DEPOT_NUMERIC_TRAJECTORY_PATH
+
+
+@fixture()
+def depot_domain() -> Domain:
+    return DomainParser(NUMERIC_DOMAIN_PATH, partial_parsing=True).parse_domain()
+
+
+@fixture()
+def depot_observation(depot_domain: Domain) -> Observation:
+    problem = ProblemParser(problem_path=NUMERIC_PROBLEM_PATH, domain=depot_domain).parse_problem()
+    return TrajectoryParser(depot_domain, problem).parse_trajectory(DEPOT_NUMERIC_TRAJECTORY_PATH)
+
+
+@fixture()
+def compact_trajectory(depot_observation: Observation, tmp_path: Path) -> CompactTrajectory:
+    convert_to_compact_trajectory(depot_observation, tmp_path)
+    return CompactTrajectory(tmp_path)
+
+
+def test_convert_to_compact_trajectory_stores_a_state_per_trajectory_step(
+        depot_observation: Observation, compact_trajectory: CompactTrajectory):
+    assert len(compact_trajectory) == len(depot_observation.components)
+    assert compact_trajectory.fluents_matrix.shape[0] <= 2 * len(depot_observation.components)
+    assert isinstance(compact_trajectory.fluents_matrix, np.memmap)
+
+
+def test_get_action_call_returns_the_action_call_of_the_component(
+        depot_observation: Observation, compact_trajectory: CompactTrajectory):
+    for component_index, component in enumerate(depot_observation.components):
+        assert str(compact_trajectory.get_action_call(component_index)) == str(component.grounded_action_call)
+
+
+def test_get_fluent_columns_returns_the_values_of_the_fluents_in_all_states(
+        depot_observation: Observation, compact_trajectory: CompactTrajectory):
+    fluents_values = compact_trajectory.get_fluent_columns(["(fuel-cost )", "(current_load truck0)"],
+                                                           compact_trajectory.previous_state_indexes)
+    for component, (fuel_cost, current_load) in zip(depot_observation.components, fluents_values):
+        assert component.previous_state.state_fluents["(fuel-cost )"].value == fuel_cost
+        assert component.previous_state.state_fluents["(current_load truck0)"].value == current_load
+
+
+def test_to_observation_recreates_the_states_of_the_original_observation(
+        depot_domain: Domain, depot_observation: Observation, compact_trajectory: CompactTrajectory):
+    observation = compact_trajectory.to_observation(depot_domain)
+    assert observation.grounded_objects.keys() == depot_observation.grounded_objects.keys()
+    for component, expected_component in zip(observation.components, depot_observation.components):
+        for lifted_predicate, grounded_predicates in expected_component.next_state.state_predicates.items():
+            assert {predicate.untyped_representation for predicate in
+                    component.next_state.state_predicates[lifted_predicate]} == \
+                   {predicate.untyped_representation for predicate in grounded_predicates}
+
+        assert component.next_state.state_fluents.keys() == expected_component.next_state.state_fluents.keys()
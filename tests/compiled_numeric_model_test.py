@@ -0,0 +1,67 @@
+"""Module test for the compiled numeric model."""
+import numpy as np
+import pytest
+
+from sam_learning.core import ConditionType, compile_numeric_model
+
+CONVEX_HULL_PRECONDITIONS = (["(<= (+ (* (x ?b) 0.71) (* (y ?b) 0.71)) 70.0)", "(<= (* (x ?b) -1.0) -1.5)",
+                              "(= (d ?t) 3.0)"], ConditionType.conjunctive)
+DISJUNCTIVE_PRECONDITIONS = (["(and (= (x ?b) 1.0) (= (y ?b) 2.0))", "(and (= (x ?b) 4.0) (= (y ?b) 5.0))"],
+                             ConditionType.disjunctive)
+
+
+def test_compile_numeric_model_creates_the_inequalities_matrix_of_conjunctive_preconditions():
+    compiled_model = compile_numeric_model("go_north_west", CONVEX_HULL_PRECONDITIONS, [])
+    assert compiled_model.fluent_names == ["(x ?b)", "(y ?b)", "(d ?t)"]
+    assert len(compiled_model.preconditions) == 1
+    inequalities_matrix, bounds = compiled_model.preconditions[0]
+    assert np.allclose(inequalities_matrix, [[0.71, 0.71, 0], [-1, 0, 0], [0, 0, 1], [0, 0, -1]])
+    assert np.allclose(bounds, [70, -1.5, 3, -3])
+
+
+def test_preconditions_hold_checks_all_the_states_at_once():
+    compiled_model = compile_numeric_model("go_north_west", CONVEX_HULL_PRECONDITIONS, [])
+    states_values = np.array([[2.0, 2.0, 3.0], [1.0, 2.0, 3.0], [2.0, 2.0, 4.0], [50.0, 50.0, 3.0]])
+    assert compiled_model.preconditions_hold(states_values).tolist() == [True, False, False, False]
+
+
+def test_preconditions_hold_returns_true_if_any_of_the_disjunctive_preconditions_hold():
+    compiled_model = compile_numeric_model("move", DISJUNCTIVE_PRECONDITIONS, [])
+    assert len(compiled_model.preconditions) == 2
+    states_values = np.array([[1.0, 2.0], [4.0, 5.0], [1.0, 5.0]])
+    assert compiled_model.preconditions_hold(states_values).tolist() == [True, True, False]
+
+
+def test_preconditions_hold_returns_true_for_all_states_when_there_are_no_numeric_preconditions():
+    compiled_model = compile_numeric_model("drop", tuple(), ["(increase (fuel-cost ) 1.0)"])
+    assert compiled_model.preconditions_hold(np.array([[0.0], [5.0]])).tolist() == [True, True]
+
+
+def test_apply_effects_applies_assignments_increases_and_decreases_using_a_single_matrix():
+    compiled_model = compile_numeric_model(
+        "go_north_west", CONVEX_HULL_PRECONDITIONS,
+        ["(decrease (x ?b) 1.5)", "(increase (y ?b) (* (d ?t) 2.0))", "(assign (d ?t) (+ (x ?b) 1.0))"])
+    states_values = np.array([[2.0, 2.0, 3.0], [10.0, 0.0, 1.0]])
+    assert compiled_model.affected_fluents == ["(x ?b)", "(y ?b)", "(d ?t)"]
+    assert np.allclose(compiled_model.apply_effects(states_values), [[0.5, 8.0, 3.0], [8.5, 2.0, 11.0]])
+
+
+def test_apply_effects_evaluates_all_the_effects_on_the_previous_state_regardless_of_their_order():
+    effects = ["(increase (x ?b) 1.0)", "(assign (y ?b) (* (x ?b) 2.0))"]
+    previous_values = {"(x ?b)": 7.0, "(y ?b)": 0.0}
+    for ordered_effects in [effects, effects[::-1]]:
+        compiled_model = compile_numeric_model("move", tuple(), ordered_effects)
+        states_values = np.array([[previous_values[fluent] for fluent in compiled_model.fluent_names]])
+        next_values = dict(zip(compiled_model.fluent_names, compiled_model.apply_effects(states_values)[0]))
+        assert next_values == {"(x ?b)": 8.0, "(y ?b)": 14.0}
+
+
+def test_ground_fluent_names_replaces_the_parameters_with_the_action_call_objects():
+    compiled_model = compile_numeric_model("go_north_west", CONVEX_HULL_PRECONDITIONS, ["(increase (total-cost ) 1)"])
+    assert compiled_model.ground_fluent_names({"?b": "b1", "?t": "t0"}) == \
+           ["(x b1)", "(y b1)", "(d t0)", "(total-cost )"]
+
+
+def test_compile_numeric_model_raises_value_error_when_the_effects_are_not_linear():
+    with pytest.raises(ValueError):
+        compile_numeric_model("move", tuple(), ["(assign (x ?b) (* (x ?b) (y ?b)))"])
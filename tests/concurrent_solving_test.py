@@ -0,0 +1,38 @@
+"""Module test for the concurrent execution of the solvers."""
+from pathlib import Path
+from typing import List
+
+from pytest import fixture
+
+from solvers.concurrent_solving import solve_problems
+
+
+@fixture()
+def problems_directory_path(tmp_path: Path) -> Path:
+    for problem_index in range(6):
+        (tmp_path / f"pfile{problem_index}.pddl").touch()
+
+    (tmp_path / "domain.pddl").touch()
+    return tmp_path
+
+
+def test_solve_problems_solves_only_the_problem_files_in_the_directory(problems_directory_path: Path):
+    solved_problems = []
+    solve_problems(problems_directory_path,
+                   lambda problem_file_path, working_directory_path: solved_problems.append(problem_file_path.stem))
+    assert solved_problems == [f"pfile{problem_index}" for problem_index in range(6)]
+
+
+def test_solve_problems_with_multiple_workers_runs_each_problem_in_a_separate_working_directory(
+        problems_directory_path: Path):
+    working_directories: List[Path] = []
+
+    def solve_problem(problem_file_path: Path, working_directory_path: Path) -> None:
+        assert working_directory_path.is_dir()
+        (working_directory_path / "output.sas").write_text(problem_file_path.stem)
+        working_directories.append(working_directory_path)
+
+    solve_problems(problems_directory_path, solve_problem, max_workers=3)
+    assert len(working_directories) == 6
+    assert len(set(working_directories)) == 6
+    assert all(not working_directory.exists() for working_directory in working_directories)
@@ -3,7 +3,7 @@ from typing import Set
 
 from pddl_plus_parser.lisp_parsers import DomainParser, ProblemParser, TrajectoryParser
 from pddl_plus_parser.models import Domain, Problem, Observation, GroundedPredicate
-from pytest import fixture
+from pytest import fixture, raises
 
 from sam_learning.core import DependencySet
 from sam_learning.learners import ConditionalSAM
@@ -97,11 +97,14 @@ def test_find_literals_not_in_state_correctly_sets_the_literals_that_do_not_appe
         current_action=grounded_action,
         previous_state=spider_observation.components[0].previous_state,
         next_state=spider_observation.components[0].next_state)
+    conditional_sam._initialize_actions_dependencies(grounded_action)
 
-    predicates_not_in_state = conditional_sam._find_literals_not_in_state(
+    literals_bitset = conditional_sam._find_literals_not_in_state(
         grounded_action=grounded_action,
         positive_predicates=conditional_sam.previous_state_positive_predicates,
         negative_predicates=conditional_sam.previous_state_negative_predicates)
+    literals_interner = conditional_sam.dependency_set[grounded_action.name].literals_interner
+    predicates_not_in_state = literals_interner.from_bitset(literals_bitset)
 
     negative_preconditions = {"(currently-updating-movable )", "(currently-updating-unmovable )",
                               "(currently-updating-part-of-tableau )", "(currently-collecting-deck )",
@@ -110,6 +113,16 @@ def test_find_literals_not_in_state_correctly_sets_the_literals_that_do_not_appe
     assert negative_preconditions.issubset(predicates_not_in_state)
 
 
+def test_find_literals_not_in_state_raises_value_error_when_the_dependency_set_was_not_initialized(
+        conditional_sam: ConditionalSAM, spider_observation: Observation):
+    grounded_action = spider_observation.components[0].grounded_action_call
+    with raises(ValueError):
+        conditional_sam._find_literals_not_in_state(
+            grounded_action=grounded_action,
+            positive_predicates=conditional_sam.previous_state_positive_predicates,
+            negative_predicates=conditional_sam.previous_state_negative_predicates)
+
+
 def test_find_literals_existing_in_state_correctly_sets_the_literals_that_do_appear_in_the_state(
         conditional_sam: ConditionalSAM, spider_observation: Observation):
     grounded_action = spider_observation.components[0].grounded_action_call
@@ -117,11 +130,14 @@ def test_find_literals_existing_in_state_correctly_sets_the_literals_that_do_app
         current_action=grounded_action,
         previous_state=spider_observation.components[0].previous_state,
         next_state=spider_observation.components[0].next_state)
+    conditional_sam._initialize_actions_dependencies(grounded_action)
 
-    predicates_not_in_state = conditional_sam._find_literals_existing_in_state(
+    literals_bitset = conditional_sam._find_literals_existing_in_state(
         grounded_action=grounded_action,
         positive_predicates=conditional_sam.previous_state_positive_predicates,
         negative_predicates=conditional_sam.previous_state_negative_predicates)
+    literals_interner = conditional_sam.dependency_set[grounded_action.name].literals_interner
+    predicates_not_in_state = literals_interner.from_bitset(literals_bitset)
 
     negated_negative_preconditions = {"(currently-updating-movable )", "(currently-updating-unmovable )",
                                       "(currently-updating-part-of-tableau )", "(currently-collecting-deck )",
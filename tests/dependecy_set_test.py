@@ -88,7 +88,7 @@ def test_is_safe_literal_returns_literal_safe_if_contains_zero_items(woodworking
     """Test the removal of a dependency from the dependency set."""
     dependency_set = DependencySet(max_size_antecedents=2)
     tested_predicate = "(available ?obj)"
-    dependency_set.dependencies[tested_predicate] = []
+    dependency_set.dependencies = {tested_predicate: []}
     predicates_to_remove = {"(is-smooth ?surface)", "(has-colour ?agent ?colour)"}
     assert dependency_set.is_safe_literal(tested_predicate, predicates_to_remove)
 
@@ -97,7 +97,7 @@ def test_is_safe_literal_returns_literal_safe_if_contains_one_item(woodworking_p
     """Test the removal of a dependency from the dependency set."""
     dependency_set = DependencySet(max_size_antecedents=2)
     tested_predicate = "(available ?obj)"
-    dependency_set.dependencies[tested_predicate] = [{"(available ?obj)"}]
+    dependency_set.dependencies = {tested_predicate: [{"(available ?obj)"}]}
     predicates_to_remove = {"(is-smooth ?surface)", "(has-colour ?agent ?colour)"}
     assert dependency_set.is_safe_literal(tested_predicate, predicates_to_remove)
 
@@ -132,3 +132,36 @@ def test_extract_restrictive_conditions_converts_all_positive_predicates_to_nega
     assert len(positive_predicates) + len(negative_predicates) == len(literals_str)
     assert len(positive_predicates) == len(negative_predicates)
     assert positive_predicates == negative_predicates
+
+
+def test_remove_literals_dependencies_removes_the_subsets_of_the_removed_literals_from_all_given_literals(
+        woodworking_predicates: List[Predicate]):
+    """Test the removal of dependencies from the dependency sets of several literals at once."""
+    dependency_set = DependencySet(max_size_antecedents=2)
+    dependency_set.initialize_dependencies(set(woodworking_predicates))
+    tested_predicates = {"(available ?obj)", "(not (available ?obj))"}
+    predicates_to_remove = {"(is-smooth ?surface)", "(has-colour ?agent ?colour)"}
+    dependency_set.remove_literals_dependencies(tested_predicates, predicates_to_remove)
+    for tested_predicate in tested_predicates:
+        assert len(dependency_set.dependencies[tested_predicate]) == 378 + 28 - 3
+        assert {"(is-smooth ?surface)", "(has-colour ?agent ?colour)"} not in \
+               dependency_set.dependencies[tested_predicate]
+        assert {"(is-smooth ?surface)", "(not (available ?obj))"} in dependency_set.dependencies[tested_predicate]
+
+    assert len(dependency_set.dependencies["(is-smooth ?surface)"]) == 378 + 28
+
+
+def test_remove_bitset_dependencies_removes_the_same_dependencies_as_remove_literals_dependencies(
+        woodworking_predicates: List[Predicate]):
+    """Test that removing dependencies represented as bitsets is equivalent to removing them as literals."""
+    literals_dependency_set = DependencySet(max_size_antecedents=2)
+    literals_dependency_set.initialize_dependencies(set(woodworking_predicates))
+    bitset_dependency_set = DependencySet(max_size_antecedents=2)
+    bitset_dependency_set.initialize_dependencies(set(woodworking_predicates))
+    tested_predicates = {"(available ?obj)", "(not (available ?obj))"}
+    predicates_to_remove = {"(is-smooth ?surface)", "(has-colour ?agent ?colour)"}
+    literals_dependency_set.remove_literals_dependencies(tested_predicates, predicates_to_remove)
+    bitset_dependency_set.remove_bitset_dependencies(
+        bitset_dependency_set.literals_interner.to_bitset(tested_predicates),
+        bitset_dependency_set.literals_interner.to_bitset(predicates_to_remove))
+    assert bitset_dependency_set.antecedents == literals_dependency_set.antecedents
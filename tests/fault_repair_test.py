@@ -74,6 +74,32 @@ def test_validate_applied_action_returns_false_if_the_faulty_action_differs_from
         faulty_action_name="lift", valid_next_state=valid_next_state, faulty_next_state=invalid_next_state) is False
 
 
+def test_apply_action_with_a_compiled_action_returns_the_same_state_as_the_operator(
+        fault_repair: FaultRepair, domain: Domain, problem: Problem):
+    """Test that applying the compiled action results in the same state as applying the grounded operator."""
+    previous_state = State(predicates=problem.initial_state_predicates,
+                           fluents=problem.initial_state_fluents, is_init=True)
+    parameters = ["hoist3", "crate2", "crate0", "distributor1"]
+    expected_next_state = Operator(action=domain.actions["lift"], domain=domain,
+                                   grounded_action_call=parameters).apply(previous_state)
+    next_state = fault_repair._apply_action(fault_repair.model_domain, fault_repair.model_compiled_actions, "lift",
+                                            parameters, previous_state)
+    assert "lift" in fault_repair.model_compiled_actions
+    assert next_state.serialize() == expected_next_state.serialize()
+    assert previous_state.state_fluents["(fuel-cost )"].value == 0
+
+
+def test_apply_action_with_a_compiled_faulty_action_applies_the_faulty_numeric_effect(
+        fault_repair: FaultRepair, problem: Problem, faulty_domain: Domain):
+    """Test that the numeric effects of the faulty action are applied using its compiled model."""
+    previous_state = State(predicates=problem.initial_state_predicates,
+                           fluents=problem.initial_state_fluents, is_init=True)
+    faulty_compiled_actions = fault_repair._compile_numeric_actions(faulty_domain)
+    next_state = fault_repair._apply_action(faulty_domain, faulty_compiled_actions, "lift",
+                                            ["hoist3", "crate2", "crate0", "distributor1"], previous_state)
+    assert next_state.state_fluents["(fuel-cost )"].value == 4.0
+
+
 def test_observe_single_plan_on_a_faulty_plan_returns_lift_as_faulty_action(
         fault_repair: FaultRepair, faulty_domain: Domain):
     """Test that the observe_single_plan function returns the faulty action name."""
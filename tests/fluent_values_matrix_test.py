@@ -0,0 +1,97 @@
+"""Module test for the growable matrix storing the values of the numeric fluents."""
+from copy import deepcopy
+
+import numpy as np
+import pytest
+
+from sam_learning.core import FluentValuesMatrix
+
+
+def test_append_values_adds_a_single_row_and_creates_columns_for_new_fluents():
+    values_matrix = FluentValuesMatrix()
+    values_matrix.append_values({"(x ?b)": 1.0, "(y ?b)": 2.0})
+    values_matrix.append_values({"(x ?b)": 3.0, "(y ?b)": 4.0})
+    assert list(values_matrix.keys()) == ["(x ?b)", "(y ?b)"]
+    assert values_matrix["(x ?b)"].tolist() == [1.0, 3.0]
+    assert values_matrix.to_array().tolist() == [[1.0, 2.0], [3.0, 4.0]]
+
+
+def test_append_values_grows_the_matrix_when_the_capacity_is_exceeded():
+    values_matrix = FluentValuesMatrix()
+    fluents = [f"(f{index} )" for index in range(10)]
+    for row_index in range(100):
+        values_matrix.append_values({fluent: row_index * column_index for column_index, fluent in enumerate(fluents)})
+
+    assert values_matrix.num_rows == 100
+    assert np.array_equal(values_matrix.to_array(), np.outer(np.arange(100), np.arange(10)))
+
+
+def test_to_array_returns_a_read_only_view_when_all_the_fluents_are_requested():
+    values_matrix = FluentValuesMatrix()
+    values_matrix.append_values({"(x ?b)": 1.0, "(y ?b)": 2.0})
+    values_array = values_matrix.to_array()
+    assert np.shares_memory(values_array, values_matrix["(x ?b)"])
+    with pytest.raises(ValueError):
+        values_array[0, 0] = 5.0
+
+
+def test_to_array_returns_the_requested_fluents_in_the_requested_order():
+    values_matrix = FluentValuesMatrix()
+    values_matrix.append_values({"(x ?b)": 1.0, "(y ?b)": 2.0, "(z ?b)": 3.0})
+    assert values_matrix.to_array(["(z ?b)", "(x ?b)"]).tolist() == [[3.0, 1.0]]
+
+
+def test_fluents_observed_in_part_of_the_states_have_fewer_values_than_the_number_of_rows():
+    values_matrix = FluentValuesMatrix()
+    values_matrix.append_values({"(x ?b)": 1.0})
+    values_matrix.append_values({"(x ?b)": 2.0, "(y ?b)": 5.0})
+    assert values_matrix.num_rows == 2
+    assert values_matrix["(y ?b)"].tolist() == [5.0]
+
+
+def test_append_row_skips_the_fluents_whose_values_are_not_defined():
+    values_matrix = FluentValuesMatrix()
+    values_matrix.append_row(["(x ?b)", "(y ?b)"], np.array([1.0, np.nan]))
+    values_matrix.append_row(["(x ?b)", "(y ?b)"], np.array([2.0, 5.0]))
+    assert values_matrix.num_rows == 2
+    assert values_matrix["(x ?b)"].tolist() == [1.0, 2.0]
+    assert values_matrix["(y ?b)"].tolist() == [5.0]
+
+
+def test_remove_fluents_removes_the_columns_and_keeps_the_values_of_the_remaining_fluents():
+    values_matrix = FluentValuesMatrix()
+    values_matrix.append_values({"(x ?b)": 1.0, "(y ?b)": 2.0, "(z ?b)": 3.0})
+    values_matrix.remove_fluents(["(y ?b)"])
+    assert list(values_matrix) == ["(x ?b)", "(z ?b)"]
+    assert values_matrix.to_array().tolist() == [[1.0, 3.0]]
+    assert values_matrix.pop("(x ?b)").tolist() == [1.0]
+    assert "(x ?b)" not in values_matrix
+
+
+def test_equality_compares_the_fluents_and_their_values_and_deep_copies_are_equal():
+    values_matrix = FluentValuesMatrix()
+    values_matrix.append_values({"(x ?b)": 1.0, "(y ?b)": 2.0})
+    copied_matrix = deepcopy(values_matrix)
+    assert copied_matrix == values_matrix
+    copied_matrix.append("(x ?b)", 4.0)
+    assert copied_matrix != values_matrix
+
+
+def test_keep_rows_keeps_only_the_selected_states_in_their_original_order():
+    values_matrix = FluentValuesMatrix()
+    for row_index in range(40):
+        values_matrix.append_values({"(x ?b)": row_index, "(y ?b)": -row_index})
+
+    values_matrix.keep_rows(np.array([30, 2, 7]))
+    assert values_matrix.to_array().tolist() == [[2.0, -2.0], [7.0, -7.0], [30.0, -30.0]]
+    values_matrix.append_values({"(x ?b)": 50.0, "(y ?b)": -50.0})
+    assert values_matrix["(x ?b)"].tolist() == [2.0, 7.0, 30.0, 50.0]
+
+
+def test_keep_rows_raises_value_error_when_the_fluents_have_a_different_number_of_values():
+    values_matrix = FluentValuesMatrix()
+    values_matrix.append_values({"(x ?b)": 1.0})
+    values_matrix.append_values({"(x ?b)": 2.0, "(y ?b)": 5.0})
+    assert not values_matrix.has_aligned_columns()
+    with pytest.raises(ValueError):
+        values_matrix.keep_rows(np.array([0]))
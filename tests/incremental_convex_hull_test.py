@@ -0,0 +1,62 @@
+"""Module test for the incrementally updated convex hull."""
+import pickle
+from copy import deepcopy
+
+import numpy as np
+from pytest import fixture
+from scipy.spatial import ConvexHull
+
+from sam_learning.core import IncrementalConvexHull
+
+HULL_FLUENTS = ["(x ?b)", "(y ?b)"]
+
+
+@fixture()
+def incremental_hull() -> IncrementalConvexHull:
+    hull = IncrementalConvexHull()
+    hull.build(HULL_FLUENTS, np.array([[0.0, 0.0], [0.0, 1.0], [1.0, 0.0], [1.0, 1.0]]))
+    return hull
+
+
+def test_add_points_discards_points_that_are_strictly_inside_the_hull(incremental_hull: IncrementalConvexHull):
+    incremental_hull.add_points(np.array([[0.5, 0.5], [0.2, 0.7]]))
+    assert incremental_hull.num_observed_points == 6
+    assert len(incremental_hull.vertices_points) == 4
+    assert len(incremental_hull._hull.points) == 4
+
+
+def test_add_points_extends_the_hull_to_contain_the_new_points(incremental_hull: IncrementalConvexHull):
+    new_point = np.array([[2.0, 2.0]])
+    incremental_hull.add_points(new_point)
+    assert np.all(new_point @ incremental_hull.equations[:, :-1].T + incremental_hull.equations[:, -1] <= 1e-10)
+    assert {tuple(point) for point in incremental_hull.vertices_points} == {(0.0, 0.0), (0.0, 1.0), (1.0, 0.0),
+                                                                           (2.0, 2.0)}
+
+
+def test_add_points_keeps_only_the_vertices_when_many_points_are_no_longer_vertices(
+        incremental_hull: IncrementalConvexHull):
+    for radius in range(2, 20):
+        incremental_hull.add_points(np.array([[radius, 0.0], [0.0, radius], [radius, radius], [-radius, -radius]]))
+
+    assert len(incremental_hull._hull.points) <= 2 * len(incremental_hull._hull.vertices)
+
+
+def test_incremental_hull_has_the_same_vertices_as_a_hull_built_from_all_the_points(
+        incremental_hull: IncrementalConvexHull):
+    rng = np.random.default_rng(42)
+    points = rng.random((200, 2)) * 5
+    for points_batch in np.array_split(points, 10):
+        incremental_hull.add_points(points_batch)
+
+    all_points = np.r_[np.array([[0.0, 0.0], [0.0, 1.0], [1.0, 0.0], [1.0, 1.0]]), points]
+    expected_hull = ConvexHull(all_points)
+    assert {tuple(point) for point in incremental_hull.vertices_points} == \
+           {tuple(point) for point in all_points[expected_hull.vertices]}
+
+
+def test_copied_hull_is_rebuilt_from_its_vertices_when_new_points_are_added(incremental_hull: IncrementalConvexHull):
+    for copied_hull in [deepcopy(incremental_hull), pickle.loads(pickle.dumps(incremental_hull))]:
+        assert copied_hull.fluents == HULL_FLUENTS
+        copied_hull.add_points(np.array([[2.0, 2.0]]))
+        assert len(copied_hull.vertices_points) == 4
+        assert copied_hull.num_observed_points == 5
@@ -0,0 +1,31 @@
+"""Module test for the literals interner."""
+from sam_learning.core import LiteralsInterner
+
+
+def test_intern_returns_the_same_index_for_the_same_literal():
+    """Test that interning an existing literal does not assign it a new index."""
+    interner = LiteralsInterner()
+    first_index = interner.intern("(available ?obj)")
+    interner.intern("(is-smooth ?surface)")
+    assert interner.intern("(available ?obj)") == first_index
+    assert len(interner) == 2
+
+
+def test_to_bitset_sets_the_bits_of_the_literals_indexes():
+    """Test the conversion of literals to a bitset."""
+    interner = LiteralsInterner(["(a ?x)", "(b ?x)", "(c ?x)"])
+    assert interner.to_bitset({"(a ?x)", "(c ?x)"}) == 0b101
+
+
+def test_to_bitset_ignores_literals_that_were_not_interned():
+    """Test that unknown literals do not change the created bitset."""
+    interner = LiteralsInterner(["(a ?x)", "(b ?x)"])
+    assert interner.to_bitset({"(b ?x)", "(d ?x)"}) == 0b10
+    assert "(d ?x)" not in interner
+
+
+def test_from_bitset_returns_the_literals_represented_by_the_bitset():
+    """Test that converting literals to a bitset and back returns the original literals."""
+    interner = LiteralsInterner(["(a ?x)", "(b ?x)", "(c ?x)", "(not (a ?x))"])
+    literals = {"(b ?x)", "(not (a ?x))"}
+    assert interner.from_bitset(interner.to_bitset(literals)) == literals
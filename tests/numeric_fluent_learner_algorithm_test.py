@@ -309,6 +309,35 @@ def test_construct_assignment_equations_with_two_equations_result_in_multiple_ch
         "(assign (current_load ?z) (* (load_limit ?z) 9.0))"}
 
 
+def test_construct_assignment_equations_with_two_equations_validates_and_solves_the_equations_only_once(
+        load_action_state_fluent_storage: NumericFluentStateStorage, monkeypatch):
+    previous_state_values = [(1, 7), (2, -1), (2, 14), (1, 0)]
+    next_state_values = [(7, 9), (-16, 18), (14, 18), (-7, 9)]
+    for prev_values, next_values in zip(previous_state_values, next_state_values):
+        load_action_state_fluent_storage.add_previous_state_values(
+            {"(load_limit ?z)": prev_values[0], "(current_load ?z)": prev_values[1]})
+        load_action_state_fluent_storage.add_next_state_values(
+            {"(load_limit ?z)": next_values[0], "(current_load ?z)": next_values[1]})
+
+    calls_count = {"validate": 0, "solve": 0}
+    validate_legal_equations = load_action_state_fluent_storage._validate_legal_equations
+    solve_linear_equations = load_action_state_fluent_storage._solve_functions_linear_equations
+
+    def count_validation_calls(*args):
+        calls_count["validate"] += 1
+        return validate_legal_equations(*args)
+
+    def count_solving_calls(*args):
+        calls_count["solve"] += 1
+        return solve_linear_equations(*args)
+
+    monkeypatch.setattr(load_action_state_fluent_storage, "_validate_legal_equations", count_validation_calls)
+    monkeypatch.setattr(load_action_state_fluent_storage, "_solve_functions_linear_equations", count_solving_calls)
+    assignment_equations = load_action_state_fluent_storage.construct_assignment_equations()
+    assert len(assignment_equations) == 2
+    assert calls_count == {"validate": 1, "solve": 1}
+
+
 def test_construct_assignment_equations_with_an_increase_change_results_in_correct_values(
         load_action_state_fluent_storage: NumericFluentStateStorage):
     previous_state_values = [(0, 7), (2, -1), (12, 32)]
@@ -635,3 +664,171 @@ def test_filter_constant_features_with_two_constant_detects_both_and_removes_the
     assert filtered_matrix.shape[1] == 2
     assert equal_fluent_strs == ["(= (load_limit ?z) 33.0)", "(= (weight ?z) 5.0)"]
     assert removed_fluents == ["(load_limit ?z)", "(weight ?z)"]
+
+
+def test_validate_legal_equations_with_linearly_dependent_rows_raises_not_safe_error(
+        load_action_state_fluent_storage: NumericFluentStateStorage):
+    values_matrix = np.array([[1.0, 2.0], [2.0, 4.0], [3.0, 6.0], [4.0, 8.0]])
+    with raises(NotSafeActionError):
+        load_action_state_fluent_storage._validate_legal_equations(values_matrix)
+
+
+def test_validate_legal_equations_uses_the_rank_tolerance_to_ignore_almost_dependent_rows():
+    values_matrix = np.array([[1.0, 2.0], [2.0, 4.0], [3.0, 6.0 + 1e-7]])
+    NumericFluentStateStorage(action_name="load")._validate_legal_equations(values_matrix)
+    with raises(NotSafeActionError):
+        NumericFluentStateStorage(action_name="load", rank_tolerance=1e-5)._validate_legal_equations(values_matrix)
+
+
+def test_validate_legal_equations_does_not_check_the_rank_again_once_the_matrix_reached_a_full_rank(
+        load_action_state_fluent_storage: NumericFluentStateStorage, monkeypatch):
+    for load_limit, current_load in [(1.0, 7.0), (2.0, -1.0), (2.0, 14.0)]:
+        load_action_state_fluent_storage.add_previous_state_values(
+            {"(load_limit ?z)": load_limit, "(current_load ?z)": current_load})
+
+    load_action_state_fluent_storage._validate_legal_equations(
+        load_action_state_fluent_storage._convert_to_array_format("previous_state",
+                                                                  should_filter_repetitive_values=False))
+
+    def fail_rank_computation(*args, **kwargs):
+        fail("The rank should not be computed once the matrix reached a full rank.")
+
+    monkeypatch.setattr(np.linalg, "matrix_rank", fail_rank_computation)
+    load_action_state_fluent_storage.add_previous_state_values({"(load_limit ?z)": 3.0, "(current_load ?z)": 6.0})
+    load_action_state_fluent_storage._validate_legal_equations(
+        load_action_state_fluent_storage._convert_to_array_format("previous_state",
+                                                                  should_filter_repetitive_values=False))
+
+
+def test_construct_safe_linear_inequalities_updates_the_convex_hull_with_new_states_only_and_returns_the_same_result(
+        load_action_state_fluent_storage: NumericFluentStateStorage):
+    rng = np.random.default_rng(42)
+    points = rng.random((60, 2)) * 10
+    fluents = ["(fuel-cost )", "(current_load ?z)"]
+    for fuel_cost_val, current_load_val in points[:30]:
+        load_action_state_fluent_storage.add_previous_state_values(
+            {"(fuel-cost )": fuel_cost_val, "(current_load ?z)": current_load_val})
+
+    load_action_state_fluent_storage.construct_safe_linear_inequalities(fluents)
+    for fuel_cost_val, current_load_val in points[30:]:
+        load_action_state_fluent_storage.add_previous_state_values(
+            {"(fuel-cost )": fuel_cost_val, "(current_load ?z)": current_load_val})
+
+    incremental_conditions, _ = load_action_state_fluent_storage.construct_safe_linear_inequalities(fluents)
+    assert load_action_state_fluent_storage.previous_state_hull.num_observed_points == 60
+    all_points_storage = NumericFluentStateStorage(action_name="load")
+    for fuel_cost_val, current_load_val in points:
+        all_points_storage.add_previous_state_values(
+            {"(fuel-cost )": fuel_cost_val, "(current_load ?z)": current_load_val})
+
+    expected_conditions, _ = all_points_storage.construct_safe_linear_inequalities(fluents)
+    assert set(incremental_conditions) == set(expected_conditions)
+
+
+def _add_linear_effect_transitions(storage: NumericFluentStateStorage, points: np.ndarray) -> None:
+    for fuel_cost_val, current_load_val in points:
+        storage.add_previous_state_values({"(fuel-cost )": fuel_cost_val, "(current_load ?z)": current_load_val})
+        storage.add_next_state_values({"(fuel-cost )": fuel_cost_val + 2 * current_load_val + 1,
+                                       "(current_load ?z)": current_load_val})
+
+
+def test_compact_storage_drops_interior_states_without_changing_the_learned_preconditions_and_effects():
+    rng = np.random.default_rng(42)
+    points = rng.random((200, 2)) * 10
+    fluents = ["(fuel-cost )", "(current_load ?z)"]
+    compacted_storage = NumericFluentStateStorage(action_name="load")
+    full_storage = NumericFluentStateStorage(action_name="load")
+    _add_linear_effect_transitions(compacted_storage, points)
+    _add_linear_effect_transitions(full_storage, points)
+    compacted_storage.construct_safe_linear_inequalities(fluents)
+    compacted_storage.compact_storage()
+
+    assert compacted_storage.previous_state_storage.num_rows < 50
+    assert compacted_storage.next_state_storage.num_rows == compacted_storage.previous_state_storage.num_rows
+    compacted_preconditions, _ = compacted_storage.construct_safe_linear_inequalities(fluents)
+    expected_preconditions, _ = full_storage.construct_safe_linear_inequalities(fluents)
+    assert set(compacted_preconditions) == set(expected_preconditions)
+    assert compacted_storage.construct_assignment_equations() == full_storage.construct_assignment_equations()
+
+
+def test_compact_storage_keeps_all_the_states_when_the_effects_are_not_linear():
+    rng = np.random.default_rng(42)
+    storage = NumericFluentStateStorage(action_name="load")
+    for fuel_cost_val, current_load_val in rng.random((50, 2)) * 10:
+        storage.add_previous_state_values({"(fuel-cost )": fuel_cost_val, "(current_load ?z)": current_load_val})
+        storage.add_next_state_values({"(fuel-cost )": fuel_cost_val * current_load_val,
+                                       "(current_load ?z)": current_load_val})
+
+    storage.construct_safe_linear_inequalities(["(fuel-cost )", "(current_load ?z)"])
+    storage.compact_storage()
+    assert storage.previous_state_storage.num_rows == 50
+
+
+def test_add_next_state_values_compacts_the_storage_periodically_when_given_a_compaction_interval():
+    rng = np.random.default_rng(42)
+    storage = NumericFluentStateStorage(action_name="load", compaction_interval=50)
+    _add_linear_effect_transitions(storage, rng.random((20, 2)) * 10)
+    storage.construct_safe_linear_inequalities(["(fuel-cost )", "(current_load ?z)"])
+    _add_linear_effect_transitions(storage, rng.random((200, 2)) * 10)
+    assert storage.previous_state_storage.num_rows < 100
+
+
+def test_construct_assignment_equations_after_compaction_uses_the_statistics_of_all_the_transitions():
+    rng = np.random.default_rng(42)
+    storage = NumericFluentStateStorage(action_name="load")
+    _add_linear_effect_transitions(storage, rng.random((200, 2)) * 10)
+    storage.construct_safe_linear_inequalities(["(fuel-cost )", "(current_load ?z)"])
+    storage.compact_storage()
+    assert storage.effects_statistics.num_samples == 200
+    assert storage.previous_state_storage.num_rows < 50
+
+    storage.add_previous_state_values({"(fuel-cost )": 5.0, "(current_load ?z)": 5.0})
+    storage.add_next_state_values({"(fuel-cost )": 0.0, "(current_load ?z)": 5.0})
+    with raises(NotSafeActionError):
+        storage.construct_assignment_equations()
+
+
+def test_remove_duplicated_variables_maps_all_the_duplicates_to_the_first_identical_fluent(
+        load_action_state_fluent_storage: NumericFluentStateStorage):
+    for fuel_cost_val, current_load_val in [(1.0, -0.0), (2.0, 3.0)]:
+        load_action_state_fluent_storage.add_previous_state_values(
+            {"(fuel-cost )": fuel_cost_val, "(load_limit ?z)": fuel_cost_val, "(current_load ?z)": current_load_val,
+             "(weight ?z)": fuel_cost_val, "(capacity ?z)": abs(current_load_val)})
+
+    duplicate_map = load_action_state_fluent_storage._remove_duplicated_variables()
+    assert duplicate_map == {"(load_limit ?z)": "(fuel-cost )", "(weight ?z)": "(fuel-cost )",
+                             "(capacity ?z)": "(current_load ?z)"}
+    assert list(load_action_state_fluent_storage.previous_state_storage) == ["(fuel-cost )", "(current_load ?z)"]
+
+
+def test_detect_linear_dependent_features_with_many_fluents_removes_only_the_dependent_fluents(
+        load_action_state_fluent_storage: NumericFluentStateStorage):
+    rng = np.random.default_rng(42)
+    independent_values = rng.random((300, 100)) * 10
+    fluents = [f"(f{index} ?z)" for index in range(200)]
+    values_matrix = np.c_[independent_values, independent_values[:, :50] * 3, independent_values[:, 50:] * -2]
+    for state_values in values_matrix:
+        load_action_state_fluent_storage.add_previous_state_values(dict(zip(fluents, state_values)))
+
+    output_matrix, linear_dependent_fluent_strs, removed_fluents = \
+        load_action_state_fluent_storage._detect_linear_dependent_features(values_matrix, fluents)
+
+    assert removed_fluents == fluents[100:150]
+    assert output_matrix.shape[1] == 150
+    assert linear_dependent_fluent_strs[0] == f"(= (f0 ?z) (* {values_matrix[0, 0] / values_matrix[0, 100]} (f100 ?z)))"
+
+
+def test_add_next_state_values_compacts_the_storage_without_constructing_the_preconditions_first():
+    rng = np.random.default_rng(42)
+    points = rng.random((300, 2)) * 10
+    fluents = ["(fuel-cost )", "(current_load ?z)"]
+    compacted_storage = NumericFluentStateStorage(action_name="load", compaction_interval=20)
+    full_storage = NumericFluentStateStorage(action_name="load")
+    _add_linear_effect_transitions(compacted_storage, points)
+    _add_linear_effect_transitions(full_storage, points)
+
+    assert compacted_storage.previous_state_storage.num_rows < 100
+    compacted_preconditions, _ = compacted_storage.construct_safe_linear_inequalities(fluents)
+    expected_preconditions, _ = full_storage.construct_safe_linear_inequalities(fluents)
+    assert set(compacted_preconditions) == set(expected_preconditions)
+    assert compacted_storage.construct_assignment_equations() == full_storage.construct_assignment_equations()
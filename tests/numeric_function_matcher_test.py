@@ -114,3 +114,19 @@ def test_get_possible_literal_matches_from_actual_trajectory_state(
     for matched_lifted_function in possible_matches.values():
         for parameter in matched_lifted_function.signature:
             assert parameter in ["?x", "?y", "?z"]
+
+
+def test_match_state_function_names_finds_the_same_matches_as_matching_the_state_functions(
+        numeric_function_matcher: NumericFunctionMatcher, depot_observation: Observation):
+    for observation_component in depot_observation.components:
+        test_action_call = observation_component.grounded_action_call
+        test_previous_state_fluents = observation_component.previous_state.state_fluents
+        expected_matches = numeric_function_matcher.match_state_functions(
+            action_call=test_action_call, grounded_state_fluents=test_previous_state_fluents)
+        matched_names = numeric_function_matcher.match_state_function_names(
+            action_call=test_action_call, grounded_function_names=test_previous_state_fluents.keys())
+
+        assert matched_names.keys() == expected_matches.keys()
+        for lifted_function, grounded_function_name in matched_names.items():
+            assert test_previous_state_fluents[grounded_function_name].value == \
+                   expected_matches[lifted_function].value
@@ -8,7 +8,8 @@ from pddl_plus_parser.models import Domain, Problem, Observation, ActionCall
 from pytest import fixture
 
 from experiments import NumericPerformanceCalculator
-from experiments.performance_calculation_utils import _ground_tested_operator
+from experiments.performance_calculation_utils import _ground_tested_operator, GroundedOperatorsCache
+from sam_learning.learners import NumericSAMLearner
 from tests.consts import SAILING_EXPECTED_DOMAIN_PATH, SAILING_PROBLEM_PATH, SAILING_TRAJECTORY_PATH, \
     SAILING_LEARNED_DOMAIN_PATH
 from utilities import LearningAlgorithmType
@@ -56,6 +57,29 @@ def test_ground_tested_operator_is_able_to_ground_properly_with_negative_precond
         pytest.fail(f"Failed to ground the tested action properly. Exception: {e}")
 
 
+def test_grounded_operators_cache_returns_the_same_operator_for_recurring_action_calls(
+        sailing_learned_domain: Domain):
+    operators_cache = GroundedOperatorsCache(sailing_learned_domain)
+    grounded_operator = operators_cache.get_operator(ActionCall(name="save_person", grounded_parameters=["b3", "p2"]))
+    assert operators_cache.get_operator(ActionCall(name="save_person", grounded_parameters=["b3", "p2"])) is \
+           grounded_operator
+    assert operators_cache.get_operator(ActionCall(name="save_person", grounded_parameters=["b3", "p1"])) is not \
+           grounded_operator
+    assert grounded_operator.grounded
+
+
+def test_grounded_operators_cache_evicts_the_least_recently_used_operator_when_full(sailing_learned_domain: Domain):
+    operators_cache = GroundedOperatorsCache(sailing_learned_domain, max_size=2)
+    first_operator = operators_cache.get_operator(ActionCall(name="save_person", grounded_parameters=["b3", "p0"]))
+    operators_cache.get_operator(ActionCall(name="save_person", grounded_parameters=["b3", "p1"]))
+    operators_cache.get_operator(ActionCall(name="save_person", grounded_parameters=["b3", "p0"]))
+    operators_cache.get_operator(ActionCall(name="save_person", grounded_parameters=["b3", "p2"]))
+
+    assert len(operators_cache) == 2
+    assert operators_cache.get_operator(ActionCall(name="save_person", grounded_parameters=["b3", "p0"])) is \
+           first_operator
+
+
 def test_calculate_performance_is_able_to_ground_properly_with_negative_preconditions(
         numeric_performance_calculator: NumericPerformanceCalculator, sailing_learned_domain: Domain):
     try:
@@ -63,3 +87,21 @@ def test_calculate_performance_is_able_to_ground_properly_with_negative_precondi
                                                              num_used_observations=1)
     except Exception as e:
         pytest.fail(f"Failed to ground the tested action properly. Exception: {e}")
+
+
+def test_calculate_performance_with_compiled_models_returns_the_same_results_as_evaluating_the_expressions(
+        numeric_performance_calculator: NumericPerformanceCalculator,
+        sailing_expected_observation: Observation, tmp_path):
+    partial_domain = DomainParser(SAILING_EXPECTED_DOMAIN_PATH, partial_parsing=True).parse_domain()
+    learned_model, _ = NumericSAMLearner(partial_domain).learn_action_model([sailing_expected_observation])
+    learned_domain_path = tmp_path / "sailing_learned_domain.pddl"
+    learned_domain_path.write_text(learned_model.to_pddl())
+    learned_domain = DomainParser(learned_domain_path, partial_parsing=False).parse_domain()
+    compiled_models = learned_model.compiled_numeric_models
+
+    assert len(compiled_models) > 0
+    assert numeric_performance_calculator.calculate_preconditions_semantic_performance(
+        learned_domain, compiled_models) == \
+           numeric_performance_calculator.calculate_preconditions_semantic_performance(learned_domain)
+    assert numeric_performance_calculator.calculate_effects_performance(learned_domain, compiled_models) == \
+           pytest.approx(numeric_performance_calculator.calculate_effects_performance(learned_domain))
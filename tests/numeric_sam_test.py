@@ -1,16 +1,21 @@
 """module tests for the Numeric SAM learning algorithm"""
 import json
+from copy import deepcopy
 from typing import Dict, List
 
+import numpy as np
+
 from pddl_plus_parser.lisp_parsers import DomainParser, ProblemParser, TrajectoryParser
 from pddl_plus_parser.models import Domain, Problem, Observation
 from pytest import fixture
 
+from sam_learning.core import CompactTrajectory, convert_to_compact_trajectory
 from sam_learning.learners.numeric_sam import NumericSAMLearner
 from tests.consts import NUMERIC_DOMAIN_PATH, \
     NUMERIC_PROBLEM_PATH, DEPOT_NUMERIC_TRAJECTORY_PATH, DEPOT_FLUENTS_MAP_PATH, SATELLITE_DOMAIN_PATH, \
     SATELLITE_PROBLEM_PATH, SATELLITE_NUMERIC_TRAJECTORY_PATH, SATELLITE_FLUENTS_MAP_PATH, \
-    SATELLITE_PROBLEMATIC_PROBLEM_PATH, SATELLITE_PROBLEMATIC_NUMERIC_TRAJECTORY_PATH
+    SATELLITE_PROBLEMATIC_PROBLEM_PATH, SATELLITE_PROBLEMATIC_NUMERIC_TRAJECTORY_PATH, SAILING_EXPECTED_DOMAIN_PATH, \
+    SAILING_PROBLEM_PATH, SAILING_TRAJECTORY_PATH
 
 
 @fixture()
@@ -107,6 +112,16 @@ def test_learn_action_model_returns_learned_model(numeric_sam_learning: NumericS
     print(learned_model.to_pddl())
 
 
+def test_learn_action_model_compiles_the_numeric_model_of_the_learned_actions(
+        numeric_sam_learning: NumericSAMLearner, numeric_observation: Observation):
+    learned_model, _ = numeric_sam_learning.learn_action_model([numeric_observation])
+    compiled_models = learned_model.compiled_numeric_models
+    assert compiled_models.keys() == learned_model.actions.keys()
+    drive_model = compiled_models["drive"]
+    assert drive_model.affected_fluents == ["(fuel-cost )"]
+    assert drive_model.apply_effects(np.array([[5.0]])).tolist() == [[15.0]]
+
+
 def test_learn_action_model_for_satellite_domain_returns_learned_model(satellite_sam_learning: NumericSAMLearner,
                                                                        satellite_observation: Observation):
     learned_model, learning_metadata = satellite_sam_learning.learn_action_model([satellite_observation])
@@ -121,3 +136,70 @@ def test_learn_action_model_for_satellite_with_problematic_trajectory_domain_ret
     print()
     print(learning_metadata)
     print(learned_model.to_pddl())
+
+
+def test_create_domain_snapshot_does_not_modify_the_numeric_storage_of_the_learner(
+        numeric_sam_learning: NumericSAMLearner, numeric_observation: Observation):
+    numeric_sam_learning.add_observations([numeric_observation])
+    storage_before_snapshot = {action_name: deepcopy(storage.previous_state_storage)
+                               for action_name, storage in numeric_sam_learning.storage.items()}
+    first_snapshot, first_metadata = numeric_sam_learning.create_domain_snapshot()
+    second_snapshot, second_metadata = numeric_sam_learning.create_domain_snapshot()
+    assert first_metadata == second_metadata
+    assert first_snapshot.actions.keys() == second_snapshot.actions.keys()
+    for action_name, storage in numeric_sam_learning.storage.items():
+        assert storage.previous_state_storage == storage_before_snapshot[action_name]
+
+
+def test_copy_learning_state_updates_the_hulls_of_the_learner_and_does_not_share_them_with_the_copy(
+        numeric_sam_learning: NumericSAMLearner, numeric_observation: Observation):
+    numeric_sam_learning.add_observations([numeric_observation])
+    learner_copy = numeric_sam_learning._copy_learning_state()
+    for action_name, storage in numeric_sam_learning.storage.items():
+        copied_hull = learner_copy.storage[action_name].previous_state_hull
+        assert copied_hull is not storage.previous_state_hull
+        if storage.previous_state_hull.fluents is not None:
+            assert storage.previous_state_hull.num_observed_points == storage.previous_state_storage.num_rows
+
+        copied_hull.reset()
+        assert storage.previous_state_hull.fluents is None or storage.previous_state_hull.num_observed_points > 0
+
+
+def test_learn_action_model_with_storage_compaction_returns_the_same_model_as_without_compaction():
+    sailing_domain = DomainParser(SAILING_EXPECTED_DOMAIN_PATH, partial_parsing=True).parse_domain()
+    sailing_problem = ProblemParser(problem_path=SAILING_PROBLEM_PATH, domain=sailing_domain).parse_problem()
+    sailing_observation = TrajectoryParser(sailing_domain, sailing_problem).parse_trajectory(SAILING_TRAJECTORY_PATH)
+    compacting_learner = NumericSAMLearner(deepcopy(sailing_domain), storage_compaction_interval=3)
+    compacting_learner.add_observations([sailing_observation])
+    assert compacting_learner.storage["go_north_east"].previous_state_storage.num_rows < \
+           compacting_learner.storage["go_north_east"].effects_statistics.num_samples
+
+    compacted_model, compacted_metadata = compacting_learner.learn_action_model([])
+    learned_model, learning_metadata = NumericSAMLearner(deepcopy(sailing_domain)).learn_action_model(
+        [sailing_observation])
+    assert compacted_metadata == learning_metadata
+    # The convex hulls of the compacted and the full storages list the same facets in a different order.
+    for action in [*compacted_model.actions.values(), *learned_model.actions.values()]:
+        if action.numeric_preconditions is not None:
+            action.numeric_preconditions[0].sort()
+
+    assert compacted_model.to_pddl() == learned_model.to_pddl()
+
+
+def test_learn_action_model_from_compact_trajectories_collects_the_same_numeric_values_as_from_observations(
+        depot_domain: Domain, depot_fluents_map: Dict[str, List[str]], numeric_observation: Observation, tmp_path):
+    convert_to_compact_trajectory(numeric_observation, tmp_path)
+    compact_learner = NumericSAMLearner(depot_domain, depot_fluents_map)
+    compact_learner.add_compact_trajectories([CompactTrajectory(tmp_path)])
+    observations_learner = NumericSAMLearner(depot_domain, depot_fluents_map)
+    observations_learner.add_observations([numeric_observation])
+
+    assert compact_learner.storage.keys() == observations_learner.storage.keys()
+    for action_name, storage in observations_learner.storage.items():
+        assert compact_learner.storage[action_name].previous_state_storage == storage.previous_state_storage
+        assert compact_learner.storage[action_name].next_state_storage == storage.next_state_storage
+
+    compact_model, compact_metadata = compact_learner.learn_action_model_from_compact_trajectories([])
+    learned_model, learning_metadata = observations_learner.learn_action_model([])
+    assert compact_metadata == learning_metadata
+    assert compact_model.to_pddl() == learned_model.to_pddl()
@@ -0,0 +1,98 @@
+"""Module test for the observations loader."""
+import shutil
+from pathlib import Path
+
+from pddl_plus_parser.lisp_parsers import DomainParser, ProblemParser, TrajectoryParser
+from pddl_plus_parser.models import Observation
+from pytest import fixture
+
+from experiments.observations_loader import ObservationsLoader, _parse_domain
+from tests.consts import ELEVATORS_DOMAIN_PATH, ELEVATORS_PROBLEM_PATH, ELEVATORS_TRAJECTORY_PATH
+
+
+@fixture()
+def working_directory(tmp_path: Path) -> Path:
+    shutil.copy(ELEVATORS_DOMAIN_PATH, tmp_path / ELEVATORS_DOMAIN_PATH.name)
+    for problem_name in ["p03", "p04"]:
+        shutil.copy(ELEVATORS_PROBLEM_PATH, tmp_path / f"{problem_name}.pddl")
+        shutil.copy(ELEVATORS_TRAJECTORY_PATH, tmp_path / f"{problem_name}.trajectory")
+
+    return tmp_path
+
+
+@fixture()
+def elevators_observation() -> Observation:
+    domain = DomainParser(ELEVATORS_DOMAIN_PATH, partial_parsing=True).parse_domain()
+    problem = ProblemParser(problem_path=ELEVATORS_PROBLEM_PATH, domain=domain).parse_problem()
+    return TrajectoryParser(domain, problem).parse_trajectory(ELEVATORS_TRAJECTORY_PATH)
+
+
+def test_load_observations_returns_the_same_observation_as_parsing_the_trajectory(
+        working_directory: Path, elevators_observation: Observation):
+    loader = ObservationsLoader(working_directory / ELEVATORS_DOMAIN_PATH.name, max_workers=1)
+    observation, = loader.load_observations([working_directory / "p03.trajectory"])
+    assert len(observation.components) == len(elevators_observation.components)
+    assert observation.grounded_objects.keys() == elevators_observation.grounded_objects.keys()
+    for component, expected_component in zip(observation.components, elevators_observation.components):
+        assert str(component.grounded_action_call) == str(expected_component.grounded_action_call)
+
+
+def test_load_directory_observations_parses_all_trajectories_in_parallel(working_directory: Path):
+    loader = ObservationsLoader(working_directory / ELEVATORS_DOMAIN_PATH.name, max_workers=2)
+    observations = loader.load_directory_observations(working_directory)
+    assert len(observations) == 2
+    assert len(observations[0].components) == len(observations[1].components) > 0
+
+
+def test_load_observations_loads_identical_trajectories_from_the_cache_directory_without_parsing_them(
+        working_directory: Path, tmp_path_factory, monkeypatch):
+    cache_directory_path = tmp_path_factory.mktemp("cache")
+    domain_path = working_directory / ELEVATORS_DOMAIN_PATH.name
+    ObservationsLoader(domain_path, cache_directory_path=cache_directory_path).load_observations(
+        [working_directory / "p03.trajectory"])
+    assert len(list(cache_directory_path.glob("*.pkl"))) == 1
+
+    def fail_parsing(*args, **kwargs):
+        raise AssertionError("The observation should have been loaded from the cache.")
+
+    monkeypatch.setattr("experiments.observations_loader.parse_observation", fail_parsing)
+    loader = ObservationsLoader(domain_path, cache_directory_path=cache_directory_path)
+    observation, = loader.load_observations([working_directory / "p04.trajectory"])
+    assert len(observation.components) > 0
+
+
+def test_load_observations_returns_a_new_copy_of_the_cached_observation_on_each_load(working_directory: Path):
+    loader = ObservationsLoader(working_directory / ELEVATORS_DOMAIN_PATH.name, max_workers=1)
+    first_observation, = loader.load_observations([working_directory / "p03.trajectory"])
+    num_components = len(first_observation.components)
+    first_observation.components.clear()
+    second_observation, = loader.load_observations([working_directory / "p03.trajectory"])
+    assert second_observation is not first_observation
+    assert len(second_observation.components) == num_components
+
+
+def test_load_observations_keeps_only_the_most_recently_used_observations_in_memory(working_directory: Path):
+    loader = ObservationsLoader(working_directory / ELEVATORS_DOMAIN_PATH.name, max_workers=1,
+                                max_cached_observations=1)
+    (working_directory / "p04.trajectory").write_text((working_directory / "p04.trajectory").read_text() + "\n")
+    loader.load_observations([working_directory / "p03.trajectory", working_directory / "p04.trajectory"])
+    assert len(loader._loaded_observations) == 1
+
+
+def test_parse_domain_parses_the_domain_again_when_the_domain_file_changes(working_directory: Path):
+    domain_path = working_directory / ELEVATORS_DOMAIN_PATH.name
+    first_domain = _parse_domain(domain_path, partial_parsing=True)
+    assert _parse_domain(domain_path, partial_parsing=True) is first_domain
+
+    domain_path.write_text(domain_path.read_text() + "\n")
+    assert _parse_domain(domain_path, partial_parsing=True) is not first_domain
+
+
+def test_stream_directory_observations_yields_observations_whose_components_are_parsed_lazily(
+        working_directory: Path, elevators_observation: Observation):
+    loader = ObservationsLoader(working_directory / ELEVATORS_DOMAIN_PATH.name)
+    observations = loader.stream_directory_observations(working_directory)
+    first_observation = next(observations)
+    assert first_observation.grounded_objects.keys() == elevators_observation.grounded_objects.keys()
+    assert len(first_observation.components) == len(elevators_observation.components)
+    assert len(list(observations)) == 1
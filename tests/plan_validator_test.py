@@ -0,0 +1,53 @@
+"""Module test for the native plan validator."""
+from pathlib import Path
+
+from pytest import fixture
+
+from utilities import SolutionOutputTypes
+from validators import PlanValidator
+from tests.consts import SATELLITE_DOMAIN_PATH, SATELLITE_PROBLEM_PATH, EXAMPLES_DIR_PATH
+
+SATELLITE_SOLUTION_PATH = EXAMPLES_DIR_PATH / "pfile3.solution"
+
+
+@fixture()
+def plan_validator() -> PlanValidator:
+    return PlanValidator(SATELLITE_DOMAIN_PATH)
+
+
+@fixture()
+def satellite_plan() -> list:
+    return SATELLITE_SOLUTION_PATH.read_text().splitlines(keepends=True)
+
+
+def test_validate_plan_returns_ok_for_a_valid_plan(plan_validator: PlanValidator):
+    validation_result = plan_validator.validate_plan(SATELLITE_PROBLEM_PATH, SATELLITE_SOLUTION_PATH)
+    assert validation_result.is_valid
+    assert validation_result.solution_type == SolutionOutputTypes.ok
+
+
+def test_validate_plan_returns_goal_not_reached_for_a_plan_prefix(
+        plan_validator: PlanValidator, satellite_plan: list, tmp_path: Path):
+    solution_file_path = tmp_path / "pfile3.solution"
+    solution_file_path.write_text("".join(satellite_plan[:3]))
+    validation_result = plan_validator.validate_plan(SATELLITE_PROBLEM_PATH, solution_file_path)
+    assert validation_result.goal_not_reached
+
+
+def test_validate_plan_returns_the_step_and_name_of_the_first_inapplicable_action(
+        plan_validator: PlanValidator, satellite_plan: list, tmp_path: Path):
+    solution_file_path = tmp_path / "pfile3.solution"
+    solution_file_path.write_text("".join(satellite_plan[1:]))
+    validation_result = plan_validator.validate_plan(SATELLITE_PROBLEM_PATH, solution_file_path)
+    assert validation_result.is_inapplicable
+    assert validation_result.failed_step == 0
+    assert validation_result.failed_action_name == "calibrate"
+
+
+def test_validate_plan_ignores_comments_and_time_stamps_in_the_plan(
+        plan_validator: PlanValidator, satellite_plan: list, tmp_path: Path):
+    solution_file_path = tmp_path / "pfile3.solution"
+    solution_file_path.write_text("".join(f"{step}.0: {action}" for step, action in enumerate(satellite_plan)) +
+                                  "; cost = 10 (general cost)\n")
+    validation_result = plan_validator.validate_plan(SATELLITE_PROBLEM_PATH, solution_file_path)
+    assert validation_result.is_valid
@@ -344,3 +344,72 @@ def test_match_predicate_to_action_literals_when_action_and_predicates_have_no_p
     possible_matches = spider_predicate_matcher.get_possible_literal_matches(test_action_call,
                                                                              test_state_predicates)
     assert len(possible_matches) == 1
+
+
+def test_match_predicate_to_action_literals_returns_the_precompiled_lifted_predicate_on_repeated_calls(
+        predicate_matcher_no_consts: PredicatesMatcher):
+    first_action_call = ActionCall(name="drive-truck", grounded_parameters=["tru1", "pos1", "pos2", "city1"])
+    second_action_call = ActionCall(name="drive-truck", grounded_parameters=["tru2", "pos3", "pos4", "city2"])
+    second_grounded_predicate = GroundedPredicate(
+        name="at", signature={"?obj": OBJECT_TYPE, "?loc": LOCATION_TYPE},
+        object_mapping={"?obj": "tru2", "?loc": "pos3"})
+    first_matches = predicate_matcher_no_consts.match_predicate_to_action_literals(
+        grounded_predicate=TRUCK_AT_LOCATION_GROUNDED_PREDICATE, action_call=first_action_call)
+    second_matches = predicate_matcher_no_consts.match_predicate_to_action_literals(
+        grounded_predicate=second_grounded_predicate, action_call=second_action_call)
+
+    assert len(first_matches) == 1
+    assert first_matches[0] is second_matches[0]
+
+
+def test_lift_state_literals_from_actual_trajectory_state_returns_the_same_matches_as_matching_each_literal(
+        elevators_predicate_matcher: PredicatesMatcher, elevators_observation: Observation):
+    observation_component = elevators_observation.components[0]
+    test_action_call = observation_component.grounded_action_call
+    previous_state_predicates = []
+    for predicate_set in observation_component.previous_state.state_predicates.values():
+        previous_state_predicates.extend(predicate_set)
+
+    expected_matches = elevators_predicate_matcher.get_possible_literal_matches(test_action_call,
+                                                                                previous_state_predicates)
+    positive_matches, negative_matches = elevators_predicate_matcher.lift_state_literals(
+        test_action_call, observation_component.previous_state)
+    assert {p.untyped_representation for p in positive_matches} == \
+           {p.untyped_representation for p in expected_matches}
+    assert len(negative_matches) == 0
+
+
+def test_lift_state_literals_lifts_the_negative_literals_and_drops_literals_with_unrelated_objects(
+        predicate_matcher_no_consts: PredicatesMatcher):
+    test_action_call = ActionCall(name="drive-truck", grounded_parameters=["tru1", "pos1", "pos2", "city1"])
+    unrelated_predicate = GroundedPredicate(
+        name="at", signature={"?obj": OBJECT_TYPE, "?loc": LOCATION_TYPE},
+        object_mapping={"?obj": "tru2", "?loc": "pos1"})
+    positive_matches, negative_matches = predicate_matcher_no_consts.lift_state_literals(
+        test_action_call, [unrelated_predicate], [TRUCK_AT_LOCATION_GROUNDED_PREDICATE])
+
+    assert len(positive_matches) == 0
+    assert {p.untyped_representation for p in negative_matches} == {"(at ?truck ?loc-from)"}
+
+
+def test_get_liftable_literals_returns_the_lifted_literals_of_all_the_domain_predicates(
+        predicate_matcher_no_consts: PredicatesMatcher):
+    liftable_literals = predicate_matcher_no_consts.get_liftable_literals("drive-truck")
+    liftable_literals_str = {literal.untyped_representation for literal in liftable_literals}
+
+    assert "(at ?truck ?loc-from)" in liftable_literals_str
+    assert "(at ?truck ?loc-to)" in liftable_literals_str
+    assert "(in-city ?truck ?loc-from ?city)" in liftable_literals_str
+    assert predicate_matcher_no_consts.get_liftable_literals("drive-truck") is liftable_literals
+
+
+def test_lift_closed_world_state_literals_returns_the_liftable_literals_not_matched_by_the_positive_literals(
+        predicate_matcher_no_consts: PredicatesMatcher):
+    test_action_call = ActionCall(name="drive-truck", grounded_parameters=["tru1", "pos1", "pos2", "city1"])
+    positive_matches, negative_matches = predicate_matcher_no_consts.lift_closed_world_state_literals(
+        test_action_call, [TRUCK_AT_LOCATION_GROUNDED_PREDICATE])
+
+    assert {p.untyped_representation for p in positive_matches} == {"(at ?truck ?loc-from)"}
+    assert "(at ?truck ?loc-to)" in {p.untyped_representation for p in negative_matches}
+    assert positive_matches.union(negative_matches) == \
+           predicate_matcher_no_consts.get_liftable_literals("drive-truck")
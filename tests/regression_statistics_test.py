@@ -0,0 +1,62 @@
+"""Module test for the regression statistics of the numeric effects."""
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import r2_score
+
+from sam_learning.core import LinearRegressionStatistics
+
+PREVIOUS_FLUENTS = ["(x ?b)", "(y ?b)", "(d ?t)"]
+
+
+def _add_samples(statistics: LinearRegressionStatistics, previous_values: np.ndarray,
+                 next_values: np.ndarray) -> None:
+    for previous_row, next_row in zip(previous_values, next_values):
+        statistics.add_sample(dict(zip(PREVIOUS_FLUENTS, previous_row)), {"(x ?b)": next_row[0], "(y ?b)": next_row[1]})
+
+
+def test_solve_returns_the_same_coefficients_as_linear_regression_on_all_the_samples():
+    rng = np.random.default_rng(42)
+    previous_values = rng.random((100, 3)) * 10
+    next_values = np.c_[previous_values @ [2.0, -1.0, 0.5] + 3.0, rng.random(100)]
+    statistics = LinearRegressionStatistics()
+    _add_samples(statistics, previous_values, next_values)
+
+    coefficients, learning_scores = statistics.solve(PREVIOUS_FLUENTS, ["(x ?b)", "(y ?b)"])
+    regressor = LinearRegression().fit(previous_values, next_values)
+    assert statistics.num_samples == 100
+    assert np.allclose(coefficients[:-1], regressor.coef_.T)
+    assert np.allclose(coefficients[-1], regressor.intercept_)
+    assert learning_scores[0] == 1.0
+    assert np.isclose(learning_scores[1], r2_score(next_values[:, 1], regressor.predict(previous_values)[:, 1]))
+
+
+def test_solve_returns_a_perfect_score_when_the_assigned_value_is_constant():
+    statistics = LinearRegressionStatistics()
+    for x_value, y_value in [(1.0, 2.0), (3.0, 5.0), (4.0, 1.0), (7.0, 7.0)]:
+        statistics.add_sample({"(x ?b)": x_value, "(y ?b)": y_value}, {"(x ?b)": 0.0})
+
+    coefficients, learning_scores = statistics.solve(["(x ?b)", "(y ?b)"], ["(x ?b)"])
+    assert np.allclose(coefficients.ravel(), [0.0, 0.0, 0.0])
+    assert learning_scores.tolist() == [1.0]
+
+
+def test_solve_uses_only_the_requested_input_fluents():
+    statistics = LinearRegressionStatistics()
+    for x_value, y_value in [(1.0, 2.0), (3.0, 5.0), (4.0, 1.0), (7.0, 7.0)]:
+        statistics.add_sample({"(x ?b)": x_value, "(y ?b)": y_value}, {"(x ?b)": x_value + 1})
+
+    coefficients, learning_scores = statistics.solve(["(x ?b)"], ["(x ?b)"])
+    assert np.allclose(coefficients.ravel(), [1.0, 1.0])
+    assert learning_scores.tolist() == [1.0]
+
+
+def test_add_sample_with_a_new_fluent_assumes_it_was_zero_in_the_previous_samples():
+    statistics = LinearRegressionStatistics()
+    statistics.add_sample({"(x ?b)": 1.0}, {"(x ?b)": 2.0})
+    statistics.add_sample({"(x ?b)": 2.0}, {"(x ?b)": 3.0})
+    statistics.add_sample({"(x ?b)": 3.0, "(y ?b)": 1.0}, {"(x ?b)": 5.0})
+    statistics.add_sample({"(x ?b)": 4.0, "(y ?b)": 2.0}, {"(x ?b)": 7.0})
+
+    coefficients, learning_scores = statistics.solve(["(x ?b)", "(y ?b)"], ["(x ?b)"])
+    assert np.allclose(coefficients.ravel(), [1.0, 1.0, 1.0])
+    assert learning_scores.tolist() == [1.0]
@@ -0,0 +1,110 @@
+"""Module test for the domain validator."""
+import threading
+from pathlib import Path
+from typing import Optional
+
+from pytest import fixture
+
+from utilities import LearningAlgorithmType, SolverType
+from validators import DomainValidator, SolutionsCache, ValidationResult, VALID_PLAN, INAPPLICABLE_PLAN
+
+SOLVING_RESULTS = {
+    "pfile0": "ok",
+    "pfile1": "timeout",
+    "pfile2": "ok",
+    "pfile3": "no_solution",
+    "pfile4": "ok",
+}
+
+
+class FakeSolver:
+    """Solver returning predefined solving statuses and writing the solutions of the solved problems."""
+
+    def __init__(self):
+        self.solved_problems = []
+        self.lock = threading.Lock()
+
+    def solve_problem(self, problem_file_path: Path, domain_file_path: Path) -> Optional[str]:
+        with self.lock:
+            self.solved_problems.append(problem_file_path.stem)
+
+        solving_status = SOLVING_RESULTS[problem_file_path.stem]
+        if solving_status == "ok":
+            (problem_file_path.parent / f"{problem_file_path.stem}.solution").write_text(problem_file_path.stem)
+
+        return solving_status
+
+
+@fixture()
+def test_set_directory_path(tmp_path: Path) -> Path:
+    test_set_directory_path = tmp_path / "test_set"
+    test_set_directory_path.mkdir()
+    for problem_name in SOLVING_RESULTS:
+        (test_set_directory_path / f"{problem_name}.pddl").write_text(f"(define (problem {problem_name}))")
+
+    return test_set_directory_path
+
+
+@fixture()
+def domain_validator(tmp_path: Path, monkeypatch) -> DomainValidator:
+    def validate_solution(domain_file_path: Path, problem_file_path: Path,
+                          solution_file_path: Path) -> ValidationResult:
+        return ValidationResult.from_validation_output(
+            INAPPLICABLE_PLAN if solution_file_path.stem == "pfile2" else VALID_PLAN)
+
+    monkeypatch.setattr("validators.safe_domain_validator.validate_plan", validate_solution)
+    validator = DomainValidator(tmp_path, LearningAlgorithmType.numeric_sam, tmp_path / "domain.pddl",
+                                SolverType.enhsp, max_solver_workers=3, max_validation_workers=2)
+    validator.solver = FakeSolver()
+    return validator
+
+
+def test_validate_domain_aggregates_the_solving_and_validation_results_of_all_problems(
+        domain_validator: DomainValidator, test_set_directory_path: Path, tmp_path: Path):
+    domain_validator.validate_domain(tmp_path / "learned_domain.pddl", test_set_directory_path, used_observations=[])
+    solving_stats = domain_validator.solving_stats[0]
+    assert sorted(domain_validator.solver.solved_problems) == list(SOLVING_RESULTS)
+    assert solving_stats["ok"] == 2
+    assert solving_stats["problems_ok"] == ["pfile0.pddl", "pfile4.pddl"]
+    assert solving_stats["not_applicable"] == 1
+    assert solving_stats["problems_not_applicable"] == ["pfile2.pddl"]
+    assert solving_stats["problems_timeout"] == ["pfile1"]
+    assert solving_stats["problems_no_solution"] == ["pfile3"]
+    assert solving_stats["goal_not_achieved"] == 0
+
+
+def test_validation_result_parses_the_validation_output():
+    validation_result = ValidationResult.from_validation_output(
+        f"Checking plan\n{INAPPLICABLE_PLAN}\nPlan failed because of unsatisfied precondition in:\n(lift h0 c0 p0)\n")
+    assert validation_result.is_inapplicable
+    assert not validation_result.is_valid
+    assert not validation_result.goal_not_reached
+    assert validation_result.failed_action_name == "lift"
+
+
+def test_validate_domain_with_solutions_cache_solves_again_only_the_problems_that_were_not_solved(
+        domain_validator: DomainValidator, test_set_directory_path: Path, tmp_path: Path):
+    domain_validator.solutions_cache = SolutionsCache()
+    learned_domain_path = tmp_path / "learned_domain.pddl"
+    learned_domain_path.write_text("(define (domain test))")
+    domain_validator.validate_domain(learned_domain_path, test_set_directory_path, used_observations=[])
+    domain_validator.solver.solved_problems.clear()
+    learned_domain_path.write_text("(define\n  (domain test))")
+    domain_validator.validate_domain(learned_domain_path, test_set_directory_path, used_observations=[])
+
+    assert sorted(domain_validator.solver.solved_problems) == ["pfile1", "pfile3"]
+    first_solving_stats, second_solving_stats = domain_validator.solving_stats
+    assert first_solving_stats == second_solving_stats
+
+
+def test_validate_domain_clears_the_solutions_after_validating_them(
+        domain_validator: DomainValidator, test_set_directory_path: Path, tmp_path: Path):
+    domain_validator.validate_domain(tmp_path / "learned_domain.pddl", test_set_directory_path, used_observations=[])
+    assert list(test_set_directory_path.glob("*.solution")) == []
+
+
+def test_domain_validator_forwards_the_resource_limits_to_the_solver(tmp_path: Path):
+    validator = DomainValidator(tmp_path, LearningAlgorithmType.numeric_sam, tmp_path / "domain.pddl",
+                                SolverType.enhsp, cpu_time_limit=60, memory_limit_mb=2048)
+    assert validator.solver.cpu_time_limit == 60
+    assert validator.solver.memory_limit_mb == 2048
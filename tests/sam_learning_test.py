@@ -5,6 +5,7 @@ from pddl_plus_parser.models import Domain, ActionCall, Problem, Observation, \
     ObservedComponent
 from pytest import fixture
 
+from sam_learning.core import StreamingObservation
 from sam_learning.learners import SAMLearner
 from tests.consts import ELEVATORS_DOMAIN_PATH, ELEVATORS_PROBLEM_PATH, ELEVATORS_TRAJECTORY_PATH
 
@@ -188,3 +189,52 @@ def test_learn_action_model_returns_learned_model(sam_learning: SAMLearner, elev
     learned_model, learning_report = sam_learning.learn_action_model([elevators_observation])
     print(learning_report)
     print(learned_model.to_pddl())
+
+
+def test_create_domain_snapshot_returns_the_same_model_as_learning_from_all_observations(
+        elevators_domain: Domain, elevators_observation: Observation):
+    incremental_learner = SAMLearner(elevators_domain)
+    incremental_learner.add_observations([elevators_observation])
+    snapshot_model, _ = incremental_learner.create_domain_snapshot()
+    learned_model, _ = SAMLearner(elevators_domain).learn_action_model([elevators_observation])
+    for action_name, learned_action in learned_model.actions.items():
+        snapshot_action = snapshot_model.actions[action_name]
+        assert {p.untyped_representation for p in snapshot_action.positive_preconditions} == \
+               {p.untyped_representation for p in learned_action.positive_preconditions}
+        assert {p.untyped_representation for p in snapshot_action.negative_preconditions} == \
+               {p.untyped_representation for p in learned_action.negative_preconditions}
+        assert {p.untyped_representation for p in snapshot_action.add_effects} == \
+               {p.untyped_representation for p in learned_action.add_effects}
+
+
+def test_create_domain_snapshot_does_not_change_the_learner_state_so_learning_can_continue(
+        sam_learning: SAMLearner, elevators_observation: Observation):
+    sam_learning.add_observations([elevators_observation])
+    observed_actions = list(sam_learning.observed_actions)
+    first_snapshot, _ = sam_learning.create_domain_snapshot()
+    second_snapshot, _ = sam_learning.create_domain_snapshot()
+    assert first_snapshot is not sam_learning.partial_domain
+    assert sam_learning.observed_actions == observed_actions
+    assert len(first_snapshot.actions) == len(second_snapshot.actions)
+
+
+def test_learn_action_model_with_implicit_negative_literals_returns_the_same_model_as_with_complete_world_states(
+        elevators_domain: Domain, elevators_observation: Observation):
+    implicit_negatives_model, _ = SAMLearner(
+        elevators_domain, implicit_negative_literals=True).learn_action_model([elevators_observation])
+    learned_model, _ = SAMLearner(elevators_domain).learn_action_model([elevators_observation])
+    for action_name, learned_action in learned_model.actions.items():
+        implicit_negatives_action = implicit_negatives_model.actions[action_name]
+        assert implicit_negatives_action.positive_preconditions == learned_action.positive_preconditions
+        assert implicit_negatives_action.negative_preconditions == learned_action.negative_preconditions
+        assert implicit_negatives_action.add_effects == learned_action.add_effects
+        assert implicit_negatives_action.delete_effects == learned_action.delete_effects
+
+
+def test_learn_action_model_from_a_generator_of_streamed_observations_returns_the_same_model(
+        elevators_domain: Domain, elevators_problem: Problem, elevators_observation: Observation):
+    streamed_observations = (StreamingObservation(elevators_domain, elevators_problem, ELEVATORS_TRAJECTORY_PATH)
+                             for _ in range(1))
+    streamed_model, _ = SAMLearner(elevators_domain).learn_action_model(streamed_observations)
+    learned_model, _ = SAMLearner(elevators_domain).learn_action_model([elevators_observation])
+    assert streamed_model.to_pddl() == learned_model.to_pddl()
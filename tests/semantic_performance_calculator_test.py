@@ -0,0 +1,72 @@
+"""Module test for the semantic performance calculation."""
+import os
+from pathlib import Path
+
+from pddl_plus_parser.lisp_parsers import DomainParser, ProblemParser, TrajectoryParser
+from pddl_plus_parser.models import Domain, Observation
+from pytest import fixture
+
+from experiments.performance_calculation_utils import _ground_tested_operator, StatesMatrix, \
+    calculate_operator_applicability
+from experiments.semantic_performance_calculator import SemanticPerformanceCalculator
+from tests.consts import SAILING_EXPECTED_DOMAIN_PATH, SAILING_PROBLEM_PATH, SAILING_TRAJECTORY_PATH, \
+    SAILING_LEARNED_DOMAIN_PATH, SATELLITE_DOMAIN_PATH, SATELLITE_PROBLEM_PATH, SATELLITE_NUMERIC_TRAJECTORY_PATH
+from utilities import LearningAlgorithmType
+
+TEST_WORKING_DIRECTORY = Path(os.getcwd())
+
+
+@fixture()
+def sailing_expected_domain() -> Domain:
+    return DomainParser(SAILING_EXPECTED_DOMAIN_PATH, partial_parsing=False).parse_domain()
+
+
+@fixture()
+def sailing_learned_domain() -> Domain:
+    return DomainParser(SAILING_LEARNED_DOMAIN_PATH, partial_parsing=False).parse_domain()
+
+
+@fixture()
+def sailing_observation(sailing_expected_domain: Domain) -> Observation:
+    problem = ProblemParser(problem_path=SAILING_PROBLEM_PATH, domain=sailing_expected_domain).parse_problem()
+    return TrajectoryParser(sailing_expected_domain, problem).parse_trajectory(SAILING_TRAJECTORY_PATH)
+
+
+@fixture()
+def satellite_domain() -> Domain:
+    return DomainParser(SATELLITE_DOMAIN_PATH, partial_parsing=False).parse_domain()
+
+
+@fixture()
+def satellite_observation(satellite_domain: Domain) -> Observation:
+    problem = ProblemParser(problem_path=SATELLITE_PROBLEM_PATH, domain=satellite_domain).parse_problem()
+    return TrajectoryParser(satellite_domain, problem).parse_trajectory(SATELLITE_NUMERIC_TRAJECTORY_PATH)
+
+
+def assert_applicability_matches_operator_applicability(domain: Domain, observation: Observation) -> None:
+    states = [observation.components[0].previous_state] + \
+             [component.next_state for component in observation.components]
+    states_matrix = StatesMatrix(states)
+    for component in observation.components:
+        grounded_operator = _ground_tested_operator(component.grounded_action_call, domain)
+        applicability = calculate_operator_applicability(grounded_operator, states_matrix)
+        assert list(applicability) == [grounded_operator.is_applicable(state) for state in states]
+
+
+def test_calculate_operator_applicability_matches_the_applicability_of_the_operator_in_each_state_in_discrete_domain(
+        sailing_learned_domain: Domain, sailing_observation: Observation):
+    assert_applicability_matches_operator_applicability(sailing_learned_domain, sailing_observation)
+
+
+def test_calculate_operator_applicability_matches_the_applicability_of_the_operator_in_each_state_in_numeric_domain(
+        satellite_domain: Domain, satellite_observation: Observation):
+    assert_applicability_matches_operator_applicability(satellite_domain, satellite_observation)
+
+
+def test_calculate_preconditions_semantic_performance_detects_the_missing_applicability_of_the_learned_action(
+        sailing_expected_domain: Domain, sailing_learned_domain: Domain, sailing_observation: Observation):
+    calculator = SemanticPerformanceCalculator(sailing_expected_domain, [sailing_observation],
+                                               TEST_WORKING_DIRECTORY, LearningAlgorithmType.numeric_sam)
+    precision, recall = calculator.calculate_preconditions_semantic_performance(sailing_learned_domain)
+    assert precision == {"go_est": 1.0, "save_person": 1.0, "go_north_east": 1.0, "go_north_west": 1.0}
+    assert recall == {"go_est": 1.0, "save_person": 0.9, "go_north_east": 1.0, "go_north_west": 1.0}
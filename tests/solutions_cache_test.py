@@ -0,0 +1,52 @@
+"""Module test for the solutions cache."""
+from pathlib import Path
+
+from pytest import fixture
+
+from validators import SolutionsCache
+from validators.solutions_cache import normalize_domain_text
+
+DOMAIN_TEXT = "(define (domain test)\n  (:action move ; moves the robot\n   :parameters (?r)))"
+
+
+@fixture()
+def problem_file_path(tmp_path: Path) -> Path:
+    problem_file_path = tmp_path / "pfile1.pddl"
+    problem_file_path.write_text("(define (problem p1) (:domain test))")
+    return problem_file_path
+
+
+@fixture()
+def domain_file_path(tmp_path: Path) -> Path:
+    domain_file_path = tmp_path / "domain.pddl"
+    domain_file_path.write_text(DOMAIN_TEXT)
+    return domain_file_path
+
+
+def test_normalize_domain_text_removes_comments_and_formatting():
+    assert normalize_domain_text(DOMAIN_TEXT) == "(define(domain test)(:action move :parameters(?r)))"
+
+
+def test_create_domain_key_returns_the_same_key_for_domains_that_differ_only_in_formatting(
+        domain_file_path: Path, tmp_path: Path):
+    reformatted_domain_file_path = tmp_path / "reformatted_domain.pddl"
+    reformatted_domain_file_path.write_text("(DEFINE (domain test) (:action move :parameters (?r)))")
+    assert SolutionsCache.create_domain_key(domain_file_path) == \
+           SolutionsCache.create_domain_key(reformatted_domain_file_path)
+
+
+def test_get_solution_returns_none_when_the_problem_was_not_solved_with_the_domain(
+        domain_file_path: Path, problem_file_path: Path):
+    solutions_cache = SolutionsCache()
+    domain_key = solutions_cache.create_domain_key(domain_file_path)
+    solutions_cache.store_solution(domain_key, problem_file_path, "enhsp", "ok", "(move r1)\n")
+    assert solutions_cache.get_solution(domain_key, problem_file_path, "metric_ff") is None
+    assert solutions_cache.get_solution("other_domain", problem_file_path, "enhsp") is None
+
+
+def test_get_solution_returns_the_solution_stored_in_the_cache_directory(
+        domain_file_path: Path, problem_file_path: Path, tmp_path: Path):
+    domain_key = SolutionsCache.create_domain_key(domain_file_path)
+    SolutionsCache(tmp_path / "cache").store_solution(domain_key, problem_file_path, "enhsp", "ok", "(move r1)\n")
+    assert SolutionsCache(tmp_path / "cache").get_solution(domain_key, problem_file_path, "enhsp") == \
+           ("ok", "(move r1)\n")
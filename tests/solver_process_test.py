@@ -0,0 +1,48 @@
+"""Module test for running the solver processes."""
+import time
+from pathlib import Path
+
+from solvers.solver_process import run_solver_process
+
+
+def is_process_running(pid: int) -> bool:
+    status_file_path = Path(f"/proc/{pid}/status")
+    if not status_file_path.exists():
+        return False
+
+    return "State:\tZ" not in status_file_path.read_text()
+
+
+def test_run_solver_process_returns_the_output_of_a_process_that_finished_in_time(tmp_path: Path):
+    process = run_solver_process("echo solved && pwd", tmp_path, timeout=10, capture_output=True)
+    assert process.returncode == 0
+    assert process.stdout.decode().split() == ["solved", str(tmp_path)]
+
+
+def test_run_solver_process_kills_the_process_and_its_children_when_the_timeout_is_reached(tmp_path: Path):
+    start_time = time.time()
+    process = run_solver_process("sleep 30 & echo $! > child.pid; wait", tmp_path, timeout=1)
+    assert process is None
+    assert time.time() - start_time < 30
+
+    child_pid = int((tmp_path / "child.pid").read_text())
+    time.sleep(0.1)
+    assert not is_process_running(child_pid)
+
+
+def test_run_solver_process_applies_the_resource_limits_to_the_process(tmp_path: Path):
+    process = run_solver_process("ulimit -t && ulimit -v", tmp_path, timeout=10, cpu_time_limit=5,
+                                 memory_limit_mb=512, capture_output=True)
+    assert process.stdout.decode().split() == ["5", str(512 * 1024)]
+
+
+def test_run_solver_process_returns_none_when_the_process_exceeds_its_cpu_time_limit(tmp_path: Path):
+    start_time = time.time()
+    process = run_solver_process("while :; do :; done", tmp_path, timeout=30, cpu_time_limit=1)
+    assert process is None
+    assert time.time() - start_time < 30
+
+
+def test_run_solver_process_returns_none_when_the_shell_reports_a_child_killed_by_sigkill(tmp_path: Path):
+    process = run_solver_process("sh -c 'kill -KILL $$'; exit $?", tmp_path, timeout=10)
+    assert process is None
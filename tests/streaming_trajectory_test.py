@@ -0,0 +1,67 @@
+"""Module test for the observations that are streamed lazily from the trajectory files."""
+from pddl_plus_parser.lisp_parsers import DomainParser, ProblemParser, TrajectoryParser
+from pddl_plus_parser.models import Domain, Problem, Observation, MultiAgentComponent
+from pytest import fixture
+
+from sam_learning.core import StreamingObservation, iterate_trajectory_expressions
+from tests.consts import ELEVATORS_DOMAIN_PATH, ELEVATORS_PROBLEM_PATH, ELEVATORS_TRAJECTORY_PATH, \
+    WOODWORKING_COMBINED_DOMAIN_PATH, WOODWORKING_COMBINED_PROBLEM_PATH, WOODWORKING_COMBINED_TRAJECTORY_PATH
+from tests.multi_agent_sam_test import WOODWORKING_AGENT_NAMES
+
+
+@fixture()
+def elevators_domain() -> Domain:
+    return DomainParser(ELEVATORS_DOMAIN_PATH, partial_parsing=True).parse_domain()
+
+
+@fixture()
+def elevators_problem(elevators_domain: Domain) -> Problem:
+    return ProblemParser(problem_path=ELEVATORS_PROBLEM_PATH, domain=elevators_domain).parse_problem()
+
+
+@fixture()
+def elevators_observation(elevators_domain: Domain, elevators_problem: Problem) -> Observation:
+    return TrajectoryParser(elevators_domain, elevators_problem).parse_trajectory(ELEVATORS_TRAJECTORY_PATH)
+
+
+@fixture()
+def streaming_observation(elevators_domain: Domain, elevators_problem: Problem) -> StreamingObservation:
+    return StreamingObservation(elevators_domain, elevators_problem, ELEVATORS_TRAJECTORY_PATH)
+
+
+def test_iterate_trajectory_expressions_yields_the_states_and_the_action_calls_in_order():
+    expressions = list(iterate_trajectory_expressions(ELEVATORS_TRAJECTORY_PATH))
+    assert expressions[0][0] == ":init"
+    assert [expression[0] for expression in expressions[1:5]] == ["operator:", ":state", "operator:", ":state"]
+
+
+def test_streamed_components_are_the_same_as_the_parsed_trajectory_components(
+        streaming_observation: StreamingObservation, elevators_observation: Observation):
+    streamed_components = list(streaming_observation.components)
+    assert len(streamed_components) == len(elevators_observation.components)
+    for component, expected_component in zip(streamed_components, elevators_observation.components):
+        assert str(component.grounded_action_call) == str(expected_component.grounded_action_call)
+        assert component.previous_state.serialize() == expected_component.previous_state.serialize()
+        assert component.next_state.serialize() == expected_component.next_state.serialize()
+
+
+def test_streamed_components_length_is_computed_without_parsing_the_states_and_can_be_iterated_again(
+        streaming_observation: StreamingObservation, elevators_observation: Observation):
+    assert len(streaming_observation.components) == len(elevators_observation.components)
+    first_iteration_calls = [str(component.grounded_action_call) for component in streaming_observation.components]
+    second_iteration_calls = [str(component.grounded_action_call) for component in streaming_observation.components]
+    assert first_iteration_calls == second_iteration_calls
+
+
+def test_streamed_components_of_multi_agent_trajectories_contain_the_joint_actions():
+    domain = DomainParser(WOODWORKING_COMBINED_DOMAIN_PATH, partial_parsing=True).parse_domain()
+    problem = ProblemParser(problem_path=WOODWORKING_COMBINED_PROBLEM_PATH, domain=domain).parse_problem()
+    expected_observation = TrajectoryParser(domain, problem).parse_trajectory(
+        WOODWORKING_COMBINED_TRAJECTORY_PATH, executing_agents=WOODWORKING_AGENT_NAMES)
+    observation = StreamingObservation(domain, problem, WOODWORKING_COMBINED_TRAJECTORY_PATH,
+                                       executing_agents=WOODWORKING_AGENT_NAMES)
+    streamed_components = list(observation.components)
+    assert len(streamed_components) == len(expected_observation.components)
+    for component, expected_component in zip(streamed_components, expected_observation.components):
+        assert isinstance(component, MultiAgentComponent)
+        assert str(component.grounded_joint_action) == str(expected_component.grounded_joint_action)
@@ -60,3 +60,23 @@ def test_create_vocabulary_creates_grounded_predicates_when_constants_and_object
     assert set(vocabulary_predicates.keys()) == {'(surface-condition ?obj ?surface)', '(available ?obj)',
                                                  '(is-smooth ?surface)', '(has-colour ?agent ?colour)',
                                                  '(grind-treatment-change ?agent ?old ?new)'}
+
+
+def test_create_vocabulary_creates_only_type_compatible_groundings_without_repeating_objects(
+        elevators_domain: Domain, vocabulary_creator: VocabularyCreator, elevators_problem: Problem):
+    vocabulary_predicates = vocabulary_creator.create_vocabulary(
+        domain=elevators_domain,
+        observed_objects={"n1": elevators_problem.objects["n1"], "n2": elevators_problem.objects["n2"],
+                          "p0": elevators_problem.objects["p0"]})
+    assert {predicate.untyped_representation for predicate in vocabulary_predicates["(next ?n1 ?n2)"]} == \
+           {"(next n1 n2)", "(next n2 n1)"}
+
+
+def test_create_vocabulary_returns_the_cached_vocabulary_when_called_with_the_same_typed_objects(
+        elevators_domain: Domain, vocabulary_creator: VocabularyCreator, elevators_problem: Problem):
+    observed_objects = {"n1": elevators_problem.objects["n1"], "n2": elevators_problem.objects["n2"]}
+    first_vocabulary = vocabulary_creator.create_vocabulary(domain=elevators_domain,
+                                                            observed_objects=observed_objects)
+    second_vocabulary = vocabulary_creator.create_vocabulary(domain=elevators_domain,
+                                                             observed_objects=dict(observed_objects))
+    assert first_vocabulary is second_vocabulary
@@ -1,3 +1,5 @@
 from .safe_domain_validator import DomainValidator
 from .validator_script_data import VALIDATOR_DIRECTORY, VALID_PLAN, INAPPLICABLE_PLAN, \
-    GOAL_NOT_REACHED, run_validate_script
+    GOAL_NOT_REACHED, ValidationResult, validate_plan, run_validate_script
+from .plan_validator import PlanValidator
+from .solutions_cache import SolutionsCache, SOLUTIONS_CACHE_DIRECTORY_NAME
@@ -0,0 +1,100 @@
+"""Module validating plans natively by simulating them with the grounded operators of the domain."""
+import logging
+import re
+from pathlib import Path
+from typing import List
+
+from pddl_plus_parser.lisp_parsers import DomainParser, ProblemParser
+from pddl_plus_parser.models import Domain, Problem, State, Operator, ActionCall
+from pddl_plus_parser.models.numerical_expression import evaluate_expression
+from pddl_plus_parser.models.pddl_operator import set_expression_value
+
+from utilities import SolutionOutputTypes
+from validators.validator_script_data import ValidationResult
+
+PLAN_ACTION_REGEX = re.compile(r"\(([^()]+)\)")
+
+
+class PlanValidator:
+    """Validates plans without spawning VAL by applying the plan's operators on the problem's initial state.
+
+    Note: numeric conditions are evaluated exactly, without VAL's tolerance.
+    """
+
+    logger: logging.Logger
+    domain: Domain
+
+    def __init__(self, domain_file_path: Path):
+        self.logger = logging.getLogger(__name__)
+        self.domain = DomainParser(domain_path=domain_file_path).parse_domain()
+
+    @staticmethod
+    def _parse_plan(solution_file_path: Path) -> List[ActionCall]:
+        """Parses the action calls of the plan, ignoring empty lines, comments and time stamps.
+
+        :param solution_file_path: the path to the solution file.
+        :return: the action calls of the plan.
+        """
+        plan = []
+        with open(solution_file_path, "rt") as solution_file:
+            for line in solution_file:
+                match = PLAN_ACTION_REGEX.search(line.split(";")[0].lower())
+                if match is None:
+                    continue
+
+                action_name, *parameters = match.group(1).split()
+                plan.append(ActionCall(name=action_name, grounded_parameters=parameters))
+
+        return plan
+
+    @staticmethod
+    def _is_goal_reached(problem: Problem, state: State) -> bool:
+        """Checks whether the discrete and the numeric goals of the problem hold in the state.
+
+        :param problem: the problem containing the goals.
+        :param state: the state reached by the plan.
+        :return: whether all the goals hold in the state.
+        """
+        for goal_predicate in problem.goal_state_predicates:
+            state_predicates = state.state_predicates.get(goal_predicate.lifted_untyped_representation, set())
+            if goal_predicate.untyped_representation not in {predicate.untyped_representation
+                                                             for predicate in state_predicates}:
+                return False
+
+        for goal_expression in problem.goal_state_fluents:
+            set_expression_value(goal_expression.root, state.state_fluents)
+            if not evaluate_expression(goal_expression.root):
+                return False
+
+        return True
+
+    def validate_plan(self, problem_file_path: Path, solution_file_path: Path) -> ValidationResult:
+        """Validates the plan by applying its actions one after the other and checking the goal in the final state.
+
+        :param problem_file_path: the path to the problem file.
+        :param solution_file_path: the path to the solution file.
+        :return: the validation result, containing the failing step and action if the plan is inapplicable.
+        """
+        problem = ProblemParser(problem_file_path, self.domain).parse_problem()
+        state = State(predicates=problem.initial_state_predicates, fluents=problem.initial_state_fluents,
+                      is_init=True)
+        for step, action_call in enumerate(self._parse_plan(solution_file_path)):
+            if action_call.name not in self.domain.actions:
+                self.logger.info(f"The action {action_call} in step {step} does not exist in the domain.")
+                return ValidationResult(SolutionOutputTypes.not_applicable, failed_step=step,
+                                        failed_action_name=action_call.name)
+
+            operator = Operator(action=self.domain.actions[action_call.name], domain=self.domain,
+                                grounded_action_call=action_call.parameters, problem_objects=problem.objects)
+            if not operator.is_applicable(state):
+                self.logger.info(f"The action {action_call} in step {step} is not applicable.")
+                return ValidationResult(SolutionOutputTypes.not_applicable, failed_step=step,
+                                        failed_action_name=action_call.name)
+
+            state = operator.apply(state)
+
+        if not self._is_goal_reached(problem, state):
+            self.logger.info("The plan did not reach the required goal.")
+            return ValidationResult(SolutionOutputTypes.goal_not_achieved)
+
+        return ValidationResult(SolutionOutputTypes.ok)
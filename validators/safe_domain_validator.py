@@ -2,15 +2,18 @@
 import csv
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed, Future
 from pathlib import Path
-from typing import NoReturn, Dict, List, Any, Optional, Union
+from typing import NoReturn, Dict, List, Any, Optional, Union, Tuple
 
 from pddl_plus_parser.models import Observation, MultiAgentObservation
 
 from solvers import FastDownwardSolver, MetricFFSolver, ENHSPSolver
+from solvers.concurrent_solving import PROBLEM_FILES_GLOB
 from utilities import LearningAlgorithmType, SolverType, SolutionOutputTypes
-from validators.validator_script_data import VALID_PLAN, INAPPLICABLE_PLAN, \
-    GOAL_NOT_REACHED, run_validate_script
+from validators.plan_validator import PlanValidator
+from validators.solutions_cache import SolutionsCache, SOLUTIONS_CACHE_DIRECTORY_NAME
+from validators.validator_script_data import validate_plan, ValidationResult
 
 SOLVER_TYPES = {
     SolverType.fast_downward: FastDownwardSolver,
@@ -61,16 +64,32 @@ class DomainValidator:
     learning_algorithm: LearningAlgorithmType
     reference_domain_path: Path
     results_dir_path: Path
+    max_solver_workers: int
+    max_validation_workers: int
+    plan_validator: Optional[PlanValidator]
+    cross_check_with_val: bool
+    solver_type: SolverType
+    solutions_cache: Optional[SolutionsCache]
 
     def __init__(self, working_directory_path: Path,
-                 learning_algorithm: LearningAlgorithmType, reference_domain_path: Path, solver_type: SolverType):
+                 learning_algorithm: LearningAlgorithmType, reference_domain_path: Path, solver_type: SolverType,
+                 max_solver_workers: int = 1, max_validation_workers: int = 1, use_native_validator: bool = False,
+                 cross_check_with_val: bool = False, use_solutions_cache: bool = False,
+                 cpu_time_limit: Optional[int] = None, memory_limit_mb: Optional[int] = None):
         self.logger = logging.getLogger(__name__)
-        self.solver = SOLVER_TYPES[solver_type]()
+        self.solver = SOLVER_TYPES[solver_type](cpu_time_limit=cpu_time_limit, memory_limit_mb=memory_limit_mb)
+        self.solver_type = solver_type
+        self.solutions_cache = SolutionsCache(working_directory_path / SOLUTIONS_CACHE_DIRECTORY_NAME) \
+            if use_solutions_cache else None
+        self.max_solver_workers = max_solver_workers
+        self.max_validation_workers = max_validation_workers
         self.solving_stats = []
         self.aggregated_solving_stats = []
         self.learning_algorithm = learning_algorithm
         self.results_dir_path = working_directory_path / "results_directory"
         self.reference_domain_path = reference_domain_path
+        self.plan_validator = PlanValidator(reference_domain_path) if use_native_validator else None
+        self.cross_check_with_val = cross_check_with_val
 
     @staticmethod
     def _clear_plans(test_set_directory: Path) -> NoReturn:
@@ -81,32 +100,118 @@ class DomainValidator:
         for solver_output_path in test_set_directory.glob("*.solution"):
             solver_output_path.unlink(missing_ok=True)
 
-    def _validate_solution_content(self, solution_file_path: Path, problem_file_path: Path,
-                                   iteration_statistics: Dict[str, Union[int, List[str]]]) -> NoReturn:
-        """Validates that the solution file contains a valid plan.
+    def _validate_plan(self, solution_file_path: Path, problem_file_path: Path) -> ValidationResult:
+        """Validates the solution natively if the native validator is used, otherwise (or to cross-check) using VAL.
 
         :param solution_file_path: the path to the solution file.
+        :param problem_file_path: the path to the problem that the solution solves.
+        :return: the validation result, VAL's result is preferred if the two validators disagree.
         """
-        validation_file_path = run_validate_script(domain_file_path=self.reference_domain_path,
-                                                   problem_file_path=problem_file_path,
-                                                   solution_file_path=solution_file_path)
-
-        with open(validation_file_path, "r") as validation_file:
-            validation_file_content = validation_file.read()
-            if VALID_PLAN in validation_file_content:
-                self.logger.info("The plan is valid.")
-                iteration_statistics["ok"] += 1
-                iteration_statistics["problems_ok"].append(problem_file_path.name)
-
-            elif INAPPLICABLE_PLAN in validation_file_content:
-                self.logger.info("The plan is not applicable.")
-                iteration_statistics["not_applicable"] += 1
-                iteration_statistics["problems_not_applicable"].append(problem_file_path.name)
-
-            elif GOAL_NOT_REACHED in validation_file_content:
-                self.logger.info("The plan did not reach the required goal.")
-                iteration_statistics["goal_not_achieved"] += 1
-                iteration_statistics["problems_goal_not_achieved"].append(problem_file_path.name)
+        if self.plan_validator is None:
+            return validate_plan(domain_file_path=self.reference_domain_path, problem_file_path=problem_file_path,
+                                 solution_file_path=solution_file_path)
+
+        validation_result = self.plan_validator.validate_plan(problem_file_path, solution_file_path)
+        if not self.cross_check_with_val:
+            return validation_result
+
+        val_validation_result = validate_plan(domain_file_path=self.reference_domain_path,
+                                              problem_file_path=problem_file_path,
+                                              solution_file_path=solution_file_path)
+        if val_validation_result.solution_type != validation_result.solution_type:
+            self.logger.warning(f"The native validator classified the plan {solution_file_path.stem} as "
+                                f"{validation_result.solution_type} while VAL classified it as "
+                                f"{val_validation_result.solution_type}.")
+
+        return val_validation_result
+
+    def _classify_solution(self, solution_file_path: Path, problem_file_path: Path) -> Optional[str]:
+        """Validates the solution and classifies it according to the validation result.
+
+        :param solution_file_path: the path to the solution file.
+        :param problem_file_path: the path to the problem that the solution solves.
+        :return: the solution output type of the plan or None if the validator did not report a known result.
+        """
+        validation_result = self._validate_plan(solution_file_path, problem_file_path)
+        if validation_result.is_valid:
+            self.logger.info("The plan is valid.")
+            return SolutionOutputTypes.ok.name
+
+        if validation_result.is_inapplicable:
+            self.logger.info("The plan is not applicable.")
+            return SolutionOutputTypes.not_applicable.name
+
+        if validation_result.goal_not_reached:
+            self.logger.info("The plan did not reach the required goal.")
+            return SolutionOutputTypes.goal_not_achieved.name
+
+        return None
+
+    def _solve_problem(self, problem_file_path: Path, tested_domain_file_path: Path,
+                       domain_key: Optional[str]) -> Optional[str]:
+        """Solves the problem, reusing the solver's previous plan if the problem was solved using the same domain.
+
+        :param problem_file_path: the path to the problem file.
+        :param tested_domain_file_path: the path of the domain that was learned.
+        :param domain_key: the hash of the normalized learned domain, None if the solutions are not cached.
+        :return: the solving status of the problem or None if the solver did not report a status.
+        """
+        solution_file_path = problem_file_path.parent / f"{problem_file_path.stem}.solution"
+        if domain_key is not None:
+            cached_solution = self.solutions_cache.get_solution(domain_key, problem_file_path, self.solver_type.name)
+            if cached_solution is not None:
+                self.logger.debug(f"Using the cached solution of the problem - {problem_file_path.stem}")
+                solving_status, plan = cached_solution
+                if plan is not None:
+                    solution_file_path.write_text(plan)
+
+                return solving_status
+
+        solving_status = self.solver.solve_problem(problem_file_path, tested_domain_file_path)
+        if domain_key is not None and solving_status == SolutionOutputTypes.ok.name and solution_file_path.exists():
+            # timeouts and missing solutions depend on the solver's resource limits so they are not cached.
+            self.solutions_cache.store_solution(domain_key, problem_file_path, self.solver_type.name,
+                                                solving_status, solution_file_path.read_text())
+
+        return solving_status
+
+    def _solve_and_validate_problems(
+            self, tested_domain_file_path: Path,
+            test_set_directory_path: Path) -> Tuple[Dict[str, str], Dict[str, Optional[str]]]:
+        """Solves the test set problems and validates each solution as soon as it is found.
+
+        Note: solving and validation run on separate bounded thread pools, so VAL validates the solution of one
+            problem while the solver is still working on the next problems.
+
+        :param tested_domain_file_path: the path of the domain that was learned.
+        :param test_set_directory_path: the path to the directory containing the test set problems.
+        :return: the solving status of each problem and the validation result of the problems that were solved.
+        """
+        problem_file_paths = sorted(test_set_directory_path.glob(PROBLEM_FILES_GLOB))
+        domain_key = None if self.solutions_cache is None else \
+            self.solutions_cache.create_domain_key(tested_domain_file_path)
+        solving_report = {}
+        validation_futures: Dict[str, Future] = {}
+        with ThreadPoolExecutor(max_workers=self.max_solver_workers) as solving_executor, \
+                ThreadPoolExecutor(max_workers=self.max_validation_workers) as validation_executor:
+            solving_futures = {
+                solving_executor.submit(self._solve_problem, problem_file_path, tested_domain_file_path, domain_key):
+                    problem_file_path for problem_file_path in problem_file_paths}
+            for solving_future in as_completed(solving_futures):
+                problem_file_path = solving_futures[solving_future]
+                solving_report[problem_file_path.stem] = solving_future.result()
+                if solving_report[problem_file_path.stem] == SolutionOutputTypes.ok.name:
+                    solution_file_path = test_set_directory_path / f"{problem_file_path.stem}.solution"
+                    validation_futures[problem_file_path.stem] = validation_executor.submit(
+                        self._classify_solution, solution_file_path, problem_file_path)
+
+            validation_report = {problem_name: validation_future.result()
+                                 for problem_name, validation_future in validation_futures.items()}
+
+        ordered_solving_report = {problem_file_path.stem: solving_report[problem_file_path.stem]
+                                  for problem_file_path in problem_file_paths
+                                  if solving_report[problem_file_path.stem] is not None}
+        return ordered_solving_report, validation_report
 
     @staticmethod
     def _extract_num_triplets(used_observations: Union[List[Observation],
@@ -140,21 +245,19 @@ class DomainValidator:
         """
         num_triplets = self._extract_num_triplets(used_observations)
         self.logger.info("Solving the test set problems using the learned domain!")
-        solving_report = self.solver.execute_solver(
-            problems_directory_path=test_set_directory_path,
-            domain_file_path=tested_domain_file_path
-        )
+        solving_report, validation_report = self._solve_and_validate_problems(tested_domain_file_path,
+                                                                              test_set_directory_path)
         solving_stats = {solution_type.name: 0 for solution_type in SolutionOutputTypes}
         for debug_statistic in DEBUG_STATISTICS:
             solving_stats[debug_statistic] = []
 
         for problem_file_name, entry in solving_report.items():
             if entry == SolutionOutputTypes.ok.name:
-                solution_file_path = test_set_directory_path / f"{problem_file_name}.solution"
-                problem_file_path = test_set_directory_path / f"{problem_file_name}.pddl"
-                self._validate_solution_content(solution_file_path=solution_file_path,
-                                                problem_file_path=problem_file_path,
-                                                iteration_statistics=solving_stats)
+                solution_type = validation_report[problem_file_name]
+                if solution_type is not None:
+                    solving_stats[solution_type] += 1
+                    solving_stats[f"problems_{solution_type}"].append(f"{problem_file_name}.pddl")
+
                 continue
 
             solving_stats[entry] += 1
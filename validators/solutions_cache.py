@@ -0,0 +1,123 @@
+"""Module caching the solver results according to the content of the solved domain and problem."""
+import hashlib
+import json
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Tuple
+
+SOLUTIONS_CACHE_DIRECTORY_NAME = "solutions_cache"
+CACHE_FILE_SUFFIX = ".json"
+
+CachedSolution = Tuple[str, Optional[str]]
+
+
+def normalize_domain_text(domain_text: str) -> str:
+    """Normalizes the PDDL text of the domain so that formatting differences do not change its hash.
+
+    :param domain_text: the PDDL text of the domain.
+    :return: the domain text without comments and with single spaces between the tokens.
+    """
+    domain_text = re.sub(r";[^\n]*", "", domain_text.lower())
+    domain_text = re.sub(r"\s*([()])\s*", r"\1", domain_text)
+    return re.sub(r"\s+", " ", domain_text).strip()
+
+
+class SolutionsCache:
+    """Content-addressed cache of the solving status and the plan found for a problem using a certain domain."""
+
+    logger: logging.Logger
+    cache_directory_path: Optional[Path]
+    _cached_solutions: Dict[str, CachedSolution]
+    _lock: threading.Lock
+
+    def __init__(self, cache_directory_path: Optional[Path] = None):
+        self.logger = logging.getLogger(__name__)
+        self.cache_directory_path = cache_directory_path
+        self._cached_solutions = {}
+        self._lock = threading.Lock()
+        if cache_directory_path is not None:
+            cache_directory_path.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def create_domain_key(domain_file_path: Path) -> str:
+        """Creates the hash of the normalized domain so that the same domain is hashed only once per validation.
+
+        :param domain_file_path: the path to the domain file.
+        :return: the hash of the normalized domain.
+        """
+        return hashlib.sha256(normalize_domain_text(domain_file_path.read_text()).encode()).hexdigest()
+
+    @staticmethod
+    def _create_cache_key(domain_key: str, problem_file_path: Path, solver_name: str) -> str:
+        """Creates the key of the solution from the domain hash, the content of the problem and the solver.
+
+        :param domain_key: the hash of the normalized domain.
+        :param problem_file_path: the path to the problem file.
+        :param solver_name: the name of the solver used to solve the problem.
+        :return: the key of the solution.
+        """
+        content_hash = hashlib.sha256(domain_key.encode())
+        content_hash.update(problem_file_path.read_bytes())
+        content_hash.update(solver_name.encode())
+        return content_hash.hexdigest()
+
+    def get_solution(self, domain_key: str, problem_file_path: Path, solver_name: str) -> Optional[CachedSolution]:
+        """Returns the cached solving status and plan of the problem.
+
+        :param domain_key: the hash of the normalized domain.
+        :param problem_file_path: the path to the problem file.
+        :param solver_name: the name of the solver used to solve the problem.
+        :return: the solving status and the plan (None if no plan was found) or None if the problem was not solved
+            using the domain before.
+        """
+        cache_key = self._create_cache_key(domain_key, problem_file_path, solver_name)
+        with self._lock:
+            if cache_key in self._cached_solutions:
+                return self._cached_solutions[cache_key]
+
+        if self.cache_directory_path is None:
+            return None
+
+        cache_file_path = self.cache_directory_path / f"{cache_key}{CACHE_FILE_SUFFIX}"
+        if not cache_file_path.exists():
+            return None
+
+        try:
+            with open(cache_file_path, "rt") as cache_file:
+                cached_content = json.load(cache_file)
+
+        except json.JSONDecodeError:
+            self.logger.warning(f"The cached solution {cache_file_path} is corrupted and will be solved again.")
+            return None
+
+        cached_solution = (cached_content["solving_status"], cached_content["plan"])
+        with self._lock:
+            self._cached_solutions[cache_key] = cached_solution
+
+        return cached_solution
+
+    def store_solution(self, domain_key: str, problem_file_path: Path, solver_name: str, solving_status: str,
+                       plan: Optional[str]) -> None:
+        """Stores the solving status and the plan of the problem.
+
+        :param domain_key: the hash of the normalized domain.
+        :param problem_file_path: the path to the problem file.
+        :param solver_name: the name of the solver used to solve the problem.
+        :param solving_status: the status returned by the solver.
+        :param plan: the content of the solution file or None if no plan was found.
+        """
+        cache_key = self._create_cache_key(domain_key, problem_file_path, solver_name)
+        with self._lock:
+            self._cached_solutions[cache_key] = (solving_status, plan)
+
+        if self.cache_directory_path is None:
+            return
+
+        cache_file_path = self.cache_directory_path / f"{cache_key}{CACHE_FILE_SUFFIX}"
+        temporary_file_path = cache_file_path.with_name(f"{cache_key}.{threading.get_ident()}.tmp")
+        with open(temporary_file_path, "wt") as cache_file:
+            json.dump({"solving_status": solving_status, "plan": plan}, cache_file)
+
+        temporary_file_path.replace(cache_file_path)
@@ -1,7 +1,11 @@
 import logging
 import os
+import re
 import subprocess
 from pathlib import Path
+from typing import Optional
+
+from utilities import SolutionOutputTypes
 
 VALIDATOR_DIRECTORY = Path(os.environ["VALIDATOR_DIRECTORY"])
 
@@ -9,30 +13,112 @@ VALID_PLAN = "Plan valid"
 INAPPLICABLE_PLAN = "Plan failed to execute"
 PLAN_APPLICABLE = "Plan executed successfully"
 GOAL_NOT_REACHED = "Goal not satisfied"
+FAULTY_ACTION_LOCATOR_REGEX = re.compile(r"Plan failed because of unsatisfied precondition in:\n\((\w+) [\w+ ]*\)",
+                                         flags=re.MULTILINE)
 
 MAX_RUNNING_TIME = 60
 
 logger = logging.getLogger(__name__)
 
 
-def run_validate_script(domain_file_path: Path, problem_file_path: Path, solution_file_path: Path) -> Path:
-    """Validates that the plan for the input problem.
+class ValidationResult:
+    """The result of validating a plan - valid, inapplicable at some step or not reaching the goal."""
+
+    solution_type: Optional[SolutionOutputTypes]
+    validation_output: str
+    log_file_path: Optional[Path]
+    failed_step: Optional[int]
+    failed_action_name: Optional[str]
+
+    def __init__(self, solution_type: Optional[SolutionOutputTypes], validation_output: str = "",
+                 log_file_path: Optional[Path] = None, failed_step: Optional[int] = None,
+                 failed_action_name: Optional[str] = None):
+        self.solution_type = solution_type
+        self.validation_output = validation_output
+        self.log_file_path = log_file_path
+        self.failed_step = failed_step
+        self.failed_action_name = failed_action_name
+
+    @classmethod
+    def from_validation_output(cls, validation_output: str,
+                               log_file_path: Optional[Path] = None) -> "ValidationResult":
+        """Parses the output of VAL.
+
+        :param validation_output: the text that VAL printed.
+        :param log_file_path: the path to the file the output was written to, if it was written.
+        :return: the parsed validation result.
+        """
+        if VALID_PLAN in validation_output:
+            return cls(SolutionOutputTypes.ok, validation_output, log_file_path)
+
+        if INAPPLICABLE_PLAN in validation_output:
+            match = FAULTY_ACTION_LOCATOR_REGEX.search(validation_output)
+            return cls(SolutionOutputTypes.not_applicable, validation_output, log_file_path,
+                       failed_action_name=match.group(1) if match else None)
+
+        if GOAL_NOT_REACHED in validation_output:
+            return cls(SolutionOutputTypes.goal_not_achieved, validation_output, log_file_path)
+
+        return cls(None, validation_output, log_file_path)
+
+    @property
+    def is_valid(self) -> bool:
+        """Whether the plan is applicable and achieves the goal."""
+        return self.solution_type == SolutionOutputTypes.ok
+
+    @property
+    def is_inapplicable(self) -> bool:
+        """Whether one of the plan's actions could not be applied."""
+        return self.solution_type == SolutionOutputTypes.not_applicable
+
+    @property
+    def goal_not_reached(self) -> bool:
+        """Whether the plan is applicable but does not achieve the goal."""
+        return self.solution_type == SolutionOutputTypes.goal_not_achieved
+
+
+def validate_plan(domain_file_path: Path, problem_file_path: Path, solution_file_path: Path,
+                  log_file_path: Optional[Path] = None) -> ValidationResult:
+    """Validates the plan for the input problem, running VAL with its own working directory so that several plans
+        can be validated concurrently.
 
     :param domain_file_path: the path to the domain file.
     :param problem_file_path: the path to the problem file.
     :param solution_file_path: the path to the solution file.
-    :return: the path to the validation log file.
+    :param log_file_path: the path to write VAL's output to, the output is only kept in memory if not given.
+    :return: the result of the validation.
     """
-    os.chdir(VALIDATOR_DIRECTORY)
     logger.info("Running VAL to validate the plan's correctness.")
-    validation_file_path = domain_file_path.parent / "validation_log.txt"
-    run_command = f"./Validate -v -t 0.01 {domain_file_path} {problem_file_path} " \
-                  f"{solution_file_path} > {validation_file_path}"
+    run_command = [str(VALIDATOR_DIRECTORY.absolute() / "Validate"), "-v", "-t", "0.01",
+                   str(domain_file_path.absolute()), str(problem_file_path.absolute()),
+                   str(solution_file_path.absolute())]
     try:
-        subprocess.check_output(run_command, shell=True)
+        process = subprocess.run(run_command, cwd=VALIDATOR_DIRECTORY, stdout=subprocess.PIPE,
+                                 stderr=subprocess.PIPE, timeout=MAX_RUNNING_TIME)
+        if process.returncode != 0:
+            logger.error(f"VAL returned status code {process.returncode}.")
+
+        validation_output = process.stdout.decode(errors="replace")
+
+    except (subprocess.TimeoutExpired, OSError) as e:
+        logger.error(f"VAL could not validate the plan - {e}")
+        validation_output = ""
 
-    except subprocess.CalledProcessError as e:
-        logger.error(f"VAL returned status code {e.returncode}.")
+    if log_file_path is not None:
+        log_file_path.write_text(validation_output)
 
     logger.info("Finished validating the solution file.")
+    return ValidationResult.from_validation_output(validation_output, log_file_path)
+
+
+def run_validate_script(domain_file_path: Path, problem_file_path: Path, solution_file_path: Path) -> Path:
+    """Validates that the plan for the input problem.
+
+    :param domain_file_path: the path to the domain file.
+    :param problem_file_path: the path to the problem file.
+    :param solution_file_path: the path to the solution file.
+    :return: the path to the validation log file.
+    """
+    validation_file_path = solution_file_path.parent / f"{solution_file_path.stem}_validation_log.txt"
+    validate_plan(domain_file_path, problem_file_path, solution_file_path, log_file_path=validation_file_path)
     return validation_file_path